@@ -1,6 +1,6 @@
 {
     'name': 'teslimat',
-    'version': '15.0.1.0.0',
+    'version': '15.0.1.1.0',
     'category': 'Inventory/Delivery',
     'summary': 'Transfer belgelerinden otomatik teslimat belgesi oluşturma ve yönetimi',
     'description': """
@@ -30,13 +30,20 @@ Teslimat Yönetimi Modülü
         'security/delivery_security.xml',
         'security/ir.model.access.csv',
         'views/delivery_document_views.xml',
+        'views/delivery_document_archive_views.xml',
         'views/delivery_planning_views.xml',
         'views/delivery_route_views.xml',
         'views/delivery_report_views.xml',
         'views/stock_picking_views.xml',
+        'views/delivery_capacity_views.xml',
+        'views/delivery_sms_outbox_views.xml',
+        'views/delivery_perf_sample_views.xml',
+        'wizard/delivery_auto_planning_wizard_views.xml',
+        'wizard/delivery_capacity_simulation_wizard_views.xml',
         'views/delivery_menus.xml',
         'wizard/vehicle_selection_wizard_views.xml',
         'data/delivery_data.xml',
+        'data/delivery_cron.xml',
     ],
     'demo': [],
     'installable': True,
@@ -44,7 +51,7 @@ Teslimat Yönetimi Modülü
     'application': True,
     'license': 'LGPL-3',
     'external_dependencies': {
-        'python': ['googlemaps'],
+        'python': ['googlemaps', 'numpy'],
     },
     'assets': {
         'web.assets_backend': [
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import json
+
+from werkzeug.exceptions import BadRequest
+
+from odoo import fields, http
+from odoo.http import request, Response
+
+
+class DeliveryDriverController(http.Controller):
+    """Yoldaki sürücüler için sade durak listesi ve toplu durum güncellemesi"""
+
+    def _parse_slot(self, vehicle, date):
+        Document = request.env['delivery.document']
+        if vehicle not in dict(Document._fields['vehicle_type'].selection):
+            raise BadRequest('Geçersiz araç: %s' % vehicle)
+        try:
+            return vehicle, fields.Date.to_date(date)
+        except (TypeError, ValueError):
+            raise BadRequest('Geçersiz tarih: %s' % date)
+
+    def _manifest(self, vehicle, date, cursor=None, limit=None):
+        try:
+            return request.env['delivery.document']._get_driver_manifest(
+                vehicle, date, cursor=cursor, limit=limit)
+        except ValueError:
+            raise BadRequest('Geçersiz imleç veya sayfa boyutu')
+
+    @http.route('/teslimat/driver/manifest', type='http', auth='user', methods=['GET'])
+    def manifest(self, vehicle=None, date=None, cursor=None, limit=None, **kwargs):
+        """Araç ve tarih için durak listesi; değişmemişse 304 döner"""
+        vehicle, date = self._parse_slot(vehicle, date)
+        etag = request.env['delivery.document']._get_driver_manifest_etag(vehicle, date, cursor, limit)
+        if request.httprequest.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        payload = self._manifest(vehicle, date, cursor=cursor, limit=limit)
+        response = request.make_response(json.dumps(payload, separators=(',', ':')), headers=[
+            ('Content-Type', 'application/json'),
+            ('Cache-Control', 'private, no-cache'),
+        ])
+        response.set_etag(etag)
+        return response
+
+    @http.route('/teslimat/driver/status', type='json', auth='user', methods=['POST'])
+    def status(self, updates=None, vehicle=None, date=None, cursor=None, limit=None, **kwargs):
+        """Toplu durum güncellemesi.
+
+        ``updates`` [{"id": 1, "state": "on_road"}, ...] listesidir. Araç ve
+        tarih verilirse güncellemelerden sonraki değişiklikler de aynı yanıtta
+        döner; kapsama alanına dönen sürücü tek istekle eşitlenir.
+        """
+        try:
+            results = request.env['delivery.document']._apply_driver_updates(updates or [])
+        except (KeyError, TypeError, ValueError):
+            raise BadRequest('Geçersiz güncelleme listesi')
+        payload = {'results': {str(document_id): result for document_id, result in results.items()}}
+        if vehicle and date:
+            vehicle, date = self._parse_slot(vehicle, date)
+            payload['manifest'] = self._manifest(vehicle, date, cursor=cursor, limit=limit)
+        return payload
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Eski JSON rota metnini paketlenmiş durak ve bacak verisine çevir.
+
+Her durak, planlamanın belgeleriyle teslimat adresi üzerinden eşlenir;
+metin olarak tutulan mesafe ve süreler sayıya çevrilir. Eski biçimde bitişe
+giden son bacak yoktu; saklanan toplamlardan türetilir. Çevrilemeyen
+optimize edilmiş rotalar yeniden optimize edilmek üzere taslağa alınır.
+"""
+import json
+import logging
+import re
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+# Sağlayıcı (İngilizce) ve yerel çözücü (Türkçe) metinlerindeki birimler
+DISTANCE_UNITS = {'km': 1000.0, 'm': 1.0}
+DURATION_UNITS = {'day': 86400, 'days': 86400, 'gün': 86400, 'hour': 3600, 'hours': 3600,
+                  'saat': 3600, 'min': 60, 'mins': 60, 'dk': 60, 'sn': 1, 'sec': 1, 'secs': 1}
+QUANTITY = re.compile(r'(\d+(?:[.,]\d+)?)\s*([^\d\s]+)')
+
+
+def _parse(text, units):
+    """'1 hour 5 mins', '12,3 km' gibi metni temel birime çevir; bilinmiyorsa None"""
+    parts = QUANTITY.findall(text or '')
+    if not parts or any(unit.lower() not in units for _value, unit in parts):
+        return None
+    return int(round(sum(float(value.replace(',', '.')) * units[unit.lower()] for value, unit in parts)))
+
+
+def _convert(route, entries):
+    """Eski kayıtları paketlenmiş alan değerlerine çevir; çevrilemezse None"""
+    available = {}
+    for document in route.planning_id.delivery_ids:
+        available.setdefault(document.delivery_address, []).append(document.id)
+    stop_ids, distances, durations = [], [], []
+    for entry in entries:
+        candidates = available.get(entry.get('address'))
+        distance = _parse(entry.get('distance'), DISTANCE_UNITS)
+        duration = _parse(entry.get('duration'), DURATION_UNITS)
+        if not candidates or distance is None or duration is None:
+            return None
+        stop_ids.append(candidates.pop(0))
+        distances.append(distance)
+        durations.append(duration)
+    distances.append(max(int(round(route.total_distance * 1000)) - sum(distances), 0))
+    durations.append(max(int(round(route.total_duration * 60)) - sum(durations), 0))
+    vals = route._prepare_result_vals(stop_ids, distances, durations, False)
+    # Toplamlar ve durum olduğu gibi korunur
+    for field in ('total_distance', 'total_duration', 'state'):
+        vals.pop(field)
+    return vals
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'delivery_route' AND column_name = 'optimized_route_legacy'
+    """)
+    if not cr.fetchone():
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("""
+        SELECT id, optimized_route_legacy FROM delivery_route
+         WHERE optimized_route_legacy IS NOT NULL AND stop_data IS NULL
+    """)
+    converted, reset, kept = 0, [], 0
+    for route_id, text in cr.fetchall():
+        route = env['delivery.route'].browse(route_id)
+        try:
+            entries = json.loads(text)
+        except ValueError:
+            entries = None
+        vals = _convert(route, entries) if isinstance(entries, list) else None
+        if vals:
+            route.with_context(mail_notrack=True).write(vals)
+            converted += 1
+        elif route.state == 'optimized':
+            reset.append(route_id)
+        else:
+            kept += 1
+    if reset:
+        env['delivery.route'].browse(reset).write({'state': 'draft', 'total_distance': 0, 'total_duration': 0})
+    _logger.info('Rota göçü: %s rota çevrildi, %s rota yeniden optimizasyon için taslağa alındı, '
+                 '%s başlamış rota çevrilemedi', converted, len(reset), kept)
+    cr.execute("ALTER TABLE delivery_route DROP COLUMN optimized_route_legacy")
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""optimized_route saklanan alandan hesaplanan alana dönüştü.
+
+Eski JSON metni, sonrası betiği paketlenmiş bacaklara çevirene kadar ayrı
+bir sütunda korunur.
+"""
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'delivery_route' AND column_name = 'optimized_route'
+    """)
+    if cr.fetchone():
+        cr.execute("ALTER TABLE delivery_route RENAME COLUMN optimized_route TO optimized_route_legacy")
@@ -1,7 +1,17 @@
 # -*- coding: utf-8 -*-
 from . import delivery_document
+from . import delivery_document_archive
+from . import delivery_driver_tombstone
 from . import delivery_planning
 from . import delivery_route
+from . import delivery_route_stop
+from . import delivery_route_revision
 from . import delivery_report
 from . import delivery_district_day
-from . import stock_picking
\ No newline at end of file
+from . import delivery_capacity_slot
+from . import delivery_sms_outbox
+from . import delivery_geo_point
+from . import delivery_travel_matrix
+from . import stock_picking
+from . import ir_sequence
+from . import delivery_perf_sample
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from datetime import timedelta
+
+from .delivery_document import DAILY_DELIVERY_LIMIT, DAILY_LIMIT_STATES
+
+# Uygun yuva aranırken bakılan en uzak gün sayısı
+AVAILABLE_SLOT_HORIZON = 60
+
+
+class DeliveryCapacitySlot(models.Model):
+    _name = 'delivery.capacity.slot'
+    _description = 'Teslimat Kapasite Defteri'
+    _order = 'date desc, vehicle_type, district'
+
+    date = fields.Date('Tarih', required=True, index=True)
+    vehicle_type = fields.Selection([
+        ('anadolu', 'Anadolu Yakası'),
+        ('avrupa', 'Avrupa Yakası'),
+        ('kucuk_arac_1', 'Küçük Araç 1'),
+        ('kucuk_arac_2', 'Küçük Araç 2'),
+        ('ek_arac', 'Ek Araç')
+    ], string='Araç Tipi', required=True)
+    # Boş ilçe, aracın tüm gün için toplam kapasitesini tutan satırdır
+    district = fields.Char('İlçe', required=True, default='')
+    capacity = fields.Integer('Kapasite', required=True)
+    reserved = fields.Integer('Rezerve', required=True, default=0)
+    remaining = fields.Integer('Kalan', compute='_compute_remaining')
+
+    _sql_constraints = [
+        ('slot_uniq', 'unique(date, vehicle_type, district)',
+         'Bu tarih, araç ve ilçe için kapasite satırı zaten mevcut!'),
+    ]
+
+    @api.depends('capacity', 'reserved')
+    def _compute_remaining(self):
+        for slot in self:
+            slot.remaining = max(slot.capacity - slot.reserved, 0)
+
+    @api.model
+    def _get_slot_capacity(self, date, district):
+        """Yuva kapasitesini belirle"""
+        if not district:
+            return DAILY_DELIVERY_LIMIT
+        return self.env['delivery.district.day'].get_max_delivery_count(district, date.weekday())
+
+    @api.model
+    def _ensure_slot(self, date, vehicle_type, district):
+        """Yuva satırını yoksa mevcut teslimatlardan sayarak oluştur"""
+        self.env['delivery.document'].flush(['delivery_date', 'vehicle_type', 'district', 'state'])
+        self.env.cr.execute("""
+            INSERT INTO delivery_capacity_slot
+                (date, vehicle_type, district, capacity, reserved,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT %(date)s, %(vehicle_type)s, %(district)s, %(capacity)s, COUNT(*),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+            FROM delivery_document
+            WHERE delivery_date = %(date)s
+              AND vehicle_type = %(vehicle_type)s
+              AND (%(district)s = '' OR district = %(district)s)
+              AND state IN %(states)s
+            ON CONFLICT (date, vehicle_type, district) DO NOTHING
+        """, {
+            'date': date,
+            'vehicle_type': vehicle_type,
+            'district': district or '',
+            'capacity': self._get_slot_capacity(date, district),
+            'states': DAILY_LIMIT_STATES,
+            'uid': self.env.uid,
+        })
+
+    @api.model
+    def _reserve(self, date, vehicle_type, district='', count=1, enforce=True):
+        """Yuvada atomik olarak yer ayır ve kalan kapasiteyi döndür
+
+        Kapasite her ayırmada güncel kurallardan okunur ve satıra yazılır;
+        limit veya ilçe-gün kuralı değiştiğinde mevcut satırlar da izler.
+        """
+        self._ensure_slot(date, vehicle_type, district)
+        self.env.cr.execute("""
+            UPDATE delivery_capacity_slot
+            SET reserved = reserved + %(count)s,
+                capacity = %(capacity)s,
+                write_uid = %(uid)s,
+                write_date = now() at time zone 'UTC'
+            WHERE date = %(date)s
+              AND vehicle_type = %(vehicle_type)s
+              AND district = %(district)s
+              AND (NOT %(enforce)s OR reserved + %(count)s <= %(capacity)s)
+            RETURNING capacity - reserved
+        """, {
+            'date': date,
+            'vehicle_type': vehicle_type,
+            'district': district or '',
+            'count': count,
+            'capacity': self._get_slot_capacity(date, district),
+            'enforce': enforce,
+            'uid': self.env.uid,
+        })
+        row = self.env.cr.fetchone()
+        self.invalidate_cache(['reserved', 'capacity'])
+        if row is None:
+            vehicle_names = dict(self._fields['vehicle_type'].selection)
+            if district:
+                raise ValidationError(
+                    _('%s tarihinde %s aracı için "%s" ilçesinin teslimat kapasitesi doldu!')
+                    % (fields.Date.to_string(date), vehicle_names.get(vehicle_type, vehicle_type), district)
+                )
+            raise ValidationError(
+                _('%s tarihinde %s aracı için günlük maksimum %s teslimat limiti aşıldı!')
+                % (fields.Date.to_string(date), vehicle_names.get(vehicle_type, vehicle_type),
+                   DAILY_DELIVERY_LIMIT)
+            )
+        return row[0]
+
+    @api.model
+    def _release(self, date, vehicle_type, district='', count=1):
+        """Yuvadaki ayrılmış yeri geri bırak"""
+        self.env.cr.execute("""
+            UPDATE delivery_capacity_slot
+            SET reserved = GREATEST(reserved - %(count)s, 0),
+                write_uid = %(uid)s,
+                write_date = now() at time zone 'UTC'
+            WHERE date = %(date)s
+              AND vehicle_type = %(vehicle_type)s
+              AND district = %(district)s
+        """, {
+            'date': date,
+            'vehicle_type': vehicle_type,
+            'district': district or '',
+            'count': count,
+            'uid': self.env.uid,
+        })
+        self.invalidate_cache(['reserved'])
+
+    @api.model
+    def get_remaining_capacity(self, date, vehicle_type, district=''):
+        """Yuvanın kalan kapasitesini getir
+
+        Satırı olmayan yuva için mevcut belgeler sayılır; okuma deftere satır eklemez.
+        """
+        district = district or ''
+        usage = self._get_slot_usage(date, date, [district] if district else [])
+        used = usage.get((date, vehicle_type, district), 0)
+        return max(self._get_slot_capacity(date, district) - used, 0)
+
+    @api.model
+    def _get_slot_usage(self, date_from, date_to, districts):
+        """Tarih aralığındaki yuva kullanımını tek toplu sorguyla getir
+
+        Defterde satırı olan yuvalar için defter, olmayanlar için mevcut
+        belgeler sayılır. Boş ilçe anahtarı aracın günlük toplamıdır.
+        Kapasite satırdan değil kurallardan (``_get_slot_capacity``) okunmalıdır.
+        Dönüş: {(tarih, araç, ilçe): kullanılan}
+        """
+        self.flush(['date', 'vehicle_type', 'district', 'reserved'])
+        self.env['delivery.document'].flush(['delivery_date', 'vehicle_type', 'district', 'state'])
+        self.env.cr.execute("""
+            WITH documents AS (
+                SELECT d.delivery_date AS date, d.vehicle_type, k.district, COUNT(*) AS used
+                FROM delivery_document d,
+                     LATERAL (VALUES (''), (NULLIF(d.district, ''))) AS k(district)
+                WHERE d.state IN %(states)s
+                  AND d.delivery_date BETWEEN %(date_from)s AND %(date_to)s
+                  AND k.district IN %(keys)s
+                GROUP BY 1, 2, 3
+            ), slots AS (
+                SELECT date, vehicle_type, district, reserved
+                FROM delivery_capacity_slot
+                WHERE date BETWEEN %(date_from)s AND %(date_to)s
+                  AND district IN %(keys)s
+            )
+            SELECT COALESCE(s.date, d.date),
+                   COALESCE(s.vehicle_type, d.vehicle_type),
+                   COALESCE(s.district, d.district),
+                   COALESCE(s.reserved, d.used, 0)
+            FROM documents d
+            FULL JOIN slots s
+              ON s.date = d.date AND s.vehicle_type = d.vehicle_type AND s.district = d.district
+        """, {
+            'states': DAILY_LIMIT_STATES,
+            'date_from': date_from,
+            'date_to': date_to,
+            'keys': ('',) + tuple(districts),
+        })
+        return {(date, vehicle_type, district): used
+                for date, vehicle_type, district, used in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_available_slots(self, demand, date_from, limit, vehicle_types=None,
+                             horizon=AVAILABLE_SLOT_HORIZON):
+        """İlçe kurallarına ve kalan kapasiteye göre uygun ilk (tarih, araç) yuvalarını getir
+
+        ``demand`` ilçe -> teslimat sayısıdır; boş ilçe yalnızca aracın günlük
+        limitine tabidir. İlçe-gün kuralları önbellekteki indeksten okunur,
+        kullanım tek sorguyla alınır; deneme amaçlı kayıt yapılmaz.
+        Dönüş: [{'date', 'vehicle_type', 'remaining', 'district_remaining'}]
+        """
+        district_day = self.env['delivery.district.day']
+        vehicle_types = vehicle_types or [key for key, _label in self._fields['vehicle_type'].selection]
+        districts = {district: count for district, count in demand.items() if district}
+        needed = sum(demand.values())
+        date_to = date_from + timedelta(days=horizon - 1)
+        usage = self._get_slot_usage(date_from, date_to, districts)
+
+        slots = []
+        for offset in range(horizon):
+            date = date_from + timedelta(days=offset)
+            weekday = date.weekday()
+            if weekday == 6 or not all(
+                    district_day.check_district_day_compatibility(district, weekday) for district in districts):
+                continue
+            for vehicle_type in vehicle_types:
+                remaining = DAILY_DELIVERY_LIMIT - usage.get((date, vehicle_type, ''), 0)
+                if remaining < needed:
+                    continue
+                district_remaining = None
+                for district, count in districts.items():
+                    free = (district_day.get_max_delivery_count(district, weekday)
+                            - usage.get((date, vehicle_type, district), 0))
+                    if free < count:
+                        break
+                    district_remaining = free if district_remaining is None else min(district_remaining, free)
+                else:
+                    slots.append({
+                        'date': date,
+                        'vehicle_type': vehicle_type,
+                        'remaining': remaining,
+                        'district_remaining': remaining if district_remaining is None else district_remaining,
+                    })
+                    if len(slots) >= limit:
+                        return slots
+        return slots
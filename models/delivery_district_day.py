@@ -1,7 +1,20 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, _
+from collections import namedtuple
+
+import numpy as np
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
+from ..utils import district_resolver
+
+# İlçe kuralı: gün bitmaskesi (bit 0 = Pazartesi), gün bazında maksimum
+# teslimat sayıları ve yaka bilgisi
+DistrictDayRule = namedtuple('DistrictDayRule', ['mask', 'max_counts', 'region'])
+
+DEFAULT_MAX_DELIVERY_COUNT = 7
+
+
 class DeliveryDistrictDay(models.Model):
     _name = 'delivery.district.day'
     _description = 'İlçe Teslimat Günleri'
@@ -18,8 +31,12 @@ class DeliveryDistrictDay(models.Model):
         (5, 'Cumartesi'),
         (6, 'Pazar')
     ], string='Gün', required=True)
+    region = fields.Selection([
+        ('anadolu', 'Anadolu Yakası'),
+        ('avrupa', 'Avrupa Yakası'),
+    ], string='Bölge')
     is_active = fields.Boolean('Aktif', default=True)
-    max_delivery_count = fields.Integer('Maksimum Teslimat Sayısı', default=7)
+    max_delivery_count = fields.Integer('Maksimum Teslimat Sayısı', default=DEFAULT_MAX_DELIVERY_COUNT)
     notes = fields.Text('Notlar')
 
     _sql_constraints = [
@@ -29,40 +46,129 @@ class DeliveryDistrictDay(models.Model):
 
     @api.depends('district_name', 'weekday')
     def _compute_name(self):
-        weekday_names = dict(self._fields['weekday'].selection)
+        weekday_names = self._get_weekday_names()
         for record in self:
-            record.name = f"{record.district_name} - {weekday_names[record.weekday]}"
+            record.name = f"{record.district_name} - {weekday_names[int(record.weekday)]}"
 
     @api.constrains('weekday')
     def _check_weekday(self):
         for record in self:
-            if record.weekday == 6:  # Pazar
+            if int(record.weekday) == 6:  # Pazar
                 raise ValidationError(_('Pazar günleri teslimat yapılamaz!'))
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.clear_caches()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.clear_caches()
+        return res
+
+    @api.model
+    def _get_weekday_names(self):
+        """Gün numarası -> gün adı eşlemesi"""
+        return {int(key): label for key, label in self._fields['weekday'].selection}
+
+    @api.model
+    @tools.ormcache()
+    def _get_district_day_index(self):
+        """Aktif kurallardan ilçe -> DistrictDayRule indeksini derle.
+
+        Sonuç tüm işlem boyunca paylaşılır; kurallar değiştiğinde
+        ``clear_caches()`` ile geçersiz kılınır. Dönen sözlük değiştirilmemelidir.
+        """
+        self.flush(['district_name', 'weekday', 'region', 'is_active', 'max_delivery_count'])
+        self.env.cr.execute("""
+            SELECT district_name, weekday, region, max_delivery_count
+            FROM delivery_district_day
+            WHERE is_active
+        """)
+        masks = {}
+        max_counts = {}
+        regions = {}
+        for district, weekday, region, max_count in self.env.cr.fetchall():
+            weekday = int(weekday)
+            masks[district] = masks.get(district, 0) | (1 << weekday)
+            max_counts.setdefault(district, [0] * 7)[weekday] = max_count or DEFAULT_MAX_DELIVERY_COUNT
+            if region:
+                regions[district] = region
+        return {
+            district: DistrictDayRule(mask, tuple(max_counts[district]), regions.get(district))
+            for district, mask in masks.items()
+        }
+
+    @api.model
+    @tools.ormcache()
+    def _get_district_lookup(self):
+        """Katlanmış ilçe adı -> kanonik ad tablosunu derle (işlem başına bir kez)"""
+        return district_resolver.build_lookup(self._get_district_day_index().keys())
+
+    @api.model
+    def _resolve_districts(self, names):
+        """Serbest metin ilçe/şehir adlarını toplu olarak kanonik ilçe adına çevir"""
+        lookup = self._get_district_lookup()
+        return {name: district_resolver.resolve(name, lookup) for name in set(names) if name}
+
+    @api.model
+    def _get_schedule_arrays(self, districts):
+        """İlçe listesi için izin matrisi, ilçe limitleri ve yaka indeksini üret
+
+        Dönüş: (allowed (D, 7), district_caps (D, 7), region_index (D,))
+        Tanımsız yakalar -1 ile işaretlenir.
+        """
+        index = self._get_district_day_index()
+        regions = [key for key, _label in self._fields['region'].selection]
+        allowed = np.zeros((len(districts), 7), dtype=bool)
+        district_caps = np.zeros((len(districts), 7))
+        region_index = np.full(len(districts), -1, dtype=int)
+        for row, district in enumerate(districts):
+            rule = index.get(district)
+            if not rule:
+                continue
+            allowed[row] = [bool(rule.mask & (1 << weekday)) for weekday in range(7)]
+            district_caps[row] = rule.max_counts
+            if rule.region in regions:
+                region_index[row] = regions.index(rule.region)
+        return allowed, district_caps, region_index
+
     @api.model
     def get_allowed_days_for_district(self, district_name):
         """İlçe için izinli günleri getir"""
-        records = self.search([
-            ('district_name', '=', district_name),
-            ('is_active', '=', True)
-        ])
-        return records.mapped('weekday')
+        rule = self._get_district_day_index().get(district_name)
+        if not rule:
+            return []
+        return [weekday for weekday in range(7) if rule.mask & (1 << weekday)]
+
+    @api.model
+    def get_allowed_day_names_for_district(self, district_name):
+        """İlçe için izinli gün adlarını getir"""
+        weekday_names = self._get_weekday_names()
+        return [weekday_names[weekday] for weekday in self.get_allowed_days_for_district(district_name)]
 
     @api.model
     def check_district_day_compatibility(self, district_name, weekday):
         """İlçe ve gün uyumluluğunu kontrol et"""
-        return bool(self.search([
-            ('district_name', '=', district_name),
-            ('weekday', '=', weekday),
-            ('is_active', '=', True)
-        ], limit=1))
+        rule = self._get_district_day_index().get(district_name)
+        return bool(rule and rule.mask & (1 << int(weekday)))
 
     @api.model
     def get_max_delivery_count(self, district_name, weekday):
         """İlçe ve gün için maksimum teslimat sayısını getir"""
-        record = self.search([
-            ('district_name', '=', district_name),
-            ('weekday', '=', weekday),
-            ('is_active', '=', True)
-        ], limit=1)
-        return record.max_delivery_count if record else 7  # Varsayılan 7 
\ No newline at end of file
+        rule = self._get_district_day_index().get(district_name)
+        if not rule or not rule.mask & (1 << int(weekday)):
+            return DEFAULT_MAX_DELIVERY_COUNT  # Varsayılan 7
+        return rule.max_counts[int(weekday)]
+
+    @api.model
+    def get_district_region(self, district_name):
+        """İlçenin bulunduğu yakayı getir"""
+        rule = self._get_district_day_index().get(district_name)
+        return rule.region if rule else False
@@ -2,10 +2,37 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 from datetime import datetime, timedelta
+import hashlib
 import logging
 
+from .delivery_report import REPORT_DOCUMENT_FIELDS
+from .delivery_perf_sample import instrument
+
 _logger = logging.getLogger(__name__)
 
+# Araç başına günlük teslimat limiti ve limite dahil edilen durumlar
+DAILY_DELIVERY_LIMIT = 7
+DAILY_LIMIT_STATES = ('ready', 'on_road', 'delivered')
+# Kapasite defterinde belgenin yuvasını belirleyen alanlar
+CAPACITY_SLOT_FIELDS = ('delivery_date', 'vehicle_type', 'district')
+
+# Sürücü manifestinin varsayılan ve en büyük sayfa boyutu
+DRIVER_MANIFEST_LIMIT = 100
+DRIVER_MANIFEST_MAX_LIMIT = 500
+# write_date işlemin başlangıç zamanıdır; imleçten önce başlayıp sonra kaydedilen
+# işlemlerin kaçmaması için eşitleme imleci bu kadar geri alınır
+DRIVER_CURSOR_OVERLAP = timedelta(minutes=5)
+# Bu alanlardan biri değiştiğinde belge sürücü manifestinden çıkabilir
+DRIVER_SLOT_FIELDS = ('delivery_date', 'vehicle_type', 'state')
+# Sürücülerin uygulayabileceği geçişler: hedef durum -> (kaynak durumlar, eylem)
+DRIVER_TRANSITIONS = {
+    'on_road': (('ready',), 'action_on_road'),
+    'delivered': (('on_road',), 'action_delivered'),
+}
+# Sıradaki müşteriye varıştan en fazla kaç dakika önce haber verileceği
+ARRIVING_SMS_MINUTES = 30
+ARRIVING_ROUNDING_MINUTES = 5
+
 class DeliveryDocument(models.Model):
     _name = 'delivery.document'
     _description = 'Teslimat Belgesi'
@@ -35,13 +62,17 @@ class DeliveryDocument(models.Model):
     # Müşteri Bilgileri (Transfer belgesinden otomatik)
     partner_id = fields.Many2one('res.partner', string='Müşteri',
                                 related='picking_id.partner_id', store=True)
-    partner_phone = fields.Char('Telefon', related='partner_id.phone', store=True)
-    partner_mobile = fields.Char('Mobil', related='partner_id.mobile', store=True)
+    # Müşteri iletişim ve adres bilgileri belge üzerinde anlık görüntü olarak
+    # tutulur; müşteri kartındaki değişiklikler geçmiş belgelere yayılmaz
+    partner_phone = fields.Char('Telefon', compute='_compute_partner_snapshot',
+                                store=True, readonly=False)
+    partner_mobile = fields.Char('Mobil', compute='_compute_partner_snapshot',
+                                 store=True, readonly=False)
     
     # Adres Bilgileri
-    delivery_address = fields.Text('Teslimat Adresi',
-                                  related='picking_id.partner_id.contact_address', store=True)
-    district = fields.Char('İlçe', compute='_compute_district', store=True)
+    delivery_address = fields.Text('Teslimat Adresi', compute='_compute_partner_snapshot',
+                                   store=True, readonly=False)
+    district = fields.Char('İlçe', compute='_compute_district', store=True, readonly=False, index=True)
     
     # Teslimat Detayları
     delivery_date = fields.Date('Teslimat Tarihi', required=True,
@@ -72,21 +103,118 @@ class DeliveryDocument(models.Model):
     create_date = fields.Datetime('Oluşturma Tarihi', readonly=True)
     create_uid = fields.Many2one('res.users', 'Oluşturan', readonly=True)
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Sıra numaraları tüm toplu oluşturma için tek seferde ayrılır
+        unnamed = [vals for vals in vals_list if vals.get('name', '/') == '/']
+        for vals, name in zip(unnamed, self._get_next_names(len(unnamed))):
+            vals['name'] = name
+        # Aktif durumda oluşturulan belgeler taslak olarak oluşturulur; durum
+        # yazılırken write defterden yer ayırır
+        states = [vals.get('state') for vals in vals_list]
+        vals_list = [dict(vals, state='draft') if state in DAILY_LIMIT_STATES else vals
+                     for vals, state in zip(vals_list, states)]
+        records = super(DeliveryDocument, self).create(vals_list)
+        active = {}
+        for record, state in zip(records, states):
+            if state in DAILY_LIMIT_STATES:
+                active.setdefault(state, self.browse())
+                active[state] |= record
+        for state, documents in active.items():
+            documents.write({'state': state})
+        self.env['delivery.report']._schedule_refresh()
+        return records
+
     @api.model
-    def create(self, vals):
-        if vals.get('name', '/') == '/':
-            vals['name'] = self.env['ir.sequence'].next_by_code('delivery.document') or '/'
-        return super(DeliveryDocument, self).create(vals)
+    def _get_next_names(self, count):
+        """Toplu oluşturma için sıra numaralarını ayır"""
+        names = self.env['ir.sequence']._next_block_by_code('delivery.document', count)
+        return [name or '/' for name in names]
+
+    def write(self, vals):
+        slots = self._get_driver_slots() if any(field in vals for field in DRIVER_SLOT_FIELDS) else {}
+        # Defter durum ve yuva değişikliklerini izler: eski yuva bırakılır, yeni
+        # yuvadan yazmadan önce yer ayrılır (belge henüz sayılmamışken)
+        releasing = reserving = self.browse()
+        # Çağıran yerleri kendisi taşıdıysa defter yeniden güncellenmez
+        if not self.env.context.get('delivery_capacity_moved'):
+            releasing, reserving = self._get_capacity_moves(vals)
+        releasing._release_capacity()
+        reserving._reserve_capacity(vals)
+        res = super(DeliveryDocument, self).write(vals)
+        if slots:
+            # Yuvası değişen veya taslağa dönen belgeler sürücülere silinmiş bildirilir
+            current = self._get_driver_slots()
+            self.env['delivery.driver.tombstone']._record({
+                doc_id: slot for doc_id, slot in slots.items() if current.get(doc_id) != slot
+            })
+        if any(field in vals for field in REPORT_DOCUMENT_FIELDS):
+            self.env['delivery.report']._schedule_refresh()
+        return res
+
+    def unlink(self):
+        slots = self._get_driver_slots()
+        self.filtered(lambda r: r.state in DAILY_LIMIT_STATES)._release_capacity()
+        res = super(DeliveryDocument, self).unlink()
+        self.env['delivery.driver.tombstone']._record(slots)
+        return res
 
     @api.depends('partner_id')
+    @instrument('compute')
+    def _compute_partner_snapshot(self):
+        for record in self:
+            record.update(self._prepare_partner_snapshot(record.partner_id))
+
+    @api.depends('partner_id')
+    @instrument('compute')
     def _compute_district(self):
+        districts = self.env['delivery.district.day']._resolve_districts(self.mapped('partner_id.city'))
         for record in self:
-            if record.partner_id and record.partner_id.city:
-                record.district = record.partner_id.city
-            else:
-                record.district = ''
+            record.district = districts.get(record.partner_id.city, '')
+
+    @api.model
+    def _prepare_partner_snapshot(self, partner):
+        """Müşteriden belgeye kopyalanacak iletişim ve adres bilgileri"""
+        return {
+            'partner_phone': partner.phone or False,
+            'partner_mobile': partner.mobile or False,
+            'delivery_address': partner.contact_address or False,
+        }
+
+    @api.model
+    def _get_partner_district(self, partner):
+        """Müşterinin kanonik ilçe adını getir"""
+        if not partner.city:
+            return ''
+        return self.env['delivery.district.day']._resolve_districts([partner.city])[partner.city]
+
+    def _refresh_partner_snapshot(self, district=True):
+        """Belgelerin müşteri bilgilerini müşteri bazında toplu yaz
+
+        ``district`` False ise elle düzeltilmiş olabilecek ilçeye dokunulmaz;
+        yalnızca boş ilçeler çözücüden doldurulur.
+        """
+        by_partner = {}
+        for record in self:
+            by_partner.setdefault(record.partner_id, self.browse())
+            by_partner[record.partner_id] |= record
+
+        for partner, records in by_partner.items():
+            vals = self._prepare_partner_snapshot(partner)
+            # İlçesi değişen hazır belgelerin kapasite rezervasyonu write içinde taşınır
+            resolving = records if district else records.filtered(lambda r: not r.district)
+            if resolving:
+                resolving.write(dict(vals, district=self._get_partner_district(partner)))
+            if records - resolving:
+                (records - resolving).write(vals)
+
+    @instrument('action')
+    def action_refresh_partner_snapshot(self):
+        """Taslak ve hazır belgelerin müşteri bilgilerini güncelle"""
+        self.filtered(lambda r: r.state in ('draft', 'ready'))._refresh_partner_snapshot()
 
     @api.constrains('delivery_date', 'district')
+    @instrument('constraint')
     def _check_delivery_date_district(self):
         """İlçe ve tarih uyumluluğunu kontrol et"""
         for record in self:
@@ -105,191 +233,254 @@ class DeliveryDocument(models.Model):
                         % (record.district, ', '.join(allowed_days))
                     )
 
-    @api.constrains('delivery_date', 'vehicle_type')
-    def _check_daily_delivery_limit(self):
-        """Günlük teslimat limitini kontrol et"""
-        for record in self:
-            if record.delivery_date and record.vehicle_type:
-                # Sınırsız teslimat grubundaki kullanıcıları kontrol et
-                if self.env.user.has_group('delivery_management.group_delivery_unlimited'):
-                    continue
-                
-                # Aynı gün ve araç için teslimat sayısını say
-                delivery_count = self.search_count([
-                    ('delivery_date', '=', record.delivery_date),
-                    ('vehicle_type', '=', record.vehicle_type),
-                    ('state', 'in', ['ready', 'on_road', 'delivered']),
-                    ('id', '!=', record.id)
-                ])
-                
-                if delivery_count >= 7:
-                    raise ValidationError(
-                        _('Bu araç için günlük maksimum 7 teslimat limiti aşıldı!')
-                    )
+    @api.model
+    def _get_demand_profile(self, date_from, date_to):
+        """İlçe ve haftanın günü bazında haftalık ortalama talebi getir
+
+        Talep, belgenin oluşturulduğu gün esas alınarak sayılır (teslimat
+        tarihi ilçe takvimine göre seçildiği için talebi yansıtmaz).
+        Dönüş değeri: {(ilçe, gün): haftalık ortalama}
+        """
+        self.flush(['district', 'state'])
+        weeks = max((date_to - date_from).days / 7.0, 1.0)
+        self.env.cr.execute("""
+            SELECT district, EXTRACT(ISODOW FROM create_date)::int - 1, COUNT(*)
+            FROM delivery_document
+            WHERE state != 'cancelled'
+              AND district IS NOT NULL
+              AND create_date >= %s
+              AND create_date < %s
+            GROUP BY 1, 2
+        """, (date_from, date_to))
+        return {(district, weekday): count / weeks for district, weekday, count in self.env.cr.fetchall()}
 
     def _check_district_day_compatibility(self, district, weekday):
         """İlçe ve gün uyumluluğunu kontrol et"""
-        # Anadolu Yakası İlçeleri
-        anadolu_districts = {
-            0: ['Maltepe', 'Kartal', 'Pendik', 'Tuzla'],  # Pazartesi
-            1: ['Üsküdar', 'Kadıköy', 'Ataşehir', 'Ümraniye'],  # Salı
-            2: ['Üsküdar', 'Kadıköy', 'Ataşehir', 'Ümraniye'],  # Çarşamba
-            3: ['Üsküdar', 'Kadıköy', 'Ataşehir', 'Ümraniye'],  # Perşembe
-            4: ['Maltepe', 'Kartal', 'Pendik', 'Sultanbeyli'],  # Cuma
-            5: ['Sancaktepe', 'Çekmeköy', 'Beykoz', 'Şile'],  # Cumartesi
-        }
-        
-        # Avrupa Yakası İlçeleri
-        avrupa_districts = {
-            0: ['Beyoğlu', 'Şişli', 'Beşiktaş', 'Kağıthane'],  # Pazartesi
-            1: ['Sarıyer', 'Bakırköy', 'Bahçelievler', 'Güngören', 'Esenler', 'Bağcılar'],  # Salı
-            2: ['Beyoğlu', 'Şişli', 'Beşiktaş', 'Kağıthane'],  # Çarşamba
-            3: ['Eyüpsultan', 'Gaziosmanpaşa', 'Küçükçekmece', 'Avcılar', 'Başakşehir', 'Sultangazi', 'Arnavutköy'],  # Perşembe
-            4: ['Fatih', 'Zeytinburnu', 'Bayrampaşa'],  # Cuma
-            5: ['Esenyurt', 'Beylikdüzü', 'Silivri', 'Çatalca'],  # Cumartesi
-        }
-        
-        # Tüm izinli ilçeleri birleştir
-        all_allowed_districts = anadolu_districts.get(weekday, []) + avrupa_districts.get(weekday, [])
-        
-        return district in all_allowed_districts
+        return self.env['delivery.district.day'].check_district_day_compatibility(district, weekday)
 
     def _get_allowed_days_for_district(self, district):
         """İlçe için izinli günleri getir"""
-        district_day_mapping = {
-            # Anadolu Yakası
-            'Maltepe': ['Pazartesi', 'Cuma'],
-            'Kartal': ['Pazartesi', 'Cuma'],
-            'Pendik': ['Pazartesi', 'Cuma'],
-            'Tuzla': ['Pazartesi'],
-            'Sultanbeyli': ['Cuma'],
-            'Üsküdar': ['Salı', 'Çarşamba', 'Perşembe'],
-            'Kadıköy': ['Salı', 'Çarşamba', 'Perşembe'],
-            'Ataşehir': ['Salı', 'Çarşamba', 'Perşembe'],
-            'Ümraniye': ['Salı', 'Çarşamba', 'Perşembe'],
-            'Sancaktepe': ['Cumartesi'],
-            'Çekmeköy': ['Cumartesi'],
-            'Beykoz': ['Cumartesi'],
-            'Şile': ['Cumartesi'],
-            
-            # Avrupa Yakası
-            'Beyoğlu': ['Pazartesi', 'Çarşamba'],
-            'Şişli': ['Pazartesi', 'Çarşamba'],
-            'Beşiktaş': ['Pazartesi', 'Çarşamba'],
-            'Kağıthane': ['Pazartesi', 'Çarşamba'],
-            'Sarıyer': ['Salı'],
-            'Bakırköy': ['Salı'],
-            'Bahçelievler': ['Salı'],
-            'Güngören': ['Salı'],
-            'Esenler': ['Salı'],
-            'Bağcılar': ['Salı'],
-            'Eyüpsultan': ['Perşembe'],
-            'Gaziosmanpaşa': ['Perşembe'],
-            'Küçükçekmece': ['Perşembe'],
-            'Avcılar': ['Perşembe'],
-            'Başakşehir': ['Perşembe'],
-            'Sultangazi': ['Perşembe'],
-            'Arnavutköy': ['Perşembe'],
-            'Fatih': ['Cuma'],
-            'Zeytinburnu': ['Cuma'],
-            'Bayrampaşa': ['Cuma'],
-            'Esenyurt': ['Cumartesi'],
-            'Beylikdüzü': ['Cumartesi'],
-            'Silivri': ['Cumartesi'],
-            'Çatalca': ['Cumartesi'],
-        }
-        
-        return district_day_mapping.get(district, [])
+        return self.env['delivery.district.day'].get_allowed_day_names_for_district(district)
+
+    def _get_transition_states(self, allowed_states=None, message=None):
+        """Belgelerin durumlarını tek sorguda okuyup geçiş ön koşulunu doğrula
+
+        İzin verilmeyen durumdaki belgeler tek bir hata mesajında listelenir;
+        allowed_states verilmezse yalnızca durumlar okunur.
+        Dönüş değeri: {belge_id: mevcut_durum}
+        """
+        if not self:
+            return {}
+        self.flush(['state'])
+        self.env.cr.execute("""
+            SELECT id, name, state
+              FROM delivery_document
+             WHERE id IN %s
+        """, [tuple(self.ids)])
+        states = {}
+        invalid = []
+        for doc_id, name, state in self.env.cr.fetchall():
+            states[doc_id] = state
+            if allowed_states is not None and state not in allowed_states:
+                invalid.append(name)
+        if invalid:
+            raise UserError('%s\n%s' % (message, ', '.join(sorted(invalid))))
+        return states
+
+    def _apply_transition(self, target_state, extra_vals=None):
+        """Belgeleri tek write ile hedef duruma geçir ve yan etkileri toplu uygula
+
+        Kapasite defteri write içinde güncellenir, SMS kuyruğu yazmadan sonra
+        tek seferde çalışır; rapor yenilemesi write içinde zaten işlem başına
+        bir kez planlanır.
+        """
+        if not self:
+            return self
+        vals = dict(extra_vals or {}, state=target_state)
+        self.write(vals)
+
+        if target_state == 'on_road':
+            self.env['delivery.route.stop']._on_documents_departed(self)
+            self.filtered(lambda r: not r.sms_sent_on_road)._send_sms_on_road()
+        elif target_state == 'delivered':
+            self.filtered(lambda r: not r.sms_sent_delivered)._send_sms_delivered()
+            # Kalan durakların ETA'sı güncellenir, sıradaki müşteriye haber verilir
+            next_stops = self.env['delivery.route.stop']._on_documents_delivered(self)
+            next_stops.mapped('document_id')._send_sms_arriving()
+        return self
 
+    @instrument('action')
     def action_confirm(self):
         """Onayla butonu - Taslaktan Hazır durumuna geçir"""
-        for record in self:
-            if record.state != 'draft':
-                raise UserError(_('Sadece taslak durumundaki belgeler onaylanabilir!'))
-            
-            if not record.delivery_date:
-                raise UserError(_('Teslimat tarihi seçilmelidir!'))
-            
-            if not record.vehicle_type:
-                raise UserError(_('Araç seçimi yapılmalıdır!'))
-            
-            record.state = 'ready'
+        self._get_transition_states(
+            ('draft',), _('Sadece taslak durumundaki belgeler onaylanabilir!'))
+
+        if self.filtered(lambda r: not r.delivery_date):
+            raise UserError(_('Teslimat tarihi seçilmelidir!'))
+        if self.filtered(lambda r: not r.vehicle_type):
+            raise UserError(_('Araç seçimi yapılmalıdır!'))
+
+        # Müşteri bilgilerini onay anındaki haliyle sabitle; elle düzeltilen ilçe korunur
+        self._refresh_partner_snapshot(district=False)
 
+        # Kapasite defterinden yer write içinde atomik olarak ayrılır
+        self._apply_transition('ready')
+
+    @instrument('action')
     def action_on_road(self):
         """Yolda butonu - Hazır durumundan Yolda durumuna geçir ve SMS gönder"""
-        for record in self:
-            if record.state != 'ready':
-                raise UserError(_('Sadece hazır durumundaki belgeler yola çıkarılabilir!'))
-            
-            record.state = 'on_road'
-            
-            # SMS gönder
-            if not record.sms_sent_on_road:
-                record._send_sms_on_road()
-                record.sms_sent_on_road = True
+        self._get_transition_states(
+            ('ready',), _('Sadece hazır durumundaki belgeler yola çıkarılabilir!'))
+        self._apply_transition('on_road')
 
+    @instrument('action')
     def action_delivered(self):
         """Tamamla butonu - Yolda durumundan Teslim Edildi durumuna geçir ve SMS gönder"""
-        for record in self:
-            if record.state != 'on_road':
-                raise UserError(_('Sadece yolda olan belgeler tamamlanabilir!'))
-            
-            record.state = 'delivered'
-            
-            # SMS gönder
-            if not record.sms_sent_delivered:
-                record._send_sms_delivered()
-                record.sms_sent_delivered = True
+        self._get_transition_states(
+            ('on_road',), _('Sadece yolda olan belgeler tamamlanabilir!'))
+        self._apply_transition('delivered')
 
+    @instrument('action')
     def action_cancel(self):
         """İptal butonu"""
-        for record in self:
-            if record.state in ['delivered']:
-                raise UserError(_('Teslim edilmiş belgeler iptal edilemez!'))
-            record.state = 'cancelled'
+        self._get_transition_states(
+            ('draft', 'ready', 'on_road', 'cancelled'),
+            _('Teslim edilmiş belgeler iptal edilemez!'))
+        self._apply_transition('cancelled')
 
+    @instrument('action')
     def action_reset_to_draft(self):
         """Taslağa Dönüştür"""
+        # Belge yeniden yola çıktığında SMS'ler tekrar gönderilebilsin
+        self.env['delivery.sms.outbox'].sudo().search([('document_id', 'in', self.ids)]).unlink()
+        self._apply_transition('draft', {
+            'sms_sent_on_road': False,
+            'sms_sent_delivered': False,
+        })
+
+    def _get_capacity_slot_counts(self):
+        """Kayıtları (tarih, araç, ilçe) kapasite yuvalarına göre say"""
+        counts = {}
         for record in self:
-            record.state = 'draft'
-            record.sms_sent_on_road = False
-            record.sms_sent_delivered = False
+            if not (record.delivery_date and record.vehicle_type):
+                continue
+            keys = [(record.delivery_date, record.vehicle_type, '')]
+            if record.district:
+                keys.append((record.delivery_date, record.vehicle_type, record.district))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+        return counts
 
-    def _send_sms_on_road(self):
-        """Yolda SMS'i gönder"""
-        if self.partner_phone or self.partner_mobile:
-            phone = self.partner_mobile or self.partner_phone
-            message = _('Sayın %s, siparişiniz yola çıkmıştır. Teslimat belgesi: %s') % (
+    def _get_capacity_moves(self, vals):
+        """Yazılacak değerlere göre (bırakılacak, yer ayrılacak) belgeleri getir
+
+        Aktif duruma giren ya da aktifken yuvası değişen belgeler yer ayırır;
+        aktif durumdan çıkan ya da yuvası değişen aktif belgeler yerini bırakır.
+        """
+        changes = {
+            field: self._fields[field].convert_to_cache(vals[field], self) or False
+            for field in CAPACITY_SLOT_FIELDS if field in vals
+        }
+        if 'state' not in vals and not changes:
+            return self.browse(), self.browse()
+        active_after = vals['state'] in DAILY_LIMIT_STATES if 'state' in vals else None
+
+        def moved(record):
+            return any((record[field] or False) != value for field, value in changes.items())
+
+        releasing = self.filtered(lambda r: r.state in DAILY_LIMIT_STATES and (
+            moved(r) or active_after is False))
+        reserving = self.filtered(lambda r: (
+            r.state in DAILY_LIMIT_STATES if active_after is None else active_after) and (
+            moved(r) or r.state not in DAILY_LIMIT_STATES))
+        return releasing, reserving
+
+    def _get_capacity_slot_counts(self, vals=None):
+        """Kayıtları (tarih, araç, ilçe) kapasite yuvalarına göre say
+
+        ``vals`` verilirse yuva alanları yazılacak değerlerle belirlenir.
+        """
+        overrides = {
+            field: self._fields[field].convert_to_cache(vals[field], self) or False
+            for field in CAPACITY_SLOT_FIELDS if field in (vals or {})
+        }
+        counts = {}
+        for record in self:
+            date, vehicle_type, district = (
+                overrides.get(field, record[field]) for field in CAPACITY_SLOT_FIELDS)
+            if not (date and vehicle_type):
+                continue
+            keys = [(date, vehicle_type, '')]
+            if district:
+                keys.append((date, vehicle_type, district))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def _reserve_capacity(self, vals=None):
+        """Kayıtlar için kapasite defterinde yer ayır"""
+        enforce = not self.env.user.has_group('teslimat.group_delivery_unlimited')
+        slot_model = self.env['delivery.capacity.slot']
+        # Kilitlenmeleri önlemek için yuvalar her zaman aynı sırada güncellenir
+        for (date, vehicle_type, district), count in sorted(self._get_capacity_slot_counts(vals).items()):
+            slot_model._reserve(date, vehicle_type, district, count=count, enforce=enforce)
+
+    def _release_capacity(self):
+        """Kayıtların kapasite defterindeki yerlerini bırak"""
+        slot_model = self.env['delivery.capacity.slot']
+        for (date, vehicle_type, district), count in sorted(self._get_capacity_slot_counts().items()):
+            slot_model._release(date, vehicle_type, district, count=count)
+
+    def _get_sms_body(self, event, eta=None):
+        """Olaya göre SMS metnini oluştur; ``eta`` verilirse tahmini varış eklenir"""
+        self.ensure_one()
+        if event == 'arriving':
+            return _('Sayın %s, siparişiniz yaklaşık %s dakika içinde teslim edilecektir. '
+                     'Teslimat belgesi: %s') % (
+                self.partner_id.name, self._get_eta_minutes(eta), self.name)
+        if event == 'on_road':
+            if eta:
+                return _('Sayın %s, siparişiniz yola çıkmıştır. Tahmini varış saati: %s. '
+                         'Teslimat belgesi: %s') % (
+                    self.partner_id.name,
+                    fields.Datetime.context_timestamp(self, eta).strftime('%H:%M'), self.name)
+            return _('Sayın %s, siparişiniz yola çıkmıştır. Teslimat belgesi: %s') % (
                 self.partner_id.name, self.name)
-            
-            # SMS gönderimi (mevcut SMS kurgusuna entegre)
-            try:
-                self.env['sms.sms'].create({
-                    'number': phone,
-                    'body': message,
-                    'partner_id': self.partner_id.id,
-                }).send()
-                _logger.info('Yolda SMS gönderildi: %s -> %s', self.name, phone)
-            except Exception as e:
-                _logger.error('SMS gönderimi hatası: %s', str(e))
+        return _('Sayın %s, teslimatınız tamamlanmıştır. Teşekkürler. Teslimat belgesi: %s') % (
+            self.partner_id.name, self.name)
 
+    @instrument('action')
+    def _send_sms_on_road(self):
+        """Yolda SMS'lerini gönderim kuyruğuna ekle"""
+        messages = self.env['delivery.sms.outbox']._enqueue(self, 'on_road')
+        _logger.info('Yolda SMS kuyruğa eklendi: %s belge', len(messages))
+
+    @api.model
+    def _get_eta_minutes(self, eta):
+        """Varışa kalan süreyi 5 dakikalık adımlara yuvarla"""
+        if not eta:
+            return ARRIVING_ROUNDING_MINUTES
+        minutes = (eta - fields.Datetime.now()).total_seconds() / 60.0
+        steps = max(int(round(minutes / ARRIVING_ROUNDING_MINUTES)), 1)
+        return steps * ARRIVING_ROUNDING_MINUTES
+
+    @instrument('action')
+    def _send_sms_arriving(self):
+        """Varışı yaklaşan yoldaki belgeler için SMS'leri kuyruğa ekle"""
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.arriving_sms_minutes', ARRIVING_SMS_MINUTES))
+        limit = fields.Datetime.now() + timedelta(minutes=threshold)
+        etas = self.env['delivery.route.stop']._get_document_etas(self)
+        documents = self.filtered(
+            lambda r: r.state == 'on_road' and r.id in etas and etas[r.id] <= limit)
+        messages = self.env['delivery.sms.outbox']._enqueue(documents, 'arriving', etas=etas)
+        _logger.info('Yaklaşıyor SMS kuyruğa eklendi: %s belge', len(messages))
+
+    @instrument('action')
     def _send_sms_delivered(self):
-        """Teslim edildi SMS'i gönder"""
-        if self.partner_phone or self.partner_mobile:
-            phone = self.partner_mobile or self.partner_phone
-            message = _('Sayın %s, teslimatınız tamamlanmıştır. Teşekkürler. Teslimat belgesi: %s') % (
-                self.partner_id.name, self.name)
-            
-            # SMS gönderimi (mevcut SMS kurgusuna entegre)
-            try:
-                self.env['sms.sms'].create({
-                    'number': phone,
-                    'body': message,
-                    'partner_id': self.partner_id.id,
-                }).send()
-                _logger.info('Teslim edildi SMS gönderildi: %s -> %s', self.name, phone)
-            except Exception as e:
-                _logger.error('SMS gönderimi hatası: %s', str(e))
+        """Teslim edildi SMS'lerini gönderim kuyruğuna ekle"""
+        messages = self.env['delivery.sms.outbox']._enqueue(self, 'delivered')
+        _logger.info('Teslim edildi SMS kuyruğa eklendi: %s belge', len(messages))
 
     def action_view_picking(self):
         """Transfer belgesini görüntüle"""
@@ -301,4 +492,154 @@ class DeliveryDocument(models.Model):
             'res_model': 'stock.picking',
             'res_id': self.picking_id.id,
             'target': 'current',
-        }
\ No newline at end of file
+        }
+
+    @api.model
+    def _get_driver_domain(self, vehicle_type, date):
+        """Sürücü manifestine giren belgelerin alan adı"""
+        return [('delivery_date', '=', date), ('vehicle_type', '=', vehicle_type), ('state', '!=', 'draft')]
+
+    def _get_driver_slots(self):
+        """Kayıtların sürücü manifesti yuvalarını getir: {belge_id: (araç, tarih)}"""
+        return {
+            record.id: (record.vehicle_type, record.delivery_date)
+            for record in self
+            if record.state != 'draft' and record.vehicle_type and record.delivery_date
+        }
+
+    @api.model
+    def _get_driver_manifest_etag(self, vehicle_type, date, cursor=None, limit=None):
+        """Manifest sürümünü tek toplama sorgusuyla belirle
+
+        Yuvadaki herhangi bir belge değiştiğinde MAX(write_date) ya da sayı,
+        yuvadan belge çıktığında son silinme kaydı değişir; böylece değişmemiş
+        manifest yeniden hazırlanmadan 304 döner.
+        """
+        self.check_access_rights('read')
+        self.flush(['delivery_date', 'vehicle_type', 'state'])
+        query = self._where_calc(self._get_driver_domain(vehicle_type, date))
+        self._apply_ir_rules(query, 'read')
+        query_str, params = query.select('COUNT(*)', 'MAX("delivery_document"."write_date")')
+        self.env.cr.execute(query_str, params)
+        count, last_write = self.env.cr.fetchone()
+        last_removal = self.env['delivery.driver.tombstone']._get_last_change(vehicle_type, date)
+        key = '%s|%s|%s|%s|%s|%s|%s|%s' % (
+            self.env.uid, vehicle_type, date, cursor or '', limit or '', count,
+            last_write and last_write.isoformat(), last_removal and last_removal.isoformat())
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    @api.model
+    def _get_driver_manifest(self, vehicle_type, date, cursor=None, limit=DRIVER_MANIFEST_LIMIT):
+        """Araç ve tarih için sürücü durak listesini write_date imleciyle sayfala
+
+        İmleç son satırın (write_date, id) çiftidir; yalnızca imleçten sonra
+        değişen belgeler döner, böylece kapsama dışından dönen sürücü tek
+        istekle eşitlenir. Son sayfanın imleci ``DRIVER_CURSOR_OVERLAP`` kadar
+        geri alınır; bu pencerede kalan belgeler bir sonraki eşitlemede yeniden
+        gönderilir. İmleçle gelen istekte ``removed`` o tarihten sonra yuvadan
+        çıkan (silinen, taşınan, taslağa dönen) belge kimlikleridir.
+        """
+        limit = min(int(limit or DRIVER_MANIFEST_LIMIT), DRIVER_MANIFEST_MAX_LIMIT)
+        self.check_access_rights('read')
+        self.flush()
+        query = self._where_calc(self._get_driver_domain(vehicle_type, date))
+        self._apply_ir_rules(query, 'read')
+        last_write = None
+        if cursor:
+            last_write, last_id = self._parse_driver_cursor(cursor)
+            query.add_where('("delivery_document"."write_date", "delivery_document"."id") > (%s, %s)',
+                            [last_write, last_id])
+        query.order = '"delivery_document"."write_date", "delivery_document"."id"'
+        query.limit = limit + 1
+        query_str, params = query.select('"delivery_document"."id"', '"delivery_document"."write_date"')
+        self.env.cr.execute(query_str, params)
+        rows = self.env.cr.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        documents = self.browse([row[0] for row in rows])
+        stops = []
+        for document in documents:
+            stops.append({
+                'id': document.id,
+                'name': document.name,
+                'state': document.state,
+                'partner': document.partner_id.name,
+                'phone': document.partner_mobile or document.partner_phone or None,
+                'address': document.delivery_address,
+                'district': document.district,
+                'planning_id': document.planning_id.id or None,
+            })
+
+        removed = []
+        if last_write:
+            # Son sayfa imleci zaten güvenlik payı kadar geri alınmıştır
+            removed_ids = set(self.env['delivery.driver.tombstone']._get_removed_ids(
+                vehicle_type, date, last_write))
+            if removed_ids:
+                # Yuvaya geri dönmüş belgeler silinmiş sayılmaz
+                removed_ids -= set(self.search(
+                    self._get_driver_domain(vehicle_type, date) + [('id', 'in', list(removed_ids))]).ids)
+            removed = sorted(removed_ids)
+
+        if has_more:
+            next_cursor = self._format_driver_cursor(*rows[-1])
+        elif rows:
+            next_cursor = self._format_driver_cursor(0, rows[-1][1] - DRIVER_CURSOR_OVERLAP)
+        else:
+            next_cursor = cursor
+        return {
+            'vehicle': vehicle_type,
+            'date': fields.Date.to_string(date),
+            'stops': stops,
+            'removed': removed,
+            'cursor': next_cursor,
+            'has_more': has_more,
+        }
+
+    @api.model
+    def _format_driver_cursor(self, document_id, write_date):
+        return '%s_%d' % (write_date.isoformat(), document_id)
+
+    @api.model
+    def _parse_driver_cursor(self, cursor):
+        """İmleci (write_date, id) çiftine çevir; geçersizse ValueError"""
+        write_date, document_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(write_date), int(document_id)
+
+    @api.model
+    def _apply_driver_updates(self, updates):
+        """Sürücüden gelen toplu durum güncellemelerini normal geçişlerle uygula
+
+        Güncellemeler hedef duruma göre gruplanıp durum sırasıyla işlenir;
+        aynı belge için hem yolda hem teslim bildirilebilir. Belge zaten hedef
+        durumdaysa tekrar gönderim başarılı sayılır. Dönüş: {belge_id: sonuç}
+        """
+        by_state = {}
+        results = {}
+        for update in updates:
+            document_id = int(update['id'])
+            if update.get('state') not in DRIVER_TRANSITIONS:
+                results[document_id] = 'unsupported_state'
+                continue
+            by_state.setdefault(update['state'], []).append(document_id)
+
+        for state, (source_states, method) in DRIVER_TRANSITIONS.items():
+            ids = by_state.get(state)
+            if not ids:
+                continue
+            documents = self.browse(ids).exists()
+            results.update((document_id, 'not_found') for document_id in set(ids) - set(documents.ids))
+            results.update((document.id, 'ok') for document in documents if document.state == state)
+            invalid = documents.filtered(lambda d: d.state != state and d.state not in source_states)
+            results.update((document.id, 'invalid_state') for document in invalid)
+
+            pending = documents.filtered(lambda d: d.state in source_states)
+            try:
+                with self.env.cr.savepoint():
+                    getattr(pending, method)()
+            except (UserError, ValidationError) as e:
+                results.update((document.id, str(e)) for document in pending)
+            else:
+                results.update((document.id, 'ok') for document in pending)
+        return results
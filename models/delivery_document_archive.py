@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from dateutil.relativedelta import relativedelta
+from datetime import timedelta
+import logging
+
+from .delivery_perf_sample import instrument
+from .delivery_route_stop import DEFAULT_SERVICE_TIME_DAYS
+
+_logger = logging.getLogger(__name__)
+
+# Arşive taşınan durumlar ve belgeyle birlikte kopyalanan kolonlar
+ARCHIVE_STATES = ('delivered', 'cancelled')
+ARCHIVE_COLUMNS = (
+    'name', 'state', 'picking_id', 'planning_id', 'partner_id', 'partner_phone', 'partner_mobile',
+    'delivery_address', 'district', 'delivery_date', 'vehicle_type', 'route_info', 'map_url',
+    'sms_sent_on_road', 'sms_sent_delivered',
+)
+DEFAULT_ARCHIVE_MONTHS = 12
+DEFAULT_ARCHIVE_BATCH_SIZE = 5000
+
+
+class DeliveryDocumentArchive(models.Model):
+    _name = 'delivery.document.archive'
+    _description = 'Arşivlenmiş Teslimat Belgesi'
+    _inherit = ['mail.thread']
+    _order = 'delivery_date desc, name desc'
+
+    original_id = fields.Integer('Belge Kimliği', readonly=True, index=True)
+    name = fields.Char('Teslimat No', readonly=True)
+    state = fields.Selection([
+        ('delivered', 'Teslim Edildi'),
+        ('cancelled', 'İptal'),
+    ], string='Durum', readonly=True)
+    picking_id = fields.Many2one('stock.picking', string='Transfer Belgesi', readonly=True,
+                                 ondelete='set null', index=True)
+    planning_id = fields.Many2one('delivery.planning', string='Teslimat Planlaması', readonly=True,
+                                  ondelete='set null', index=True)
+    partner_id = fields.Many2one('res.partner', string='Müşteri', readonly=True, ondelete='set null')
+    partner_phone = fields.Char('Telefon', readonly=True)
+    partner_mobile = fields.Char('Mobil', readonly=True)
+    delivery_address = fields.Text('Teslimat Adresi', readonly=True)
+    district = fields.Char('İlçe', readonly=True)
+    delivery_date = fields.Date('Teslimat Tarihi', readonly=True, index=True)
+    vehicle_type = fields.Selection(
+        lambda self: self.env['delivery.document']._fields['vehicle_type'].selection,
+        string='Araç Seçimi', readonly=True)
+    route_info = fields.Text('Rota Bilgisi', readonly=True)
+    map_url = fields.Char('Harita URL', readonly=True)
+    sms_sent_on_road = fields.Boolean('Yolda SMS Gönderildi', readonly=True)
+    sms_sent_delivered = fields.Boolean('Teslim SMS Gönderildi', readonly=True)
+    archive_date = fields.Datetime('Arşivlenme Tarihi', readonly=True)
+
+    @api.model
+    def _get_archive_cutoff(self):
+        """Bu tarihten önce teslim tarihi olan kapanmış belgeler arşivlenir"""
+        params = self.env['ir.config_parameter'].sudo()
+        months = int(params.get_param('delivery.archive_months', DEFAULT_ARCHIVE_MONTHS))
+        # Arşivleme durakları da siler; servis süresi tahmininin geriye baktığı
+        # dönem ve en az bir ay her zaman tutulur
+        lookback = int(params.get_param('delivery.service_time_days', DEFAULT_SERVICE_TIME_DAYS))
+        today = fields.Date.context_today(self)
+        return min(today - relativedelta(months=max(months, 1)), today - timedelta(days=lookback))
+
+    @api.model
+    @instrument('cron')
+    def _archive_documents(self, cutoff, limit):
+        """Kapanmış eski belgeleri tek ifadede arşiv tablosuna taşı
+
+        Belgenin mesajları ve ekleri arşiv kaydına aktarılır; takipçi ve
+        etkinlikleri silinir. Durak ve SMS kuyruğu satırları veritabanı
+        tarafında belgeyle birlikte silinir. Dönüş: taşınan belge sayısı.
+        """
+        self.env['delivery.document'].flush()
+        columns = ', '.join(ARCHIVE_COLUMNS)
+        self.env.cr.execute("""
+            WITH moved AS (
+                DELETE FROM delivery_document
+                WHERE id IN (
+                    SELECT id
+                    FROM delivery_document
+                    WHERE state IN %%(states)s
+                      AND delivery_date < %%(cutoff)s
+                    ORDER BY delivery_date, id
+                    LIMIT %%(limit)s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *
+            )
+            INSERT INTO delivery_document_archive
+                (original_id, %(columns)s, archive_date,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT id, %(columns)s, now() at time zone 'UTC',
+                   create_uid, create_date, %%(uid)s, now() at time zone 'UTC'
+            FROM moved
+            RETURNING id, original_id
+        """ % {'columns': columns}, {
+            'states': ARCHIVE_STATES,
+            'cutoff': cutoff,
+            'limit': limit,
+            'uid': self.env.uid,
+        })
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return 0
+
+        archive_ids = [row[0] for row in rows]
+        original_ids = [row[1] for row in rows]
+        for table, model_column in (('mail_message', 'model'), ('ir_attachment', 'res_model')):
+            self.env.cr.execute("""
+                UPDATE %(table)s t
+                SET %(model)s = %%s, res_id = v.id
+                FROM unnest(%%s, %%s) AS v(id, original_id)
+                WHERE t.%(model)s = 'delivery.document' AND t.res_id = v.original_id
+            """ % {'table': table, 'model': model_column}, (self._name, archive_ids, original_ids))
+        for table in ('mail_followers', 'mail_activity'):
+            self.env.cr.execute("""
+                DELETE FROM %s WHERE res_model = 'delivery.document' AND res_id = ANY(%%s)
+            """ % table, (original_ids,))
+
+        self.invalidate_cache()
+        self.env['delivery.report']._schedule_refresh()
+        return len(rows)
+
+    @api.model
+    def _cron_archive(self, batch_size=None):
+        """Eski kapanmış belgeleri parça parça arşivle"""
+        batch_size = batch_size or int(self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.archive_batch_size', DEFAULT_ARCHIVE_BATCH_SIZE))
+        moved = self._archive_documents(self._get_archive_cutoff(), batch_size)
+        _logger.info('Teslimat arşivi: %s belge taşındı', moved)
+        # Parti dolduysa kalanlar için görevi hemen yeniden tetikle
+        if moved >= batch_size:
+            cron = self.env.ref('teslimat.ir_cron_delivery_document_archive', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+        return moved
+
+    @api.model
+    def _get_picking_counts(self, picking_ids):
+        """Transfer başına arşivlenmiş belge sayısını getir"""
+        if not picking_ids:
+            return {}
+        groups = self.sudo().read_group(
+            [('picking_id', 'in', picking_ids)], ['picking_id'], ['picking_id'])
+        return {group['picking_id'][0]: group['picking_id_count'] for group in groups}
+
+    def action_view_picking(self):
+        """Transfer belgesini görüntüle"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Transfer Belgesi'),
+            'view_mode': 'form',
+            'res_model': 'stock.picking',
+            'res_id': self.picking_id.id,
+        }
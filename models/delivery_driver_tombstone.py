@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+
+class DeliveryDriverTombstone(models.Model):
+    _name = 'delivery.driver.tombstone'
+    _description = 'Sürücü Manifestinden Çıkan Belge'
+    _order = 'create_date, id'
+    _rec_name = 'document_id'
+
+    # Belge silinmiş olabileceği için ilişki yerine kimlik tutulur
+    document_id = fields.Integer('Belge', required=True)
+    vehicle_type = fields.Char('Araç', required=True)
+    date = fields.Date('Teslimat Tarihi', required=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS delivery_driver_tombstone_slot_idx
+                ON delivery_driver_tombstone (vehicle_type, date, create_date)
+        """)
+
+    @api.model
+    def _record(self, slots):
+        """Yuvasından çıkan belgeleri kaydet; ``slots`` {belge_id: (araç, tarih)}"""
+        return self.sudo().create([{
+            'document_id': document_id,
+            'vehicle_type': vehicle_type,
+            'date': date,
+        } for document_id, (vehicle_type, date) in slots.items()])
+
+    @api.model
+    def _get_removed_ids(self, vehicle_type, date, since):
+        """Yuvadan ``since`` sonrasında çıkmış belge kimliklerini getir"""
+        self.flush()
+        self.env.cr.execute("""
+            SELECT DISTINCT document_id
+              FROM delivery_driver_tombstone
+             WHERE vehicle_type = %s AND date = %s AND create_date > %s
+        """, (vehicle_type, date, since))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_last_change(self, vehicle_type, date):
+        self.flush()
+        self.env.cr.execute("""
+            SELECT MAX(create_date)
+              FROM delivery_driver_tombstone
+             WHERE vehicle_type = %s AND date = %s
+        """, (vehicle_type, date))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _cron_purge_expired(self):
+        """Teslimat günü geçmiş kayıtları temizle"""
+        self.sudo().search([('date', '<', fields.Date.context_today(self))]).unlink()
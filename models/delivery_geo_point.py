@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+import hashlib
+import logging
+import re
+from ..utils import maps_provider
+from .delivery_perf_sample import instrument
+
+_logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s/]+', re.UNICODE)
+_WHITESPACE_RE = re.compile(r'\s+', re.UNICODE)
+
+
+def normalize_address(address):
+    """Adresi önbellek anahtarı için normalize et"""
+    if not address:
+        return ''
+    # Türkçe büyük I/İ harflerini casefold öncesi doğru küçült
+    address = address.replace('I', 'ı').replace('İ', 'i').casefold()
+    address = _PUNCTUATION_RE.sub(' ', address)
+    return _WHITESPACE_RE.sub(' ', address).strip()
+
+
+def address_hash(address):
+    """Normalize edilmiş adresin özetini getir"""
+    return hashlib.sha1(normalize_address(address).encode('utf-8')).hexdigest()
+
+
+class DeliveryGeoPoint(models.Model):
+    _name = 'delivery.geo.point'
+    _description = 'Teslimat Konum Önbelleği'
+    _rec_name = 'address'
+
+    address_hash = fields.Char('Adres Özeti', required=True, index=True)
+    address = fields.Text('Normalize Adres', required=True)
+    latitude = fields.Float('Enlem', digits=(10, 7), required=True)
+    longitude = fields.Float('Boylam', digits=(10, 7), required=True)
+    partner_id = fields.Many2one('res.partner', string='Müşteri', index=True, ondelete='cascade')
+
+    _sql_constraints = [
+        ('address_hash_uniq', 'unique(address_hash)', 'Bu adres için konum zaten kayıtlı!'),
+    ]
+
+    @api.model
+    def _get_maps_provider(self):
+        """Servis çağrılarında kullanılacak sağlayıcı; 'stub' ağa çıkmaz"""
+        optimizer = self.env['ir.config_parameter'].sudo().get_param('delivery.route_optimizer', 'google')
+        return 'stub' if optimizer == 'stub' else 'google'
+
+    @api.model
+    def _get_maps_client(self, api_key=None):
+        """Sağlayıcının hız sınırlı istemcisini getir; kullanılamıyorsa None"""
+        params = self.env['ir.config_parameter'].sudo()
+        return maps_provider.make_client(
+            self._get_maps_provider(),
+            api_key or params.get_param('delivery.google_maps_api_key'),
+            rate=float(params.get_param('delivery.provider_rate_limit', maps_provider.DEFAULT_RATE_LIMIT)),
+            burst=int(params.get_param('delivery.provider_burst', maps_provider.DEFAULT_BURST)),
+        )
+
+    @api.model
+    def _lookup(self, addresses, partners=None, resolve=True):
+        """Adresleri önbellekte ara; adres -> (id, enlem, boylam) ya da None döndür.
+
+        Önbellekte olmayan adresler ``resolve`` açıksa tek seferde çözülüp
+        kaydedilir.
+        """
+        partners = partners or [None] * len(addresses)
+        hashes = {address: address_hash(address) for address in addresses if address}
+        if not hashes:
+            return {}
+
+        self.flush(['address_hash', 'latitude', 'longitude'])
+        self.env.cr.execute("""
+            SELECT address_hash, id, latitude, longitude
+            FROM delivery_geo_point
+            WHERE address_hash IN %s
+        """, (tuple(set(hashes.values())),))
+        cached = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+        missing = {}
+        for address, partner in zip(addresses, partners):
+            if address and hashes[address] not in cached:
+                missing.setdefault(hashes[address], (address, partner))
+        if missing and resolve:
+            cached.update(self._resolve_missing(list(missing.values())))
+
+        return {address: cached.get(digest) for address, digest in hashes.items()}
+
+    @api.model
+    def _get_coordinates(self, addresses, partners=None, resolve=True):
+        """Adres listesi için koordinatları toplu olarak getir"""
+        points = self._lookup(addresses, partners=partners, resolve=resolve)
+        return {address: point and point[1:] for address, point in points.items()}
+
+    @api.model
+    @instrument('provider')
+    def _resolve_missing(self, entries):
+        """Önbellekte olmayan adresleri sağlayıcıdan çözüp toplu kaydet"""
+        gmaps = self._get_maps_client()
+        if not gmaps:
+            return {}
+
+        rows = {}
+        for address, partner in entries:
+            try:
+                result = gmaps.geocode(address, region='tr')
+            except Exception as e:
+                _logger.warning('Adres konumu çözülemedi: %s (%s)', address, e)
+                continue
+            if not result:
+                continue
+            location = result[0]['geometry']['location']
+            rows[address_hash(address)] = (
+                normalize_address(address), location['lat'], location['lng'], partner.id if partner else None)
+        if not rows:
+            return {}
+
+        # Aynı adresi eşzamanlı çözen işçiler benzersiz özette çakışmaz; var
+        # olan satır korunur ve okunarak döndürülür
+        self.flush(['address_hash'])
+        self.env.cr.execute("""
+            INSERT INTO delivery_geo_point
+                (address_hash, address, latitude, longitude, partner_id,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.address_hash, v.address, v.latitude, v.longitude, v.partner_id,
+                   %%s, now() at time zone 'UTC', %%s, now() at time zone 'UTC'
+            FROM (VALUES %s) AS v(address_hash, address, latitude, longitude, partner_id)
+            ON CONFLICT (address_hash) DO NOTHING
+            RETURNING address_hash, id, latitude, longitude
+        """ % ', '.join(['(%s, %s, %s::float, %s::float, %s::int)'] * len(rows)),
+            [self.env.uid, self.env.uid] + [value for digest, row in rows.items() for value in (digest,) + row])
+        points = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        conflicts = tuple(set(rows) - set(points))
+        if conflicts:
+            self.env.cr.execute("""
+                SELECT address_hash, id, latitude, longitude
+                FROM delivery_geo_point
+                WHERE address_hash IN %s
+            """, (conflicts,))
+            points.update((row[0], row[1:]) for row in self.env.cr.fetchall())
+        return points
+
+    @api.model
+    def _get_document_coordinates(self, documents, resolve=True):
+        """Teslimat belgeleri için koordinatları toplu olarak getir"""
+        coordinates = self._get_coordinates(
+            documents.mapped('delivery_address'),
+            partners=[document.partner_id for document in documents],
+            resolve=resolve,
+        )
+        return {document.id: coordinates.get(document.delivery_address) for document in documents}
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import functools
+import random
+import time
+
+from odoo import api, fields, models, tools
+
+PERF_SAMPLE_MODEL = 'delivery.perf.sample'
+DEFAULT_MAX_SAMPLES = 100000
+
+
+def instrument(kind):
+    """Metodu performans örneklemesiyle sar.
+
+    Ölçüm kapalıyken ek maliyet önbellekten tek bir ayar okumasıdır. Açıkken
+    süre, sorgu sayısı ve kayıt sayısı işlem sonunda toplu olarak yazılır.
+    ``functools.wraps`` ile ``_constrains`` ve ``_depends`` gibi api
+    işaretleri korunur; sarmalayıcı api dekoratörlerinin altında da üstünde
+    de kullanılabilir.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if PERF_SAMPLE_MODEL not in self.env.registry:
+                return method(self, *args, **kwargs)
+            Sample = self.env[PERF_SAMPLE_MODEL]
+            rate = Sample._get_sample_rate()
+            if not rate or random.random() >= rate:
+                return method(self, *args, **kwargs)
+
+            cr = self.env.cr
+            queries = cr.sql_log_count
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                Sample._record(self._name, method.__name__, kind, time.perf_counter() - start,
+                               cr.sql_log_count - queries, len(self), failed)
+        return wrapper
+    return decorator
+
+
+class DeliveryPerfSample(models.Model):
+    _name = PERF_SAMPLE_MODEL
+    _description = 'Teslimat Performans Örneği'
+    _order = 'id desc'
+
+    model = fields.Char('Model', readonly=True, index=True)
+    method = fields.Char('Metot', readonly=True, index=True)
+    kind = fields.Selection([
+        ('action', 'Eylem'),
+        ('constraint', 'Kısıt'),
+        ('compute', 'Hesaplama'),
+        ('provider', 'Dış Servis'),
+        ('read', 'Okuma'),
+        ('cron', 'Zamanlanmış'),
+    ], string='Tür', readonly=True)
+    duration_ms = fields.Float('Süre (ms)', readonly=True, group_operator='avg', digits=(16, 2))
+    query_count = fields.Integer('Sorgu Sayısı', readonly=True, group_operator='avg')
+    record_count = fields.Integer('Kayıt Sayısı', readonly=True)
+    failed = fields.Boolean('Hatalı', readonly=True)
+    user_id = fields.Many2one('res.users', string='Kullanıcı', readonly=True)
+    create_date = fields.Datetime('Tarih', readonly=True, index=True)
+
+    @api.model
+    @tools.ormcache()
+    def _get_sample_rate(self):
+        """Örnekleme oranı; ölçüm kapalıysa 0.
+
+        Sistem parametreleri değiştiğinde önbellek temizlenir.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        if not tools.str2bool(params.get_param('delivery.perf_enabled', 'False')):
+            return 0.0
+        return min(max(float(params.get_param('delivery.perf_sample_rate', 1.0)), 0.0), 1.0)
+
+    @api.model
+    def _record(self, model, method, kind, duration, query_count, record_count, failed=False):
+        """Örneği işlem sonunda yazılmak üzere tampona ekle
+
+        Geri alınan işlemlerin örnekleri de işlemle birlikte kaybolur.
+        """
+        data = self.env.cr.precommit.data
+        buffer = data.get('delivery.perf.samples')
+        if buffer is None:
+            buffer = data['delivery.perf.samples'] = []
+            self.env.cr.precommit.add(self._flush_samples)
+        buffer.append((model, method, kind, duration * 1000.0, query_count, record_count,
+                       failed, self.env.uid))
+
+    @api.model
+    def _flush_samples(self):
+        """Tampondaki örnekleri tek sorguda yaz ve tabloyu sınırlı tut"""
+        samples = self.env.cr.precommit.data.pop('delivery.perf.samples', None)
+        if not samples:
+            return
+        row = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')"
+        self.env.cr.execute("""
+            INSERT INTO delivery_perf_sample
+                (model, method, kind, duration_ms, query_count, record_count, failed, user_id,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES %s
+        """ % ', '.join([row] * len(samples)),
+            [value for sample in samples for value in sample + (sample[-1], sample[-1])])
+
+        max_samples = int(self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.perf_max_samples', DEFAULT_MAX_SAMPLES))
+        self.env.cr.execute("""
+            DELETE FROM delivery_perf_sample
+            WHERE id <= (SELECT MAX(id) FROM delivery_perf_sample) - %s
+        """, (max_samples,))
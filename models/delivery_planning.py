@@ -3,6 +3,9 @@ from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 from datetime import datetime, timedelta
 
+from ..utils import vehicle_planner
+from .delivery_perf_sample import instrument
+
 class DeliveryPlanning(models.Model):
     _name = 'delivery.planning'
     _description = 'Teslimat Planlaması'
@@ -36,18 +39,22 @@ class DeliveryPlanning(models.Model):
     
     notes = fields.Text('Notlar', tracking=True)
     
-    @api.model
-    def create(self, vals):
-        if vals.get('name', '/') == '/':
-            vals['name'] = self.env['ir.sequence'].next_by_code('delivery.planning') or '/'
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        unnamed = [vals for vals in vals_list if vals.get('name', '/') == '/']
+        names = self.env['ir.sequence']._next_block_by_code('delivery.planning', len(unnamed))
+        for vals, name in zip(unnamed, names):
+            vals['name'] = name or '/'
+        return super().create(vals_list)
 
     @api.depends('delivery_ids')
+    @instrument('compute')
     def _compute_delivery_count(self):
         for record in self:
             record.delivery_count = len(record.delivery_ids)
 
     @api.constrains('planning_date', 'vehicle_type')
+    @instrument('constraint')
     def _check_planning_date(self):
         for record in self:
             if record.planning_date:
@@ -59,55 +66,217 @@ class DeliveryPlanning(models.Model):
                 if record.planning_date < fields.Date.context_today(self):
                     raise ValidationError(_('Geçmiş tarih için planlama yapılamaz!'))
 
+    def _get_delivery_summary(self):
+        """Planlamaları ve teslimat belgelerini tek sorguda oku
+
+        Dönüş değeri: {planlama_id: {'name', 'state', 'date', 'deliveries'}}
+        'deliveries' listesi (belge_id, durum, ilçe) üçlülerinden oluşur.
+        """
+        if not self:
+            return {}
+        self.flush(['state', 'planning_date'])
+        self.env['delivery.document'].flush(['planning_id', 'state', 'district'])
+        self.env.cr.execute("""
+            SELECT p.id, p.name, p.state, p.planning_date, d.id, d.state, d.district
+              FROM delivery_planning p
+              LEFT JOIN delivery_document d ON d.planning_id = p.id
+             WHERE p.id IN %s
+        """, [tuple(self.ids)])
+        summary = {}
+        for planning_id, name, state, date, doc_id, doc_state, district in self.env.cr.fetchall():
+            entry = summary.setdefault(planning_id, {
+                'name': name, 'state': state, 'date': date, 'deliveries': [],
+            })
+            if doc_id:
+                entry['deliveries'].append((doc_id, doc_state, district))
+        return summary
+
+    def _check_planning_states(self, summary, allowed_states, message):
+        """Planlama durumlarını özet üzerinden doğrula"""
+        invalid = [entry['name'] for entry in summary.values() if entry['state'] not in allowed_states]
+        if invalid:
+            raise ValidationError('%s\n%s' % (message, ', '.join(sorted(invalid))))
+
+    @instrument('action')
     def action_confirm(self):
         """Planı onayla"""
-        for record in self:
-            if not record.delivery_ids:
+        summary = self._get_delivery_summary()
+        district_day = self.env['delivery.district.day']
+        for entry in summary.values():
+            if not entry['deliveries']:
                 raise ValidationError(_('Planlama için en az bir teslimat belgesi eklenmelidir!'))
-            
+
             # Teslimat belgelerini kontrol et
-            for delivery in record.delivery_ids:
-                if delivery.state != 'ready':
+            weekday = entry['date'].weekday()
+            for doc_id, doc_state, district in entry['deliveries']:
+                if doc_state != 'ready':
                     raise ValidationError(_('Tüm teslimat belgeleri "Hazır" durumunda olmalıdır!'))
-            
-            record.state = 'confirmed'
+                if district and not district_day.check_district_day_compatibility(district, weekday):
+                    raise ValidationError(
+                        _('"%s" ilçesi için planlama günü uygun değil. Uygun günler: %s')
+                        % (district, ', '.join(district_day.get_allowed_day_names_for_district(district)))
+                    )
+
+        self.write({'state': 'confirmed'})
 
+    @instrument('action')
     def action_start(self):
         """Planlamayı başlat"""
-        for record in self:
-            if record.state != 'confirmed':
-                raise ValidationError(_('Sadece onaylanmış planlamalar başlatılabilir!'))
-            
-            # Teslimat belgelerini "Yolda" durumuna geçir
-            record.delivery_ids.write({'state': 'on_road'})
-            record.state = 'in_progress'
+        summary = self._get_delivery_summary()
+        self._check_planning_states(
+            summary, ('confirmed',), _('Sadece onaylanmış planlamalar başlatılabilir!'))
+
+        # Hazır teslimat belgelerini tek seferde "Yolda" durumuna geçir
+        documents = self.env['delivery.document']
+        ready = documents.browse([
+            doc_id for entry in summary.values()
+            for doc_id, doc_state, district in entry['deliveries'] if doc_state == 'ready'
+        ])
+        ready._apply_transition('on_road')
+        self.write({'state': 'in_progress'})
 
+    @instrument('action')
     def action_done(self):
         """Planlamayı tamamla"""
-        for record in self:
-            if record.state != 'in_progress':
-                raise ValidationError(_('Sadece devam eden planlamalar tamamlanabilir!'))
-            
-            # Tüm teslimatların tamamlandığını kontrol et
-            if any(delivery.state != 'delivered' for delivery in record.delivery_ids):
-                raise ValidationError(_('Tüm teslimatlar tamamlanmadan planlama bitirilemez!'))
-            
-            record.state = 'done'
+        summary = self._get_delivery_summary()
+        self._check_planning_states(
+            summary, ('in_progress',), _('Sadece devam eden planlamalar tamamlanabilir!'))
+
+        # Tüm teslimatların tamamlandığını kontrol et
+        if any(doc_state != 'delivered'
+               for entry in summary.values() for doc_id, doc_state, district in entry['deliveries']):
+            raise ValidationError(_('Tüm teslimatlar tamamlanmadan planlama bitirilemez!'))
+
+        self.write({'state': 'done'})
 
+    @instrument('action')
     def action_cancel(self):
         """Planlamayı iptal et"""
-        for record in self:
-            if record.state in ['done']:
-                raise ValidationError(_('Tamamlanmış planlamalar iptal edilemez!'))
-            
-            # Teslimat belgelerini "Hazır" durumuna geri al
-            record.delivery_ids.write({'state': 'ready'})
-            record.state = 'cancelled'
+        summary = self._get_delivery_summary()
+        self._check_planning_states(
+            summary, ('draft', 'confirmed', 'in_progress', 'cancelled'),
+            _('Tamamlanmış planlamalar iptal edilemez!'))
+
+        # Yoldaki teslimat belgelerini "Hazır" durumuna geri al
+        on_road = self.env['delivery.document'].browse([
+            doc_id for entry in summary.values()
+            for doc_id, doc_state, district in entry['deliveries'] if doc_state == 'on_road'
+        ])
+        on_road._apply_transition('ready')
+        self.write({'state': 'cancelled'})
 
+    @instrument('action')
     def action_reset_to_draft(self):
         """Taslağa dönüştür"""
-        for record in self:
-            record.state = 'draft'
+        self.write({'state': 'draft'})
+
+    def _get_delivery_coordinates(self, resolve=True):
+        """Planlamalardaki tüm teslimatların koordinatlarını toplu olarak getir"""
+        return self.env['delivery.geo.point']._get_document_coordinates(
+            self.mapped('delivery_ids'), resolve=resolve)
+
+    @api.model
+    @instrument('action')
+    def _auto_plan(self, date):
+        """Tarihteki hazır teslimatları araçlara dağıtıp planlama ve rotaları oluştur.
+
+        Oluşturulan planlamalar ile atanamayan teslimat belgelerini döndürür.
+        """
+        documents = self.env['delivery.document'].search([
+            ('delivery_date', '=', date),
+            ('state', '=', 'ready'),
+            ('planning_id', '=', False),
+        ])
+        if not documents:
+            return self.browse(), documents
+
+        # İlçe-gün kurallarına uymayan belgeler planlamaya alınmaz
+        district_day = self.env['delivery.district.day']
+        weekday = date.weekday()
+        eligible = documents.filtered(
+            lambda d: district_day.check_district_day_compatibility(d.district, weekday))
+
+        # Araç kapasitesi: defterde kalan + bu çalıştırmada serbest kalacak yerler
+        slot_model = self.env['delivery.capacity.slot']
+        vehicle_types = [key for key, _label in self._fields['vehicle_type'].selection]
+        capacities = {
+            vehicle_type: slot_model.get_remaining_capacity(date, vehicle_type)
+            + len(eligible.filtered(lambda d: d.vehicle_type == vehicle_type))
+            for vehicle_type in vehicle_types
+        }
+        # İlçe kapasitesi de aynı şekilde; kullanım tek sorguda okunur
+        districts = set(eligible.mapped('district')) - {False, ''}
+        usage = slot_model._get_slot_usage(date, date, districts)
+        district_capacities = {
+            (vehicle_type, district): slot_model._get_slot_capacity(date, district)
+            - usage.get((date, vehicle_type, district), 0)
+            + len(eligible.filtered(lambda d: d.vehicle_type == vehicle_type and d.district == district))
+            for vehicle_type in vehicle_types for district in districts
+        }
+
+        coordinates = self.env['delivery.geo.point']._get_document_coordinates(eligible)
+        params = self.env['ir.config_parameter'].sudo()
+        depot_address = params.get_param('delivery.depot_address')
+        depot = depot_address and self.env['delivery.geo.point']._get_coordinates([depot_address]).get(depot_address)
+        stops = [{
+            'id': document.id,
+            'region': district_day.get_district_region(document.district),
+            'district': document.district,
+            'lat': coordinates[document.id][0] if coordinates.get(document.id) else None,
+            'lng': coordinates[document.id][1] if coordinates.get(document.id) else None,
+        } for document in eligible]
+        assignments, unassigned_ids = vehicle_planner.plan(
+            stops, capacities, depot=depot, district_capacities=district_capacities)
+
+        # Aracı değişen belgelerin yerleri önce topluca bırakılır, sonra tek
+        # sıralı geçişte yeniden ayrılır; böylece araçlar arası takaslar sıraya
+        # bağlı olarak reddedilmez
+        Document = self.env['delivery.document']
+        moving = {
+            vehicle_type: Document.browse(ids).filtered(lambda d: d.vehicle_type != vehicle_type)
+            for vehicle_type, ids in assignments.items()
+        }
+        rejected = Document.browse()
+        try:
+            with self.env.cr.savepoint():
+                all_moving = Document.union(*moving.values())
+                all_moving._release_capacity()
+                for vehicle_type, documents_to_move in moving.items():
+                    documents_to_move.with_context(delivery_capacity_moved=True).write(
+                        {'vehicle_type': vehicle_type})
+                all_moving._reserve_capacity()
+        except ValidationError:
+            # Eşzamanlı bir değişiklik yüzünden sığmadıysa belge başına denenir;
+            # yalnızca gerçekten sığmayan belge eski aracında kalır
+            for vehicle_type, documents_to_move in moving.items():
+                for document in documents_to_move:
+                    try:
+                        with self.env.cr.savepoint():
+                            document.write({'vehicle_type': vehicle_type})
+                    except ValidationError:
+                        rejected |= document
+        assignments = {
+            vehicle_type: [doc_id for doc_id in ids if doc_id not in rejected.ids]
+            for vehicle_type, ids in assignments.items()
+        }
+        assignments = {vehicle_type: ids for vehicle_type, ids in assignments.items() if ids}
+
+        plannings = self.create([{
+            'planning_date': date,
+            'vehicle_type': vehicle_type,
+        } for vehicle_type in assignments])
+        for planning in plannings:
+            Document.browse(assignments[planning.vehicle_type]).write({'planning_id': planning.id})
+
+        if depot_address:
+            self.env['delivery.route'].create([{
+                'planning_id': planning.id,
+                'start_location': depot_address,
+                'end_location': depot_address,
+            } for planning in plannings])
+
+        unassigned = (documents - eligible) | Document.browse(unassigned_ids) | rejected
+        return plannings, unassigned
 
     def action_view_deliveries(self):
         """Teslimat belgelerini görüntüle"""
@@ -120,32 +289,3 @@ class DeliveryPlanning(models.Model):
             'domain': [('planning_id', '=', self.id)],
             'context': {'create': False},
         }
-
-class DeliveryDistrictDay(models.Model):
-    _name = 'delivery.district.day'
-    _description = 'İlçe-Gün Eşleştirmesi'
-    _rec_name = 'district'
-
-    planning_id = fields.Many2one('delivery.planning', string='Planlama', 
-                                 required=True, ondelete='cascade')
-    
-    district = fields.Char('İlçe', required=True)
-    
-    day = fields.Selection([
-        ('monday', 'Pazartesi'),
-        ('tuesday', 'Salı'),
-        ('wednesday', 'Çarşamba'),
-        ('thursday', 'Perşembe'),
-        ('friday', 'Cuma'),
-        ('saturday', 'Cumartesi'),
-    ], string='Gün', required=True)
-    
-    region = fields.Selection([
-        ('anadolu', 'Anadolu Yakası'),
-        ('avrupa', 'Avrupa Yakası'),
-    ], string='Bölge', required=True)
-    
-    _sql_constraints = [
-        ('unique_district_day', 'unique(district, day)', 
-         'Aynı ilçe için aynı gün birden fazla kez tanımlanamaz!'),
-    ]
\ No newline at end of file
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from datetime import datetime, timedelta
+from .delivery_perf_sample import instrument
+
+# Rapora yansıyan alanlar; bunlar değiştiğinde yenileme planlanır
+REPORT_DOCUMENT_FIELDS = ('state', 'delivery_date', 'district', 'vehicle_type', 'planning_id')
+REPORT_ROUTE_FIELDS = ('planning_id', 'total_distance', 'total_duration')
+
 
 class DeliveryReport(models.Model):
     _name = 'delivery.report'
@@ -18,31 +24,56 @@ class DeliveryReport(models.Model):
     avg_delivery_time = fields.Float('Ortalama Teslimat Süresi (dk)')
 
     def _select(self):
+        # Kimlik, gruptaki en küçük belge numarasıdır; yenilemeler arasında sabit kalır
         return """
             SELECT
-                row_number() OVER () as id,
+                MIN(d.id) as id,
                 d.delivery_date as date,
                 d.district,
                 d.vehicle_type,
                 COUNT(*) as delivery_count,
-                COALESCE(r.total_distance, 0) as total_distance,
-                COALESCE(r.total_duration, 0) as total_duration,
-                CASE 
-                    WHEN COUNT(*) > 0 THEN 
-                        (COUNT(*) FILTER (WHERE d.state = 'delivered')::float / COUNT(*)::float) * 100 
-                    ELSE 0 
-                END as success_rate,
-                CASE 
-                    WHEN COUNT(*) > 0 THEN 
-                        COALESCE(r.total_duration, 0) / COUNT(*)::float 
-                    ELSE 0 
-                END as avg_delivery_time
+                COALESCE(SUM(r.distance_share), 0) as total_distance,
+                COALESCE(SUM(r.duration_share), 0) as total_duration,
+                (COUNT(*) FILTER (WHERE d.state = 'delivered')::float / COUNT(*)::float) * 100 as success_rate,
+                COALESCE(SUM(r.duration_share), 0) / COUNT(*)::float as avg_delivery_time
         """
 
     def _from(self):
+        # Rota toplamları planlama başına tek satıra indirilip belgelere eşit
+        # paylaştırılır; böylece birden çok rota satırları çoğaltmaz
+        # Arşivlenmiş belgeler UNION ALL ile eklenir; kimlik çakışmasın diye
+        # arşiv satırlarının kimliği negatif alınır
         return """
-            FROM delivery_document d
-            LEFT JOIN delivery_route r ON r.planning_id = d.planning_id
+            FROM (
+                SELECT id, delivery_date, district, vehicle_type, state, planning_id
+                FROM delivery_document
+                UNION ALL
+                SELECT -id, delivery_date, district, vehicle_type, state, planning_id
+                FROM delivery_document_archive
+            ) d
+            LEFT JOIN (
+                SELECT
+                    rt.planning_id,
+                    rt.total_distance / pc.document_count as distance_share,
+                    rt.total_duration / pc.document_count as duration_share
+                FROM (
+                    SELECT planning_id,
+                           SUM(total_distance) as total_distance,
+                           SUM(total_duration) as total_duration
+                    FROM delivery_route
+                    GROUP BY planning_id
+                ) rt
+                JOIN (
+                    SELECT planning_id, COUNT(*) as document_count
+                    FROM (
+                        SELECT planning_id FROM delivery_document
+                        UNION ALL
+                        SELECT planning_id FROM delivery_document_archive
+                    ) documents
+                    WHERE planning_id IS NOT NULL
+                    GROUP BY planning_id
+                ) pc ON pc.planning_id = rt.planning_id
+            ) r ON r.planning_id = d.planning_id
         """
 
     def _group_by(self):
@@ -50,22 +81,57 @@ class DeliveryReport(models.Model):
             GROUP BY
                 d.delivery_date,
                 d.district,
-                d.vehicle_type,
-                r.total_distance,
-                r.total_duration
+                d.vehicle_type
         """
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute("""
-            CREATE or REPLACE VIEW %s as (
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = cr.fetchone()
+        if row and row[0] == 'm':
+            cr.execute("DROP MATERIALIZED VIEW %s" % self._table)
+        else:
+            tools.drop_view_if_exists(cr, self._table)
+        cr.execute("""
+            CREATE MATERIALIZED VIEW %s as (
                 %s
                 %s
                 %s
             )
         """ % (self._table, self._select(), self._from(), self._group_by()))
+        # Eşzamanlı yenileme benzersiz bir indeks gerektirir
+        cr.execute("CREATE UNIQUE INDEX %s_id_uniq ON %s (id)" % (self._table, self._table))
+        cr.execute("CREATE INDEX %s_date_district_vehicle_idx ON %s (date, district, vehicle_type)"
+                   % (self._table, self._table))
+
+    @api.model
+    @instrument('cron')
+    def _refresh(self):
+        """Raporu okumaları engellemeden yenile"""
+        self.env['delivery.document'].flush()
+        self.env['delivery.document.archive'].flush()
+        self.env['delivery.route'].flush()
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_cache()
+
+    @api.model
+    def _cron_refresh(self):
+        self._refresh()
+
+    @api.model
+    def _schedule_refresh(self):
+        """İşlem başına bir kez gecikmeli yenileme planla"""
+        data = self.env.cr.precommit.data
+        if data.get('delivery.report.refresh_scheduled'):
+            return
+        data['delivery.report.refresh_scheduled'] = True
+        cron = self.env.ref('teslimat.ir_cron_delivery_report_refresh', raise_if_not_found=False)
+        if cron:
+            delay = int(self.env['ir.config_parameter'].sudo().get_param('delivery.report_refresh_delay', 5))
+            cron.sudo()._trigger(at=fields.Datetime.now() + timedelta(minutes=delay))
 
     @api.model
+    @instrument('read')
     def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
         res = super(DeliveryReport, self).read_group(domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
-        return res 
\ No newline at end of file
+        return res
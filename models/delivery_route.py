@@ -1,9 +1,51 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
-import googlemaps
+from odoo.service.model import PG_CONCURRENCY_ERRORS_TO_RETRY
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2 import errorcodes
 import json
+import logging
+import psycopg2
+import pytz
+import random
+import threading
+import time
 from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from ..utils import polyline, route_solver
+from .delivery_report import REPORT_ROUTE_FIELDS
+from .delivery_travel_matrix import _pack, _unpack
+from .delivery_perf_sample import instrument
+
+_logger = logging.getLogger(__name__)
+
+# Kalkış saati için kullanıcı saat dilimi yoksa kullanılan bölge
+DEFAULT_TIMEZONE = 'Europe/Istanbul'
+# Toplu optimizasyonda varsayılan işçi sayısı ve eşzamanlılık hatalarında deneme sayısı
+DEFAULT_OPTIMIZE_WORKERS = 4
+OPTIMIZE_ATTEMPTS = 3
+# Ortak önbellek satırlarına (konum, matris) aynı anda yazan işçiler bu
+# hataları alabilir; işlem geri alınıp rota yeniden denenir
+OPTIMIZE_RETRY_PGCODES = PG_CONCURRENCY_ERRORS_TO_RETRY + (
+    errorcodes.UNIQUE_VIOLATION, errorcodes.IN_FAILED_SQL_TRANSACTION)
+
+
+def _is_retryable(error):
+    """Hata zincirinde yeniden denenebilir bir veritabanı hatası var mı"""
+    while error is not None:
+        if isinstance(error, psycopg2.Error) and error.pgcode in OPTIMIZE_RETRY_PGCODES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _new_optimize_result(route_id):
+    """Toplu optimizasyonda rota başına boş sonuç sözlüğü"""
+    return {'route_id': route_id, 'name': False, 'status': 'failed', 'optimizer': False,
+            'total_distance': 0.0, 'total_duration': 0.0, 'error': False}
+
 
 class DeliveryRoute(models.Model):
     _name = 'delivery.route'
@@ -20,12 +62,24 @@ class DeliveryRoute(models.Model):
     # Rota Detayları
     start_location = fields.Char('Başlangıç Noktası', required=True, tracking=True)
     end_location = fields.Char('Bitiş Noktası', required=True, tracking=True)
-    waypoints = fields.Text('Ara Noktalar', tracking=True)
+    waypoints = fields.Text('Ara Noktalar')
     
     # Optimizasyon Sonuçları
-    total_distance = fields.Float('Toplam Mesafe (km)', tracking=True)
-    total_duration = fields.Float('Toplam Süre (dk)', tracking=True)
-    optimized_route = fields.Text('Optimize Edilmiş Rota', tracking=True)
+    # Sonuç alanları izlenmez; her optimizasyon kompakt bir revizyon ve tek
+    # özet mesaj olarak kaydedilir (delivery.route.revision)
+    total_distance = fields.Float('Toplam Mesafe (km)')
+    total_duration = fields.Float('Toplam Süre (dk)')
+    # Sonuç sıkıştırılmış tutulur: durak sırası ve bacak başına mesafe/süre
+    # paketlenmiş diziler, rota şekli kodlanmış çoklu çizgi olarak saklanır.
+    # Görüntülenecek metin, harita ve adres yalnızca istendiğinde çözülür.
+    stop_data = fields.Binary('Durak Sırası', attachment=False)
+    leg_distance_data = fields.Binary('Bacak Mesafeleri (m)', attachment=False)
+    leg_duration_data = fields.Binary('Bacak Süreleri (sn)', attachment=False)
+    route_polyline = fields.Text('Rota Geometrisi')
+    optimized_route = fields.Text('Optimize Edilmiş Rota', compute='_compute_optimized_route')
+    stop_ids = fields.One2many('delivery.route.stop', 'route_id', string='Duraklar', readonly=True)
+    revision_ids = fields.One2many('delivery.route.revision', 'route_id', string='Revizyonlar',
+                                   readonly=True)
     
     # Durum
     state = fields.Selection([
@@ -39,85 +93,446 @@ class DeliveryRoute(models.Model):
     api_key = fields.Char('Google Maps API Key', 
                          default=lambda self: self.env['ir.config_parameter'].sudo().get_param('delivery.google_maps_api_key'))
     
-    @api.model
-    def create(self, vals):
-        if vals.get('name', _('Yeni')) == _('Yeni'):
-            vals['name'] = self.env['ir.sequence'].next_by_code('delivery.route') or _('Yeni')
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        unnamed = [vals for vals in vals_list if vals.get('name', _('Yeni')) == _('Yeni')]
+        names = self.env['ir.sequence']._next_block_by_code('delivery.route', len(unnamed))
+        for vals, name in zip(unnamed, names):
+            vals['name'] = name or _('Yeni')
+        routes = super().create(vals_list)
+        self.env['delivery.report']._schedule_refresh()
+        return routes
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'stop_data' in vals:
+            self._rebuild_stops()
+        if any(field in vals for field in REPORT_ROUTE_FIELDS):
+            self.env['delivery.report']._schedule_refresh()
+        return res
 
+    def _rebuild_stops(self):
+        """Durak ve ETA kayıtlarını paketlenmiş optimizasyon sonucundan yeniden oluştur"""
+        Stop = self.env['delivery.route.stop'].sudo()
+        Stop.search([('route_id', 'in', self.ids)]).unlink()
+        routes = self.filtered('stop_data')
+        if not routes:
+            return
+        estimates = Stop._get_service_estimates()
+        vals_list = []
+        for route in routes:
+            vals_list += Stop._prepare_stop_vals(
+                route, list(_unpack(route.stop_data, 'i')),
+                list(_unpack(route.leg_duration_data, 'I')), estimates)
+        Stop.create(vals_list)
+
+    @instrument('action')
     def action_optimize_route(self):
         """Rotayı optimize et"""
         self.ensure_one()
-        
-        if not self.api_key:
-            raise ValidationError(_('Google Maps API anahtarı tanımlanmamış!'))
-        
-        try:
-            # Google Maps istemcisini oluştur
-            gmaps = googlemaps.Client(key=self.api_key)
-            
-            # Teslimat noktalarını al
-            delivery_points = self.planning_id.delivery_ids.mapped('delivery_address')
-            
-            # Rota optimizasyonu için istek
+
+        vals = None
+        used = 'local'
+        optimizer = self.env['ir.config_parameter'].sudo().get_param('delivery.route_optimizer', 'google')
+        gmaps = optimizer != 'local' and self.env['delivery.geo.point']._get_maps_client(self.api_key)
+        if gmaps:
+            try:
+                vals = self._optimize_with_google(gmaps)
+                used = self.env['delivery.geo.point']._get_maps_provider()
+            except Exception as e:
+                # Sağlayıcıya ulaşılamazsa yerel çözücüyle devam et
+                _logger.warning('Google rota optimizasyonu başarısız, yerel çözücü kullanılıyor: %s', e)
+
+        if vals is None:
+            try:
+                vals = self._optimize_locally(fetch_missing=optimizer != 'local')
+            except ValidationError:
+                raise
+            except Exception as e:
+                raise ValidationError(_('Rota optimizasyonu sırasında hata oluştu: %s') % str(e))
+
+        self._apply_optimization(vals, used)
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Başarılı'),
+                'message': _('Rota başarıyla optimize edildi.'),
+                'sticky': False,
+                'type': 'success'
+            }
+        }
+
+    def _apply_optimization(self, vals, optimizer):
+        """Optimizasyon sonucunu izleme kaydı üretmeden yaz ve revizyonunu kaydet"""
+        self.ensure_one()
+        previous = (self.stop_data, self.total_distance, self.total_duration, self.state)
+        self.with_context(mail_notrack=True).write(vals)
+        return self.env['delivery.route.revision']._record(self, previous, optimizer)
+
+    @api.model
+    def _get_routes_to_optimize(self, date):
+        """Tarihteki taslak rotaları getir"""
+        return self.search([('planning_id.planning_date', '=', date), ('state', '=', 'draft')])
+
+    def _prefetch_locations(self, env):
+        """Rotaların tüm noktalarını verilen ortamda tek seferde çöz
+
+        Ortak noktalar (depo gibi) işçiler başlamadan kaydedilir; böylece
+        işçiler aynı konum satırını yazmak için yarışmaz.
+        """
+        addresses, partners = [], []
+        for route in env['delivery.route'].browse(self.ids):
+            deliveries = route.planning_id.delivery_ids
+            addresses += [route.start_location, route.end_location] + deliveries.mapped('delivery_address')
+            partners += [None, None] + [delivery.partner_id for delivery in deliveries]
+        env['delivery.geo.point']._lookup(addresses, partners=partners)
+
+    def _get_uncommitted_routes(self):
+        """Yeni bir imleçten farklı görünen, yani kaydedilmemiş değişikliği olan rotaları getir
+
+        Rota, planlama ve planlama belgelerinin satır sürümleri (xmin) bu
+        işlemde ve yeni bir imleçte karşılaştırılır.
+        """
+        self.flush()
+        self.env['delivery.planning'].flush()
+        self.env['delivery.document'].flush()
+        query = """
+            SELECT r.id, r.xmin::text, p.xmin::text,
+                   (SELECT array_agg(d.xmin::text ORDER BY d.id)
+                      FROM delivery_document d
+                     WHERE d.planning_id = p.id)
+              FROM delivery_route r
+              LEFT JOIN delivery_planning p ON p.id = r.planning_id
+             WHERE r.id IN %s
+        """
+        self.env.cr.execute(query, [tuple(self.ids)])
+        current = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        with self.env.registry.cursor() as cr:
+            cr.execute(query, [tuple(self.ids)])
+            committed = {row[0]: row[1:] for row in cr.fetchall()}
+        return self.browse([route_id for route_id in self.ids if committed.get(route_id) != current.get(route_id)])
+
+    def _run_optimization(self, result):
+        """Taslak rotayı optimize edip sonucu ``result`` sözlüğüne yaz"""
+        self.ensure_one()
+        result['name'] = self.name
+        if self.state != 'draft':
+            result['status'] = 'skipped'
+            return result
+        self.action_optimize_route()
+        result.update(
+            status='ok',
+            optimizer=self.revision_ids[:1].optimizer,
+            total_distance=self.total_distance,
+            total_duration=self.total_duration,
+            error=False,
+        )
+        return result
+
+    def _optimize_in_transaction(self):
+        """Rotaları mevcut işlemde sırayla, her biri kendi savepoint'inde optimize et"""
+        results = []
+        for route in self:
+            started = time.monotonic()
+            result = _new_optimize_result(route.id)
+            try:
+                with self.env.cr.savepoint():
+                    route._run_optimization(result)
+            except Exception as e:
+                result['error'] = str(e)
+            result['duration_ms'] = (time.monotonic() - started) * 1000.0
+            if result['status'] == 'failed':
+                _logger.warning('Rota %s optimize edilemedi: %s', route.name, result['error'])
+                route.message_post(body=_('Toplu optimizasyon başarısız: %s') % result['error'],
+                                   subtype_xmlid='mail.mt_note')
+            results.append(result)
+        return results
+
+    def _optimize_concurrently(self, max_workers=None):
+        """Rotaları sınırlı bir iş parçacığı havuzunda optimize et
+
+        Her işçi kendi imlecini açar ve rotasını ayrı işlemde kaydeder; bir
+        rotanın hatası diğerlerini etkilemez. Sağlayıcı çağrıları süreç
+        içinde paylaşılan hız sınırlayıcıdan geçer. İşçiler yalnızca
+        kaydedilmiş veriyi görür; bu işlemde oluşturulmuş ya da değiştirilmiş
+        rotalar mevcut imleçte sırayla optimize edilir.
+
+        İşçilerin kaydettikleri bu işlemin anlık görüntüsünde görünmez;
+        sonuçlar rotalar yeniden okunarak değil, dönen listeden kullanılmalıdır.
+        Dönüş: rota başına {'route_id', 'name', 'status', 'optimizer',
+        'total_distance', 'total_duration', 'error', 'duration_ms'} listesi.
+        """
+        if not self:
+            return []
+        local = self._get_uncommitted_routes()
+        results = {result['route_id']: result for result in local._optimize_in_transaction()}
+        routes = self - local
+        if not routes:
+            return [results[route_id] for route_id in self.ids]
+
+        registry = self.env.registry
+        uid, context = self.env.uid, dict(self.env.context)
+        workers = int(max_workers or self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.optimize_workers', DEFAULT_OPTIMIZE_WORKERS))
+        workers = max(min(workers, len(routes)), 1)
+
+        with registry.cursor() as cr:
+            routes._prefetch_locations(api.Environment(cr, uid, context))
+
+        def optimize(route_id):
+            threading.current_thread().dbname = registry.db_name
+            threading.current_thread().uid = uid
+            started = time.monotonic()
+            result = _new_optimize_result(route_id)
+            for attempt in range(OPTIMIZE_ATTEMPTS):
+                try:
+                    with registry.cursor() as cr:
+                        api.Environment(cr, uid, context)['delivery.route'].browse(
+                            route_id)._run_optimization(result)
+                    break
+                except Exception as e:
+                    result.update(status='failed', error=str(e))
+                    if attempt + 1 == OPTIMIZE_ATTEMPTS or not _is_retryable(e):
+                        break
+                    time.sleep(random.uniform(0.1, 0.5) * 2 ** attempt)
+            result['duration_ms'] = (time.monotonic() - started) * 1000.0
+            if result['status'] == 'failed':
+                _logger.warning('Rota %s optimize edilemedi: %s', result['name'] or route_id, result['error'])
+                with registry.cursor() as cr:
+                    api.Environment(cr, uid, context)['delivery.route'].browse(route_id).message_post(
+                        body=_('Toplu optimizasyon başarısız: %s') % result['error'],
+                        subtype_xmlid='mail.mt_note')
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='delivery_route') as executor:
+            results.update((result['route_id'], result) for result in executor.map(optimize, routes.ids))
+        return [results[route_id] for route_id in self.ids]
+
+    @api.model
+    def _get_batch_notification(self, results):
+        """Toplu optimizasyon sonuçlarını bildirim eylemine çevir"""
+        done = [result for result in results if result['status'] == 'ok']
+        failed = [result for result in results if result['status'] == 'failed']
+        message = _('%s rota optimize edildi, %s rota başarısız.') % (len(done), len(failed))
+        if failed:
+            message += '\n' + '\n'.join(
+                '%s: %s' % (result['name'] or result['route_id'], result['error']) for result in failed)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Toplu Rota Optimizasyonu'),
+                'message': message,
+                'sticky': bool(failed),
+                'type': 'warning' if failed else 'success',
+            }
+        }
+
+    @instrument('action')
+    def action_optimize_batch(self):
+        """Seçili taslak rotaları paralel optimize et"""
+        routes = self.filtered(lambda r: r.state == 'draft')
+        if not routes:
+            raise ValidationError(_('Optimize edilecek taslak rota seçilmedi!'))
+        return self._get_batch_notification(routes._optimize_concurrently())
+
+    @api.model
+    @instrument('cron')
+    def _cron_optimize_next_day(self):
+        """Ertesi günün taslak rotalarını gece paralel optimize et"""
+        date = fields.Date.context_today(self) + timedelta(days=1)
+        results = self._get_routes_to_optimize(date)._optimize_concurrently()
+        _logger.info('Toplu rota optimizasyonu (%s): %s başarılı, %s başarısız', date,
+                     len([r for r in results if r['status'] == 'ok']),
+                     len([r for r in results if r['status'] == 'failed']))
+        return results
+
+    @instrument('provider')
+    def _optimize_with_google(self, gmaps=None):
+        """Rotayı Google Directions servisiyle (ya da sahte sağlayıcıyla) optimize et"""
+        self.ensure_one()
+        # Hız sınırlı sağlayıcı istemcisini al
+        gmaps = gmaps or self.env['delivery.geo.point']._get_maps_client(self.api_key)
+        if not gmaps:
+            raise ValidationError(_('Google Maps API anahtarı tanımlı değil!'))
+
+        # Teslimat noktalarını al
+        deliveries = self.planning_id.delivery_ids
+
+        # Konumu önbellekte olan noktalar koordinat olarak gönderilir
+        coordinates = self.planning_id._get_delivery_coordinates()
+        waypoints = [
+            '%s,%s' % coordinates[delivery.id] if coordinates.get(delivery.id) else delivery.delivery_address
+            for delivery in deliveries
+        ]
+
+        # Rota optimizasyonu için istek
+        result = gmaps.directions(
+            origin=self.start_location,
+            destination=self.end_location,
+            waypoints=waypoints,
+            optimize_waypoints=True,
+            mode="driving"
+        )
+
+        if not result:
+            raise ValidationError(_('Rota hesaplanamadı!'))
+
+        # Sonuçları kaydet
+        route = result[0]
+        legs = route['legs']
+        order = route.get('waypoint_order') or list(range(len(deliveries)))
+        return self._prepare_result_vals(
+            [deliveries[index].id for index in order],
+            [leg['distance']['value'] for leg in legs],
+            [leg['duration']['value'] for leg in legs],
+            route.get('overview_polyline', {}).get('points'),
+        )
+
+    @instrument('action')
+    def _optimize_locally(self, fetch_missing=True):
+        """Rotayı önbellekteki matris ve yerel çözücüyle optimize et"""
+        self.ensure_one()
+        deliveries, addresses, points, distance, duration = self._get_cost_matrices(fetch_missing=fetch_missing)
+        path = route_solver.solve(duration)
+        legs = list(zip(path[:-1], path[1:]))
+        # Yerel çözümde yol şekli bilinmez; çizgi duraklardan geçer
+        return self._prepare_result_vals(
+            [deliveries[index - 1].id for index in path[1:-1]],
+            [int(round(distance[previous, current])) for previous, current in legs],
+            [int(round(duration[previous, current])) for previous, current in legs],
+            polyline.encode([points[index][1:] for index in path]),
+        )
+
+    @api.model
+    def _prepare_result_vals(self, stop_ids, leg_distances, leg_durations, encoded_polyline):
+        """Optimizasyon sonucunu paketlenmiş alan değerlerine çevir
+
+        ``leg_distances`` (m) ve ``leg_durations`` (sn) başlangıçtan her
+        durağa ve son duraktan bitişe giden bacaklardır.
+        """
+        return {
+            'stop_data': _pack(stop_ids, 'i'),
+            'leg_distance_data': _pack(leg_distances, 'I'),
+            'leg_duration_data': _pack(leg_durations, 'I'),
+            'route_polyline': encoded_polyline or False,
+            'total_distance': sum(leg_distances) / 1000.0,  # km'ye çevir
+            'total_duration': sum(leg_durations) / 60.0,  # dakikaya çevir
+            'state': 'optimized',
+        }
+
+    def _get_route_stops(self):
+        """Optimize edilmiş durakları (belge, bacak mesafesi m, bacak süresi sn) olarak çöz"""
+        self.ensure_one()
+        stop_ids = list(_unpack(self.stop_data, 'i'))
+        documents = self.env['delivery.document'].browse(stop_ids).exists()
+        by_id = {document.id: document for document in documents}
+        return [
+            (by_id[stop_id], distance, duration)
+            for stop_id, distance, duration in zip(
+                stop_ids, _unpack(self.leg_distance_data, 'I'), _unpack(self.leg_duration_data, 'I'))
+            if stop_id in by_id
+        ]
+
+    @api.depends('stop_data', 'leg_distance_data', 'leg_duration_data')
+    def _compute_optimized_route(self):
+        for route in self:
+            if not route.stop_data:
+                route.optimized_route = False
+                continue
+            route.optimized_route = json.dumps([{
+                'address': document.delivery_address,
+                'distance': '%.1f km' % (distance / 1000.0),
+                'duration': '%d dk' % round(duration / 60.0),
+            } for document, distance, duration in route._get_route_stops()], indent=2, ensure_ascii=False)
+
+    def get_route_geometry(self):
+        """Harita çizimi için rota şeklini [enlem, boylam] listesi olarak getir"""
+        self.ensure_one()
+        return [list(point) for point in polyline.decode(self.route_polyline or '')]
+
+    def _get_cost_matrices(self, fetch_missing=True):
+        """Çözücü için eksiksiz mesafe (m) ve süre (sn) matrislerini hazırla"""
+        self.ensure_one()
+        deliveries, addresses, points, distances, durations = self._get_travel_matrix(
+            fetch_missing=fetch_missing)
+        unknown = [address or _('(adres yok)') for address, point in zip(addresses, points) if not point]
+        if unknown:
+            raise ValidationError(
+                _('Aşağıdaki adreslerin konumu bilinmiyor, rota hesaplanamadı:\n%s') % '\n'.join(unknown))
+
+        params = self.env['ir.config_parameter'].sudo()
+        distance, duration = route_solver.fill_missing(
+            distances, durations,
+            [point[1] for point in points],
+            [point[2] for point in points],
+            road_factor=float(params.get_param('delivery.road_factor', route_solver.DEFAULT_ROAD_FACTOR)),
+            speed_kmh=float(params.get_param('delivery.average_speed', route_solver.DEFAULT_SPEED_KMH)),
+        )
+        return deliveries, addresses, points, distance, duration
+
+    def _benchmark_optimizer(self, repeats=5):
+        """Yerel çözücüyü süre ve çözüm kalitesi açısından sağlayıcıyla karşılaştır"""
+        self.ensure_one()
+        deliveries, addresses, points, distance, duration = self._get_cost_matrices()
+        reference_path = None
+        gmaps = self.env['delivery.geo.point']._get_maps_client(self.api_key)
+        if gmaps:
             result = gmaps.directions(
-                origin=self.start_location,
-                destination=self.end_location,
-                waypoints=delivery_points,
+                origin='%s,%s' % points[0][1:],
+                destination='%s,%s' % points[-1][1:],
+                waypoints=['%s,%s' % point[1:] for point in points[1:-1]],
                 optimize_waypoints=True,
                 mode="driving"
             )
-            
-            if not result:
-                raise ValidationError(_('Rota hesaplanamadı!'))
-            
-            # Sonuçları kaydet
-            route = result[0]
-            legs = route['legs']
-            
-            # Toplam mesafe ve süre
-            total_distance = sum(leg['distance']['value'] for leg in legs) / 1000  # km'ye çevir
-            total_duration = sum(leg['duration']['value'] for leg in legs) / 60  # dakikaya çevir
-            
-            # Optimize edilmiş sıralama
-            optimized_order = []
-            for i, leg in enumerate(legs):
-                if i < len(delivery_points):
-                    optimized_order.append({
-                        'address': delivery_points[i],
-                        'distance': leg['distance']['text'],
-                        'duration': leg['duration']['text']
-                    })
-            
-            # Sonuçları güncelle
-            self.write({
-                'total_distance': total_distance,
-                'total_duration': total_duration,
-                'optimized_route': json.dumps(optimized_order, indent=2),
-                'state': 'optimized'
-            })
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Başarılı'),
-                    'message': _('Rota başarıyla optimize edildi.'),
-                    'sticky': False,
-                    'type': 'success'
-                }
-            }
-            
-        except Exception as e:
-            raise ValidationError(_('Rota optimizasyonu sırasında hata oluştu: %s') % str(e))
+            if result:
+                order = result[0].get('waypoint_order') or list(range(len(deliveries)))
+                reference_path = [0] + [index + 1 for index in order] + [len(points) - 1]
+        return route_solver.benchmark(duration, reference_path=reference_path, repeats=repeats)
 
+    def _get_departure_time(self):
+        """Planlama tarihindeki kalkış saatini UTC (tz'siz) olarak getir
+
+        ``delivery.departure_hour`` kullanıcının (yoksa İstanbul) yerel saatidir.
+        """
+        self.ensure_one()
+        hour = int(self.env['ir.config_parameter'].sudo().get_param('delivery.departure_hour', 9))
+        tz = pytz.timezone(self.env.user.tz or DEFAULT_TIMEZONE)
+        local = tz.localize(datetime.combine(self.planning_id.planning_date, datetime.min.time()).replace(hour=hour))
+        return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+    def _get_travel_points(self, resolve=True):
+        """Rota noktalarını (başlangıç, teslimatlar, bitiş) sırayla getir"""
+        self.ensure_one()
+        deliveries = self.planning_id.delivery_ids
+        addresses = [self.start_location] + deliveries.mapped('delivery_address') + [self.end_location]
+        partners = [None] + [delivery.partner_id for delivery in deliveries] + [None]
+        points = self.env['delivery.geo.point']._lookup(addresses, partners=partners, resolve=resolve)
+        return deliveries, addresses, [points.get(address) for address in addresses]
+
+    def _get_travel_matrix(self, fetch_missing=True):
+        """Rota noktaları arasındaki mesafe ve süre matrislerini önbellekten getir"""
+        self.ensure_one()
+        deliveries, addresses, points = self._get_travel_points(resolve=fetch_missing)
+        distances, durations = self.env['delivery.travel.matrix'].sudo()._get_matrix(
+            [point and point[0] for point in points],
+            departure=self._get_departure_time(),
+            fetch_missing=fetch_missing,
+        )
+        return deliveries, addresses, points, distances, durations
+
+    @instrument('action')
     def action_start_route(self):
         """Rotayı başlat"""
         self.ensure_one()
         if self.state != 'optimized':
             raise ValidationError(_('Sadece optimize edilmiş rotalar başlatılabilir!'))
         self.state = 'in_progress'
+        self.env['delivery.route.stop']._on_documents_departed(self.stop_ids.mapped('document_id'))
 
+    @instrument('action')
     def action_complete_route(self):
         """Rotayı tamamla"""
         self.ensure_one()
@@ -125,33 +540,46 @@ class DeliveryRoute(models.Model):
             raise ValidationError(_('Sadece devam eden rotalar tamamlanabilir!'))
         self.state = 'done'
 
+    @instrument('action')
     def action_reset_to_draft(self):
         """Taslağa dönüştür"""
         self.ensure_one()
-        self.state = 'draft'
-        self.total_distance = 0
-        self.total_duration = 0
-        self.optimized_route = False
+        self.write({
+            'state': 'draft',
+            'total_distance': 0,
+            'total_duration': 0,
+            'stop_data': False,
+            'leg_distance_data': False,
+            'leg_duration_data': False,
+            'route_polyline': False,
+        })
 
     def get_route_map_url(self):
-        """Google Maps URL'sini oluştur"""
+        """Google Maps yol tarifi adresini oluştur"""
         self.ensure_one()
-        if not self.optimized_route:
+        stops = self._get_route_stops()
+        if not stops:
             return False
-            
-        # Optimize edilmiş rotayı al
-        route_points = json.loads(self.optimized_route)
-        
-        # URL parametrelerini oluştur
+
         params = {
+            'api': 1,
             'origin': self.start_location,
             'destination': self.end_location,
-            'waypoints': '|'.join(point['address'] for point in route_points),
-            'travelmode': 'driving'
+            'waypoints': '|'.join(
+                ', '.join(filter(None, (document.delivery_address or '').splitlines()))
+                for document, _distance, _duration in stops),
+            'travelmode': 'driving',
+        }
+        return 'https://www.google.com/maps/dir/?%s' % urlencode(params)
+
+    def action_open_route_map(self):
+        """Rotayı haritada aç"""
+        self.ensure_one()
+        url = self.get_route_map_url()
+        if not url:
+            raise ValidationError(_('Önce rotayı optimize edin!'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': url,
+            'target': 'new',
         }
-        
-        # URL'yi oluştur
-        base_url = 'https://www.google.com/maps/dir/'
-        query_string = '&'.join(f'{k}={v}' for k, v in params.items())
-        
-        return f"{base_url}?{query_string}" 
\ No newline at end of file
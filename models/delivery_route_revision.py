@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+
+from .delivery_travel_matrix import _unpack
+
+
+class DeliveryRouteRevision(models.Model):
+    _name = 'delivery.route.revision'
+    _description = 'Rota Revizyonu'
+    _order = 'route_id, id desc'
+
+    route_id = fields.Many2one('delivery.route', string='Rota', required=True,
+                               ondelete='cascade', index=True)
+    optimizer = fields.Selection([
+        ('google', 'Google'),
+        ('local', 'Yerel Çözücü'),
+        ('stub', 'Sahte Sağlayıcı'),
+    ], string='Optimizasyon', required=True)
+    stop_count = fields.Integer('Durak Sayısı')
+    moved_count = fields.Integer('Yer Değiştiren Durak')
+    # Sıra farkı: "belge:eski>yeni" taşınan, "+belge@sıra" eklenen, "-belge" çıkarılan
+    stop_delta = fields.Text('Sıra Farkı')
+    total_distance = fields.Float('Toplam Mesafe (km)')
+    distance_change = fields.Float('Mesafe Değişimi (km)')
+    total_duration = fields.Float('Toplam Süre (dk)')
+    duration_change = fields.Float('Süre Değişimi (dk)')
+
+    @api.model
+    def _get_stop_delta(self, old_ids, new_ids):
+        """İki durak sırası arasındaki kompakt farkı ve taşınan durak sayısını getir"""
+        old_positions = {stop_id: position for position, stop_id in enumerate(old_ids, start=1)}
+        new_positions = {stop_id: position for position, stop_id in enumerate(new_ids, start=1)}
+        delta = []
+        moved = 0
+        for stop_id, position in new_positions.items():
+            previous = old_positions.get(stop_id)
+            if previous is None:
+                delta.append('+%d@%d' % (stop_id, position))
+            elif previous != position:
+                delta.append('%d:%d>%d' % (stop_id, previous, position))
+                moved += 1
+        delta.extend('-%d' % stop_id for stop_id in old_ids if stop_id not in new_positions)
+        return ','.join(delta), moved
+
+    @api.model
+    def _record(self, route, previous, optimizer):
+        """Optimizasyon sonrası revizyonu kaydet ve rotaya tek özet mesaj yaz
+
+        ``previous`` yazmadan önceki (stop_data, total_distance,
+        total_duration, state) değerleridir.
+        """
+        stop_data, distance, duration, state = previous
+        old_ids = list(_unpack(stop_data, 'i'))
+        new_ids = list(_unpack(route.stop_data, 'i'))
+        delta, moved = self._get_stop_delta(old_ids, new_ids)
+        first = not old_ids
+        revision = self.sudo().create({
+            'route_id': route.id,
+            'optimizer': optimizer,
+            'stop_count': len(new_ids),
+            'moved_count': moved,
+            'stop_delta': delta or False,
+            'total_distance': route.total_distance,
+            'distance_change': 0.0 if first else route.total_distance - distance,
+            'total_duration': route.total_duration,
+            'duration_change': 0.0 if first else route.total_duration - duration,
+        })
+
+        optimizer_label = dict(self._fields['optimizer'].selection)[optimizer]
+        if first:
+            body = _('Rota optimize edildi (%s): %s durak, %.1f km, %.0f dk.') % (
+                optimizer_label, len(new_ids), route.total_distance, route.total_duration)
+        else:
+            body = _('Rota yeniden optimize edildi (%s): %s durak, %s durağın sırası değişti, '
+                     'mesafe %+.1f km, süre %+.0f dk.') % (
+                optimizer_label, len(new_ids), moved,
+                revision.distance_change, revision.duration_change)
+        if state != route.state:
+            states = dict(route._fields['state'].selection)
+            body += ' ' + _('Durum: %s → %s') % (states.get(state, state), states[route.state])
+        route.message_post(body=body, subtype_xmlid='mail.mt_note')
+        return revision
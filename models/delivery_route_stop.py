@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from datetime import timedelta
+
+from .delivery_perf_sample import instrument
+
+DEFAULT_SERVICE_MINUTES = 10
+# Servis süresi tahmininde geriye bakılan gün sayısı (delivery.service_time_days)
+DEFAULT_SERVICE_TIME_DAYS = 60
+# Gözlenen servis süresi için en az örnek sayısı ve kabul edilen en uzun ara
+MIN_SERVICE_SAMPLES = 5
+MAX_DELIVERY_GAP_HOURS = 3
+
+
+class DeliveryRouteStop(models.Model):
+    _name = 'delivery.route.stop'
+    _description = 'Rota Durağı'
+    _order = 'route_id, sequence'
+    _rec_name = 'document_id'
+
+    route_id = fields.Many2one('delivery.route', string='Rota', required=True,
+                               ondelete='cascade', index=True)
+    document_id = fields.Many2one('delivery.document', string='Teslimat Belgesi', required=True,
+                                  ondelete='cascade', index=True)
+    sequence = fields.Integer('Sıra', required=True)
+    district = fields.Char(related='document_id.district', string='İlçe')
+    leg_duration = fields.Integer('Yol Süresi (sn)', help='Önceki noktadan bu durağa yol süresi')
+    service_duration = fields.Integer('Servis Süresi (sn)', help='Durakta geçmesi beklenen süre')
+    eta = fields.Datetime('Tahmini Varış')
+    delivered_date = fields.Datetime('Teslim Zamanı')
+
+    @api.model
+    def _get_service_estimates(self):
+        """Geçmiş teslimatlardan ilçe bazında gözlenen servis süresi (sn)
+
+        Aynı rotadaki ardışık iki teslimat arasındaki süreden yol süresi
+        düşülerek servis süresi bulunur; ilçe başına medyan alınır. Anahtarı
+        None olan satır tüm ilçelerin medyanıdır. Tek sorgu çalışır.
+
+        Toplu işaretlenen duraklar (planlama eylemi, sürücü eşitlemesi) aynı
+        teslim zamanını alır; bu sıfır aralıklar ve toplu işaretlemeden
+        sonraki ilk aralık gerçek servis süresini yansıtmadığı için dışarıda
+        bırakılır.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        lookback = int(params.get_param('delivery.service_time_days', DEFAULT_SERVICE_TIME_DAYS))
+        self.flush(['route_id', 'document_id', 'leg_duration', 'delivered_date'])
+        self.env['delivery.document'].flush(['district'])
+        self.env.cr.execute("""
+            WITH ordered AS (
+                SELECT COALESCE(d.district, '') AS district,
+                       s.route_id,
+                       s.leg_duration,
+                       s.delivered_date,
+                       LAG(s.delivered_date) OVER w AS previous_date,
+                       LAG(s.delivered_date, 2) OVER w AS before_previous_date
+                FROM delivery_route_stop s
+                JOIN delivery_document d ON d.id = s.document_id
+                WHERE s.delivered_date >= (now() at time zone 'UTC') - %s * interval '1 day'
+                WINDOW w AS (PARTITION BY s.route_id ORDER BY s.delivered_date, s.sequence)
+            ), delivered AS (
+                SELECT district, leg_duration, delivered_date - previous_date AS gap
+                FROM ordered
+                WHERE delivered_date > previous_date
+                  AND previous_date IS DISTINCT FROM before_previous_date
+            )
+            SELECT district,
+                   percentile_cont(0.5) WITHIN GROUP (
+                       ORDER BY GREATEST(EXTRACT(EPOCH FROM gap) - COALESCE(leg_duration, 0), 60))
+            FROM delivered
+            WHERE gap IS NOT NULL AND gap < %s * interval '1 hour'
+            GROUP BY ROLLUP (district)
+            HAVING COUNT(*) >= %s
+        """, (lookback, MAX_DELIVERY_GAP_HOURS, MIN_SERVICE_SAMPLES))
+        estimates = {district: int(seconds) for district, seconds in self.env.cr.fetchall()}
+        estimates.setdefault(None, int(params.get_param(
+            'delivery.default_service_minutes', DEFAULT_SERVICE_MINUTES)) * 60)
+        return estimates
+
+    @api.model
+    def _prepare_stop_vals(self, route, stop_ids, leg_durations, estimates):
+        """Optimize edilmiş sıradan durak değerlerini ve başlangıç ETA'larını üret"""
+        documents = {document.id: document
+                     for document in self.env['delivery.document'].browse(stop_ids).exists()}
+        vals_list = []
+        eta = route._get_departure_time()
+        for sequence, (document_id, leg_duration) in enumerate(zip(stop_ids, leg_durations), start=1):
+            if document_id not in documents:
+                continue
+            district = documents[document_id].district or ''
+            service = estimates.get(district, estimates[None])
+            eta += timedelta(seconds=leg_duration)
+            vals_list.append({
+                'route_id': route.id,
+                'document_id': document_id,
+                'sequence': sequence,
+                'leg_duration': leg_duration,
+                'service_duration': service,
+                'eta': eta,
+            })
+            eta += timedelta(seconds=service)
+        return vals_list
+
+    def _chain_etas(self, start):
+        """Sıralı duraklar için ``start`` anından itibaren ETA'ları hesapla"""
+        etas = {}
+        eta = start
+        for stop in self:
+            eta += timedelta(seconds=stop.leg_duration)
+            etas[stop.id] = eta
+            eta += timedelta(seconds=stop.service_duration)
+        return etas
+
+    def _write_etas(self, etas):
+        """Farklı ETA değerlerini tek UPDATE ile yaz"""
+        if not etas:
+            return
+        self.flush(['eta'])
+        row = '(%s, %s::timestamp)'
+        self.env.cr.execute("""
+            UPDATE delivery_route_stop s
+            SET eta = v.eta,
+                write_uid = %%s,
+                write_date = now() at time zone 'UTC'
+            FROM (VALUES %s) AS v(id, eta)
+            WHERE s.id = v.id
+        """ % ', '.join([row] * len(etas)),
+            [self.env.uid] + [value for item in etas.items() for value in item])
+        self.invalidate_cache(['eta'], list(etas))
+
+    @api.model
+    @instrument('compute')
+    def _on_documents_departed(self, documents):
+        """Yola çıkan belgelerin rotalarında ETA'ları kalkış anına göre kaydır
+
+        Henüz teslimat yapılmamış rotalar, planlanan kalkıştan geç
+        başlamışsa şimdiki zamandan yeniden zincirlenir.
+        """
+        stops = self.sudo().search([('document_id', 'in', documents.ids)])
+        now = fields.Datetime.now()
+        etas = {}
+        for route in stops.mapped('route_id'):
+            route_stops = route.stop_ids
+            if any(route_stops.mapped('delivered_date')):
+                continue
+            start = max(now, route._get_departure_time())
+            etas.update(route_stops._chain_etas(start))
+        self.sudo()._write_etas(etas)
+
+    @api.model
+    @instrument('compute')
+    def _on_documents_delivered(self, documents):
+        """Teslim edilen durakları işaretle ve yalnızca kalan durakların ETA'sını güncelle
+
+        Sağlayıcı çağrılmaz; kayıtlı bacak ve servis süreleri kullanılır.
+        Dönüş: her rotada sıradaki teslim edilmemiş durak.
+        """
+        stops = self.sudo().search([('document_id', 'in', documents.ids), ('delivered_date', '=', False)])
+        if not stops:
+            return self.browse()
+        now = fields.Datetime.now()
+        stops.write({'delivered_date': now})
+
+        etas = {}
+        next_stops = self.browse()
+        for route in stops.mapped('route_id'):
+            anchor = max(stops.filtered(lambda s: s.route_id == route).mapped('sequence'))
+            remaining = route.stop_ids.filtered(lambda s: s.sequence > anchor and not s.delivered_date)
+            etas.update(remaining._chain_etas(now))
+            next_stops |= remaining[:1]
+        self.sudo()._write_etas(etas)
+        return next_stops
+
+    @api.model
+    def _get_document_etas(self, documents):
+        """Belgelerin güncel ETA'larını tek sorguda getir: {belge_id: eta}"""
+        if not documents:
+            return {}
+        rows = self.sudo().search_read(
+            [('document_id', 'in', documents.ids), ('eta', '!=', False)], ['document_id', 'eta'])
+        return {row['document_id'][0]: row['eta'] for row in rows}
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from datetime import timedelta
+import logging
+from .delivery_perf_sample import instrument
+
+_logger = logging.getLogger(__name__)
+
+# Mesajında tahmini varış bilgisi bulunan olaylar
+ETA_EVENTS = ('on_road', 'arriving')
+
+
+class DeliverySmsOutbox(models.Model):
+    _name = 'delivery.sms.outbox'
+    _description = 'Teslimat SMS Kuyruğu'
+    _order = 'next_attempt_date, id'
+
+    document_id = fields.Many2one('delivery.document', string='Teslimat Belgesi',
+                                  required=True, ondelete='cascade', index=True)
+    event = fields.Selection([
+        ('on_road', 'Yolda'),
+        ('arriving', 'Yaklaşıyor'),
+        ('delivered', 'Teslim Edildi'),
+    ], string='Olay', required=True)
+    partner_id = fields.Many2one('res.partner', string='Müşteri')
+    number = fields.Char('Telefon', required=True)
+    body = fields.Text('Mesaj', required=True)
+    state = fields.Selection([
+        ('pending', 'Bekliyor'),
+        ('sent', 'Gönderildi'),
+        ('failed', 'Başarısız'),
+    ], string='Durum', default='pending', required=True, index=True)
+    attempt_count = fields.Integer('Deneme Sayısı', default=0)
+    next_attempt_date = fields.Datetime('Sonraki Deneme', default=fields.Datetime.now, index=True)
+    sent_date = fields.Datetime('Gönderim Tarihi')
+    last_error = fields.Text('Son Hata')
+
+    _sql_constraints = [
+        ('document_event_uniq', 'unique(document_id, event)',
+         'Bu teslimat belgesi için bu SMS zaten kuyrukta!'),
+    ]
+
+    @api.model
+    def _enqueue(self, documents, event, etas=None):
+        """Belgeler için SMS'leri kuyruğa ekle (belge ve olay başına tek kayıt)
+
+        Varış bilgisi içeren olaylarda ETA'lar, verilmemişse, tüm belgeler
+        için tek sorguda okunur.
+        """
+        documents = documents.filtered(lambda d: d.partner_mobile or d.partner_phone)
+        if not documents:
+            return self.browse()
+        if etas is None and event in ETA_EVENTS:
+            etas = self.env['delivery.route.stop']._get_document_etas(documents)
+        etas = etas or {}
+
+        existing = self.sudo().search([
+            ('document_id', 'in', documents.ids),
+            ('event', '=', event),
+        ]).mapped('document_id')
+        vals_list = [{
+            'document_id': document.id,
+            'event': event,
+            'partner_id': document.partner_id.id,
+            'number': document.partner_mobile or document.partner_phone,
+            'body': document._get_sms_body(event, eta=etas.get(document.id)),
+        } for document in documents - existing]
+        messages = self.sudo().create(vals_list)
+
+        # Kuyruğu beklemeden işlemesi için zamanlanmış görevi tetikle
+        if messages:
+            cron = self.env.ref('teslimat.ir_cron_delivery_sms_outbox', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+        return messages
+
+    @api.model
+    @instrument('cron')
+    def _cron_send_pending(self, batch_size=None):
+        """Bekleyen SMS'leri toplu olarak gönder"""
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = batch_size or int(params.get_param('delivery.sms_batch_size', 100))
+        max_attempts = int(params.get_param('delivery.sms_max_attempts', 5))
+        retry_delay = int(params.get_param('delivery.sms_retry_delay', 5))  # dakika
+
+        messages = self.search([
+            ('state', '=', 'pending'),
+            ('next_attempt_date', '<=', fields.Datetime.now()),
+        ], limit=batch_size)
+        if not messages:
+            return
+
+        sms_records = self.env['sms.sms'].sudo().create([{
+            'number': message.number,
+            'body': message.body,
+            'partner_id': message.partner_id.id,
+        } for message in messages])
+
+        error = False
+        try:
+            sms_records.send(unlink_failed=False, unlink_sent=False, raise_exception=False)
+        except Exception as e:
+            error = str(e)
+            _logger.error('Toplu SMS gönderimi hatası: %s', error)
+
+        now = fields.Datetime.now()
+        sent = self.browse()
+        for message, sms in zip(messages, sms_records):
+            if not error and sms.state == 'sent':
+                sent |= message
+                continue
+            attempt_count = message.attempt_count + 1
+            message.write({
+                'attempt_count': attempt_count,
+                'last_error': error or sms.failure_type or sms.state,
+                'state': 'failed' if attempt_count >= max_attempts else 'pending',
+                'next_attempt_date': now + timedelta(minutes=retry_delay * 2 ** (attempt_count - 1)),
+            })
+        sms_records.unlink()
+
+        if sent:
+            sent.write({'state': 'sent', 'sent_date': now, 'last_error': False})
+            sent.filtered(lambda m: m.event == 'on_road').mapped('document_id').write({'sms_sent_on_road': True})
+            sent.filtered(lambda m: m.event == 'delivered').mapped('document_id').write({'sms_sent_delivered': True})
+        _logger.info('SMS kuyruğu işlendi: %s gönderildi, %s başarısız', len(sent), len(messages) - len(sent))
+        # Parti dolduysa kalanlar için görevi hemen yeniden tetikle
+        if len(messages) >= batch_size:
+            cron = self.env.ref('teslimat.ir_cron_delivery_sms_outbox', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+
+    def action_retry(self):
+        """Başarısız SMS'leri yeniden kuyruğa al"""
+        self.filtered(lambda m: m.state == 'failed').write({
+            'state': 'pending',
+            'attempt_count': 0,
+            'next_attempt_date': fields.Datetime.now(),
+        })
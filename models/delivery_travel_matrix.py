@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from array import array
+from datetime import datetime, timedelta
+import base64
+import logging
+import time
+from .delivery_perf_sample import instrument
+
+_logger = logging.getLogger(__name__)
+
+# Sağlayıcının tek istekte kabul ettiği en fazla başlangıç/hedef sayısı
+PROVIDER_CHUNK_SIZE = 10
+
+
+def _pack(values, typecode):
+    """Sayı listesini sıkıştırılmış ikili biçime çevir"""
+    return base64.b64encode(array(typecode, values).tobytes())
+
+
+def _unpack(data, typecode):
+    """Sıkıştırılmış ikili veriyi sayı dizisine çevir"""
+    values = array(typecode)
+    if data:
+        values.frombytes(base64.b64decode(data))
+    return values
+
+
+class DeliveryTravelMatrix(models.Model):
+    _name = 'delivery.travel.matrix'
+    _description = 'Seyahat Süresi Önbelleği'
+    _rec_name = 'origin_id'
+
+    # Her satır bir başlangıç noktasından tüm bilinen hedeflere olan
+    # mesafe/süreleri paralel diziler halinde tutar
+    origin_id = fields.Many2one('delivery.geo.point', string='Başlangıç', required=True,
+                                index=True, ondelete='cascade')
+    time_bucket = fields.Integer('Zaman Dilimi', required=True)
+    destination_data = fields.Binary('Hedefler', attachment=False)
+    distance_data = fields.Binary('Mesafeler (m)', attachment=False)
+    duration_data = fields.Binary('Süreler (sn)', attachment=False)
+    fetched_data = fields.Binary('Alınma Zamanları', attachment=False)
+
+    _sql_constraints = [
+        ('origin_bucket_uniq', 'unique(origin_id, time_bucket)',
+         'Bu başlangıç noktası ve zaman dilimi için kayıt zaten mevcut!'),
+    ]
+
+    @api.model
+    def _get_time_bucket(self, departure=None):
+        """Kalkış saatine göre zaman dilimini getir"""
+        bucket_hours = int(self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.matrix_bucket_hours', 3)) or 24
+        return (departure or fields.Datetime.now()).hour // bucket_hours
+
+    def _decode_entries(self):
+        """Satırı hedef -> (mesafe, süre, alınma zamanı) sözlüğüne çevir"""
+        self.ensure_one()
+        return {
+            destination: (distance, duration, fetched)
+            for destination, distance, duration, fetched in zip(
+                _unpack(self.destination_data, 'i'),
+                _unpack(self.distance_data, 'I'),
+                _unpack(self.duration_data, 'I'),
+                _unpack(self.fetched_data, 'I'),
+            )
+        }
+
+    @api.model
+    def _encode_entries(self, entries):
+        """Hedef sözlüğünü kaydedilecek alan değerlerine çevir"""
+        destinations = sorted(entries)
+        return {
+            'destination_data': _pack(destinations, 'i'),
+            'distance_data': _pack([entries[d][0] for d in destinations], 'I'),
+            'duration_data': _pack([entries[d][1] for d in destinations], 'I'),
+            'fetched_data': _pack([entries[d][2] for d in destinations], 'I'),
+        }
+
+    @api.model
+    def _get_matrix(self, point_ids, departure=None, fetch_missing=True):
+        """Noktalar arası N×N mesafe (m) ve süre (sn) matrislerini getir.
+
+        Önbellekte olmayan veya süresi dolmuş çiftler ``fetch_missing``
+        açıksa sağlayıcıdan yalnızca eksik olanlar için istenir.
+        Bilinmeyen çiftler ``None`` olarak döner.
+        """
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param('delivery.matrix_ttl_days', 30))
+        expiry = int(time.time()) - ttl_days * 86400
+        bucket = self._get_time_bucket(departure)
+
+        known_ids = [point_id for point_id in point_ids if point_id]
+        rows = self.search([('origin_id', 'in', known_ids), ('time_bucket', '=', bucket)])
+        entries = {row.origin_id.id: row._decode_entries() for row in rows}
+
+        missing = {}
+        for origin in known_ids:
+            for destination in known_ids:
+                if origin == destination:
+                    continue
+                entry = entries.get(origin, {}).get(destination)
+                if not entry or entry[2] < expiry:
+                    missing.setdefault(origin, set()).add(destination)
+
+        if missing and fetch_missing:
+            fetched = self._fetch_pairs(missing, departure)
+            if fetched:
+                self._store_pairs(fetched, bucket, rows, entries)
+
+        size = len(point_ids)
+        distances = [[None] * size for _i in range(size)]
+        durations = [[None] * size for _i in range(size)]
+        for i, origin in enumerate(point_ids):
+            for j, destination in enumerate(point_ids):
+                if i == j or (origin and origin == destination):
+                    distances[i][j] = durations[i][j] = 0
+                    continue
+                entry = entries.get(origin, {}).get(destination)
+                if entry:
+                    distances[i][j], durations[i][j] = entry[0], entry[1]
+        return distances, durations
+
+    @api.model
+    @instrument('provider')
+    def _fetch_pairs(self, missing, departure=None):
+        """Eksik çiftleri sağlayıcının mesafe matrisi servisinden al"""
+        gmaps = self.env['delivery.geo.point']._get_maps_client()
+        if not gmaps:
+            return {}
+
+        points = self.env['delivery.geo.point'].browse(
+            set(missing) | set().union(*missing.values()))
+        coordinates = {point.id: (point.latitude, point.longitude) for point in points}
+        kwargs = {'mode': 'driving'}
+        if departure and departure >= datetime.utcnow():
+            kwargs['departure_time'] = departure
+
+        origins = sorted(missing)
+        fetched = {}
+        now = int(time.time())
+        for start in range(0, len(origins), PROVIDER_CHUNK_SIZE):
+            origin_chunk = origins[start:start + PROVIDER_CHUNK_SIZE]
+            destinations = sorted(set().union(*(missing[origin] for origin in origin_chunk)))
+            for dest_start in range(0, len(destinations), PROVIDER_CHUNK_SIZE):
+                dest_chunk = destinations[dest_start:dest_start + PROVIDER_CHUNK_SIZE]
+                try:
+                    result = gmaps.distance_matrix(
+                        origins=[coordinates[origin] for origin in origin_chunk],
+                        destinations=[coordinates[destination] for destination in dest_chunk],
+                        **kwargs
+                    )
+                except Exception as e:
+                    _logger.warning('Mesafe matrisi alınamadı: %s', e)
+                    continue
+                for origin, row in zip(origin_chunk, result['rows']):
+                    for destination, element in zip(dest_chunk, row['elements']):
+                        if element.get('status') != 'OK' or origin == destination:
+                            continue
+                        duration = element.get('duration_in_traffic') or element['duration']
+                        fetched[(origin, destination)] = (
+                            element['distance']['value'], duration['value'], now)
+        return fetched
+
+    @api.model
+    def _store_pairs(self, fetched, bucket, rows, entries):
+        """Alınan çiftleri başlangıç satırlarına birleştirip kaydet"""
+        rows_by_origin = {row.origin_id.id: row for row in rows}
+        updated = set()
+        for (origin, destination), value in fetched.items():
+            entries.setdefault(origin, {})[destination] = value
+            updated.add(origin)
+
+        vals_list = []
+        for origin in updated:
+            vals = self._encode_entries(entries[origin])
+            if origin in rows_by_origin:
+                rows_by_origin[origin].write(vals)
+            else:
+                vals.update(origin_id=origin, time_bucket=bucket)
+                vals_list.append(vals)
+        self.create(vals_list)
+
+    @api.model
+    def _cron_purge_expired(self):
+        """Süresi dolmuş kayıtları temizle"""
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param('delivery.matrix_ttl_days', 30))
+        self.search([('write_date', '<', fields.Datetime.now() - timedelta(days=ttl_days))]).unlink()
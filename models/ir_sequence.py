@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+import threading
+
+# İşlem genelinde önceden ayrılmış numara havuzları:
+# (veritabanı, sıra id, sıra son değişiklik) -> kullanılmamış numaralar
+_BLOCK_POOLS = {}
+_BLOCK_LOCK = threading.Lock()
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def _next_block_by_code(self, sequence_code, count):
+        """Kod için ``count`` adet biçimlendirilmiş sıra numarası getir.
+
+        Standart (PostgreSQL sequence) sıralarda numaralar blok halinde
+        ayrılıp işlem içinde bellekten dağıtılır; boşluksuz sıralarda tek bir
+        UPDATE ile yalnızca gereken kadar numara ayrılır. Tarih aralıklı
+        sıralar için tek tek ``_next()`` kullanılır.
+        """
+        if count <= 0:
+            return []
+        self.check_access_rights('read')
+        sequence = self.search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+        if sequence.implementation == 'standard':
+            numbers = sequence._take_pooled_numbers(count)
+        else:
+            numbers = sequence._reserve_nogap_numbers(count)
+        return [sequence.get_next_char(number) for number in numbers]
+
+    def _take_pooled_numbers(self, count):
+        """İşlem havuzundan numara al; yetmezse yeni blok ayır
+
+        Blok kilit dışında ayrılır ve havuza kilit altında eklenir; böylece
+        veritabanı çağrısı diğer iş parçacıklarını bekletmez.
+        """
+        self.ensure_one()
+        block_size = int(self.env['ir.config_parameter'].sudo().get_param('delivery.sequence_block_size', 20))
+        key = (self.env.cr.dbname, self.id, str(self.write_date))
+        with _BLOCK_LOCK:
+            pool = _BLOCK_POOLS.setdefault(key, [])
+            numbers, pool[:] = pool[:count], pool[count:]
+        if len(numbers) < count:
+            self.env.cr.execute(
+                "SELECT nextval('ir_sequence_%03d') FROM generate_series(1, %%s)" % self.id,
+                (max(block_size, count - len(numbers)),))
+            fetched = [row[0] for row in self.env.cr.fetchall()]
+            missing = count - len(numbers)
+            numbers += fetched[:missing]
+            with _BLOCK_LOCK:
+                pool = _BLOCK_POOLS.setdefault(key, [])
+                pool[:] = sorted(pool + fetched[missing:])
+        return numbers
+
+    def _reserve_nogap_numbers(self, count):
+        """Boşluksuz sırada tek satır kilidiyle ardışık numaralar ayır"""
+        self.ensure_one()
+        self.flush(['number_next', 'number_increment'])
+        self.env.cr.execute("""
+            UPDATE ir_sequence
+            SET number_next = number_next + number_increment * %s
+            WHERE id = %s
+            RETURNING number_next, number_increment
+        """, (count, self.id))
+        number_next, increment = self.env.cr.fetchone()
+        self.invalidate_cache(['number_next'], self.ids)
+        start = number_next - increment * count
+        return list(range(start, number_next, increment))
+
+    def write(self, values):
+        # Sıra değiştiğinde bu işlemdeki eski blokları bırak
+        with _BLOCK_LOCK:
+            for key in [key for key in _BLOCK_POOLS if key[1] in self.ids]:
+                del _BLOCK_POOLS[key]
+        return super().write(values)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from .delivery_perf_sample import instrument
 
 class StockPicking(models.Model):
     _inherit = 'stock.picking'
@@ -11,24 +12,43 @@ class StockPicking(models.Model):
     delivery_document_ids = fields.One2many('delivery.document', 'picking_id', 
                                           string='Teslimat Belgeleri')
     is_delivery_created = fields.Boolean('Teslimat Oluşturuldu', compute='_compute_is_delivery_created',
-                                       store=True)
+                                       store=True, index=True)
     
     # Teslimat için uygunluk
     is_delivery_ready = fields.Boolean('Teslimat İçin Hazır', 
-                                      compute='_compute_delivery_ready')
-    has_vehicle_selected = fields.Boolean('Araç Seçildi', default=False)
+                                      compute='_compute_delivery_ready',
+                                      search='_search_is_delivery_ready')
+    has_vehicle_selected = fields.Boolean('Araç Seçildi', default=False, index=True)
+
+    def _get_delivery_document_counts(self):
+        """Transfer başına teslimat belgesi sayısını tek gruplu sorguyla getir"""
+        picking_ids = [picking.id for picking in self if isinstance(picking.id, int)]
+        if not picking_ids:
+            return {}
+        groups = self.env['delivery.document'].sudo().read_group(
+            [('picking_id', 'in', picking_ids)], ['picking_id'], ['picking_id'])
+        counts = {group['picking_id'][0]: group['picking_id_count'] for group in groups}
+        # Arşive taşınmış belgeler de transferin teslimatı sayılır
+        for picking_id, count in self.env['delivery.document.archive']._get_picking_counts(picking_ids).items():
+            counts[picking_id] = counts.get(picking_id, 0) + count
+        return counts
     
     @api.depends('delivery_document_ids')
+    @instrument('compute')
     def _compute_delivery_document_count(self):
+        counts = self._get_delivery_document_counts()
         for record in self:
-            record.delivery_document_count = len(record.delivery_document_ids)
+            record.delivery_document_count = counts.get(record.id, 0)
     
     @api.depends('delivery_document_ids')
+    @instrument('compute')
     def _compute_is_delivery_created(self):
+        counts = self._get_delivery_document_counts()
         for record in self:
-            record.is_delivery_created = bool(record.delivery_document_ids)
+            record.is_delivery_created = bool(counts.get(record.id))
     
     @api.depends('state', 'has_vehicle_selected')
+    @instrument('compute')
     def _compute_delivery_ready(self):
         for record in self:
             record.is_delivery_ready = (
@@ -36,6 +56,22 @@ class StockPicking(models.Model):
                 record.has_vehicle_selected and
                 record.picking_type_code == 'outgoing'
             )
+
+    def _search_is_delivery_ready(self, operator, value):
+        if operator not in ('=', '!='):
+            raise UserError(_('Bu arama işlemi desteklenmiyor!'))
+        if (operator == '=') == bool(value):
+            return [
+                ('state', '=', 'done'),
+                ('has_vehicle_selected', '=', True),
+                ('picking_type_code', '=', 'outgoing'),
+            ]
+        return [
+            '|', '|',
+            ('state', '!=', 'done'),
+            ('has_vehicle_selected', '=', False),
+            ('picking_type_code', '!=', 'outgoing'),
+        ]
     
     def action_view_delivery_documents(self):
         """Teslimat belgelerini görüntüle"""
@@ -49,7 +85,8 @@ class StockPicking(models.Model):
             'context': {'create': False},
         }
     
-    def action_create_delivery_document(self):
+    @instrument('action')
+    def action_create_delivery_document(self, vehicle_type=None, delivery_date=None):
         """Teslimat belgesi oluştur"""
         self.ensure_one()
         
@@ -65,10 +102,7 @@ class StockPicking(models.Model):
             }
         
         # Yeni teslimat belgesi oluştur
-        delivery_document = self.env['delivery.document'].create({
-            'picking_id': self.id,
-            'delivery_date': fields.Date.context_today(self),
-        })
+        delivery_document = self._create_delivery_documents(vehicle_type, delivery_date)
         
         # Oluşturulan teslimat belgesini aç
         return {
@@ -79,6 +113,34 @@ class StockPicking(models.Model):
             'res_id': delivery_document.id,
             'target': 'current',
         }
+
+    @instrument('action')
+    def _create_delivery_documents(self, vehicle_type, delivery_date=None):
+        """Seçili transferler için teslimat belgelerini toplu oluştur.
+
+        Zaten teslimat belgesi olan transferler tek sorguyla bulunup atlanır.
+        """
+        if not self:
+            return self.env['delivery.document']
+
+        self.env['delivery.document'].flush(['picking_id'])
+        self.env['delivery.document.archive'].flush(['picking_id'])
+        self.env.cr.execute("""
+            SELECT picking_id FROM delivery_document WHERE picking_id IN %(ids)s
+            UNION
+            SELECT picking_id FROM delivery_document_archive WHERE picking_id IN %(ids)s
+        """, {'ids': tuple(self.ids)})
+        existing_ids = {row[0] for row in self.env.cr.fetchall()}
+        pickings = self.filtered(lambda p: p.id not in existing_ids)
+
+        delivery_date = delivery_date or fields.Date.context_today(self)
+        documents = self.env['delivery.document'].create([{
+            'picking_id': picking.id,
+            'delivery_date': delivery_date,
+            'vehicle_type': vehicle_type,
+        } for picking in pickings])
+        pickings.filtered(lambda p: not p.has_vehicle_selected).write({'has_vehicle_selected': True})
+        return documents
     
     def action_select_vehicle(self):
         """Araç seçimi wizard'ını aç"""
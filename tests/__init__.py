@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from . import test_performance
+from . import test_route_eta
+from . import test_driver_manifest
+from . import test_capacity_ledger
+from . import test_partner_snapshot
+from . import test_route_solver
+from . import test_district_resolver
+from . import test_polyline
+from . import test_capacity_simulator
+from . import test_vehicle_planner
+from . import test_sms_outbox
+from . import test_sequence_blocks
+from . import test_state_transitions
+from . import test_document_archive
+from . import test_vehicle_selection_wizard
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import unittest
+from collections import Counter
+from datetime import timedelta
+
+from odoo import fields, release
+from odoo.tests.common import TransactionCase
+
+from ..models.delivery_document import DAILY_DELIVERY_LIMIT
+from ..utils import maps_provider
+
+_logger = logging.getLogger(__name__)
+
+# Veri boyutları ve tohum ortam değişkenleriyle kendi ölçeklerimize ayarlanır
+BENCH_PARTNERS = int(os.environ.get('DELIVERY_BENCH_PARTNERS', 200))
+BENCH_PICKINGS = int(os.environ.get('DELIVERY_BENCH_PICKINGS', 600))
+BENCH_SEED = int(os.environ.get('DELIVERY_BENCH_SEED', 42))
+BENCH_OUTPUT = os.environ.get('DELIVERY_BENCH_OUTPUT') or os.path.join(
+    tempfile.gettempdir(), 'delivery_benchmark.json')
+
+# Üretilen belgelerin durum dağılımı (ilk tarih planlama testleri için hep hazır)
+STATE_WEIGHTS = (('draft', 30), ('ready', 25), ('on_road', 15), ('delivered', 20), ('cancelled', 10))
+# Belge oluşturma testine ayrılan, belgesi olmayan transfer oranı
+FREE_PICKING_RATIO = 0.2
+
+FLEXIBLE_VEHICLES = ('kucuk_arac_1', 'kucuk_arac_2', 'ek_arac')
+# Sahte sağlayıcı ürün kodundadır; testler googlemaps.Client yerine kullanır
+StubMapsClient = maps_provider.StubClient
+
+
+class DeliveryCase(TransactionCase):
+    """Davranış testleri için elle kurulan küçük veri seti"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env.user.tz = 'Europe/Istanbul'
+        cls.district = 'Deneme'
+        cls.district_cap = 3
+        cls.env['delivery.district.day'].create([{
+            'district_name': cls.district,
+            'weekday': weekday,
+            'max_delivery_count': cls.district_cap,
+        } for weekday in range(6)])
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Deneme Müşteri',
+            'street': 'Deneme Sokak No:1',
+            'city': cls.district,
+            'mobile': '+90 555 000 0000',
+        })
+        today = fields.Date.context_today(cls.env['delivery.document'])
+        # Bir sonraki haftanın Pazartesi günü
+        cls.date = today + timedelta(days=7 - today.weekday())
+
+    @classmethod
+    def _create_pickings(cls, count):
+        picking_type = cls.env.ref('stock.picking_type_out')
+        return cls.env['stock.picking'].create([{
+            'picking_type_id': picking_type.id,
+            'location_id': picking_type.default_location_src_id.id
+            or cls.env.ref('stock.stock_location_stock').id,
+            'location_dest_id': cls.env.ref('stock.stock_location_customers').id,
+            'partner_id': cls.partner.id,
+        } for _index in range(count)])
+
+    @classmethod
+    def _create_documents(cls, count, **vals):
+        """Varsayılan tarih ve araçla taslak belgeler oluştur"""
+        return cls.env['delivery.document'].create([dict({
+            'picking_id': picking.id,
+            'delivery_date': cls.date,
+            'vehicle_type': 'anadolu',
+        }, **vals) for picking in cls._create_pickings(count)])
+
+    def _get_reserved(self, date, vehicle_type, district=''):
+        """Defterdeki rezerve sayısı; satır yoksa 0"""
+        self.env['base'].flush()
+        slot = self.env['delivery.capacity.slot'].search([
+            ('date', '=', date), ('vehicle_type', '=', vehicle_type), ('district', '=', district)])
+        return slot.reserved
+
+
+class DeliveryBenchmarkCase(TransactionCase):
+    """Deterministik veri üreticisi ve ölçüm yardımcıları"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+        cls.rng = random.Random(BENCH_SEED)
+        cls.districts = sorted(cls.env['delivery.district.day']._get_district_day_index())
+        if not cls.districts:
+            raise unittest.SkipTest('İlçe-gün kuralı tanımlı değil')
+
+        today = fields.Date.context_today(cls.env['delivery.document'])
+        # Bir sonraki haftanın Pazartesi gününden başla
+        cls.start_date = today + timedelta(days=7 - today.weekday())
+        cls.slot_counts = Counter()
+
+        cls.partners = cls._generate_partners()
+        cls.pickings = cls._generate_pickings()
+        free_count = int(len(cls.pickings) * FREE_PICKING_RATIO)
+        cls.free_pickings = cls.pickings[:free_count]
+        cls.documents = cls._generate_documents(cls.pickings[free_count:])
+        cls.env['base'].flush()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_results()
+        super().tearDownClass()
+
+    @classmethod
+    def _generate_partners(cls):
+        """İlçelere yayılmış müşteriler"""
+        return cls.env['res.partner'].create([{
+            'name': 'Müşteri %04d' % index,
+            'street': '%s Sokak No:%d' % (cls.rng.choice('ABCDEFGH'), cls.rng.randint(1, 200)),
+            'city': cls.rng.choice(cls.districts),
+            'mobile': '+90 5%02d %03d %04d' % (
+                cls.rng.randint(30, 59), cls.rng.randint(0, 999), cls.rng.randint(0, 9999)),
+        } for index in range(BENCH_PARTNERS)])
+
+    @classmethod
+    def _generate_pickings(cls):
+        """Çıkış transferleri"""
+        picking_type = cls.env.ref('stock.picking_type_out')
+        return cls.env['stock.picking'].create([{
+            'picking_type_id': picking_type.id,
+            'location_id': picking_type.default_location_src_id.id
+            or cls.env.ref('stock.stock_location_stock').id,
+            'location_dest_id': cls.env.ref('stock.stock_location_customers').id,
+            'partner_id': cls.rng.choice(cls.partners).id,
+        } for _index in range(BENCH_PICKINGS)])
+
+    @classmethod
+    def _next_slot(cls, district):
+        """İlçe takvimine ve araç limitlerine uyan ilk (tarih, araç) yuvası"""
+        rule = cls.env['delivery.district.day']._get_district_day_index()[district]
+        vehicles = ((rule.region,) if rule.region else ()) + FLEXIBLE_VEHICLES
+        date = cls.start_date
+        while True:
+            weekday = date.weekday()
+            if rule.mask & (1 << weekday):
+                for vehicle in vehicles:
+                    if (cls.slot_counts[(date, vehicle)] < DAILY_DELIVERY_LIMIT
+                            and cls.slot_counts[(date, vehicle, district)] < rule.max_counts[weekday]):
+                        cls.slot_counts[(date, vehicle)] += 1
+                        cls.slot_counts[(date, vehicle, district)] += 1
+                        return date, vehicle
+            date += timedelta(days=1)
+
+    @classmethod
+    def _prepare_document_vals(cls, pickings):
+        Document = cls.env['delivery.document']
+        vals_list = []
+        for picking in pickings:
+            date, vehicle = cls._next_slot(Document._get_partner_district(picking.partner_id))
+            vals_list.append({'picking_id': picking.id, 'delivery_date': date, 'vehicle_type': vehicle})
+        return vals_list
+
+    @classmethod
+    def _generate_documents(cls, pickings):
+        """Her durumda teslimat belgeleri; durumlara eylemlerle geçilir"""
+        documents = cls.env['delivery.document'].create(cls._prepare_document_vals(pickings))
+        states, weights = zip(*STATE_WEIGHTS)
+        targets = {
+            document: 'ready' if document.delivery_date == cls.start_date
+            else cls.rng.choices(states, weights)[0]
+            for document in documents
+        }
+        by_state = {state: documents.filtered(lambda d: targets[d] == state) for state in states}
+
+        by_state['cancelled'].action_cancel()
+        confirmed = documents - by_state['draft'] - by_state['cancelled']
+        confirmed.action_confirm()
+        (by_state['on_road'] | by_state['delivered']).action_on_road()
+        by_state['delivered'].action_delivered()
+        return documents
+
+    def measure(self, name, func, *args, records=0, **kwargs):
+        """Fonksiyonu soğuk önbellekle çalıştırıp süre ve sorgu sayısını kaydet"""
+        self.env['base'].flush()
+        self.env['base'].invalidate_cache()
+        queries = self.cr.sql_log_count
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.env['base'].flush()
+        elapsed = time.perf_counter() - start
+        entry = {
+            'name': name,
+            'seconds': round(elapsed, 6),
+            'queries': self.cr.sql_log_count - queries,
+            'records': records,
+            'ms_per_record': round(elapsed * 1000.0 / records, 4) if records else None,
+        }
+        type(self).results.append(entry)
+        _logger.info('Performans: %(name)s %(seconds).3fs, %(queries)d sorgu, %(records)d kayıt', entry)
+        return result
+
+    @classmethod
+    def _write_results(cls):
+        """Sonuçları sürümler arası karşılaştırma için JSON olarak yaz"""
+        if not getattr(cls, 'results', None):
+            return
+        payload = {
+            'generated_at': fields.Datetime.to_string(fields.Datetime.now()),
+            'odoo_version': release.version,
+            'seed': BENCH_SEED,
+            'sizes': {
+                'partners': BENCH_PARTNERS,
+                'pickings': BENCH_PICKINGS,
+                'documents': len(cls.documents),
+                'districts': len(cls.districts),
+            },
+            'results': cls.results,
+        }
+        existing = {}
+        if os.path.exists(BENCH_OUTPUT):
+            with open(BENCH_OUTPUT) as handle:
+                try:
+                    existing = json.load(handle)
+                except ValueError:
+                    existing = {}
+        # Aynı çalıştırmadaki diğer test sınıflarının sonuçları korunur
+        existing.setdefault('suites', {})[cls.__name__] = payload
+        with open(BENCH_OUTPUT, 'w') as handle:
+            json.dump(existing, handle, indent=2, ensure_ascii=False)
+        _logger.info('Performans sonuçları yazıldı: %s', BENCH_OUTPUT)
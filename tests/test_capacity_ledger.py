@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestCapacityLedger(DeliveryCase):
+
+    def test_unlink_releases_reservation(self):
+        documents = self._create_documents(2)
+        documents.action_confirm()
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 2)
+
+        documents[0].unlink()
+        self.assertEqual(self._get_reserved(self.date, 'anadolu'), 1)
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 1)
+
+    def test_write_moves_reservation(self):
+        document = self._create_documents(1)
+        document.action_confirm()
+
+        document.write({'vehicle_type': 'avrupa'})
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 0)
+        self.assertEqual(self._get_reserved(self.date, 'avrupa', self.district), 1)
+
+        next_day = self.date + timedelta(days=1)
+        document.write({'delivery_date': next_day})
+        self.assertEqual(self._get_reserved(self.date, 'avrupa', self.district), 0)
+        self.assertEqual(self._get_reserved(next_day, 'avrupa', self.district), 1)
+
+    def test_write_refuses_full_district(self):
+        self._create_documents(self.district_cap, vehicle_type='avrupa').action_confirm()
+        document = self._create_documents(1)
+        document.action_confirm()
+        with self.assertRaises(ValidationError):
+            document.write({'vehicle_type': 'avrupa'})
+
+    def test_create_ready_reserves(self):
+        self._create_documents(2, state='ready')
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 2)
+        with self.assertRaises(ValidationError):
+            self._create_documents(self.district_cap - 1, state='ready')
+
+    def test_remaining_capacity_is_read_only(self):
+        Slot = self.env['delivery.capacity.slot']
+        self._create_documents(2, state='ready')
+        next_day = self.date + timedelta(days=1)
+        count = Slot.search_count([])
+        self.assertEqual(Slot.get_remaining_capacity(next_day, 'anadolu', self.district), self.district_cap)
+        self.assertEqual(Slot.get_remaining_capacity(self.date, 'anadolu', self.district), self.district_cap - 2)
+        self.assertEqual(Slot.search_count([]), count)
+
+    def test_state_write_moves_reservation(self):
+        document = self._create_documents(1)
+        document.write({'state': 'ready'})
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 1)
+        document.write({'state': 'on_road'})
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 1)
+        document.write({'state': 'cancelled'})
+        self.assertEqual(self._get_reserved(self.date, 'anadolu'), 0)
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 0)
+
+    def test_reserve_reads_current_rule(self):
+        self._create_documents(1, state='ready')
+        self.env['delivery.district.day'].search([
+            ('district_name', '=', self.district), ('weekday', '=', self.date.weekday()),
+        ]).write({'max_delivery_count': 1})
+        with self.assertRaises(ValidationError):
+            self._create_documents(1, state='ready')
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from odoo.tests.common import BaseCase
+
+from ..utils import capacity_simulator
+
+
+class TestCapacitySimulator(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(7)
+        self.horizon, self.districts = 21, 6
+        self.demand = rng.uniform(0.0, 30.0, (self.horizon, self.districts))
+        self.allowed = rng.random((self.districts, 7)) < 0.5
+        self.district_caps = rng.uniform(5.0, 40.0, (self.districts, 7))
+        self.region_index = np.array([0, 0, 0, 1, 1, 1])
+        self.vehicle_caps, extra_days, self.factors = capacity_simulator.build_scenarios(
+            [10, 25, 60], [0, 2], [0.8, 1.0, 1.5])
+        self.extra_mask = capacity_simulator.extra_vehicle_mask(extra_days, self.demand.sum(axis=1)[:7])
+        self.initial_backlog = rng.uniform(0.0, 10.0, self.districts)
+
+    def _simulate(self, start_weekday=0):
+        return capacity_simulator.simulate(
+            self.demand, self.allowed, self.district_caps, self.region_index,
+            self.vehicle_caps, self.extra_mask, demand_factors=self.factors,
+            start_weekday=start_weekday, initial_backlog=self.initial_backlog)
+
+    def test_conservation(self):
+        # Gelen talep + başlangıç birikimi = dağıtılan + ufuk sonunda bekleyen
+        for start_weekday in range(7):
+            result = self._simulate(start_weekday)
+            incoming = self.demand.sum() * self.factors + self.initial_backlog.sum()
+            np.testing.assert_allclose(result['load'].sum(axis=1) + result['unserved'], incoming)
+            self.assertTrue((result['load'] >= -1e-9).all())
+            self.assertTrue((result['backlog'] >= -1e-9).all())
+
+    def test_capacity_limits(self):
+        result = self._simulate()
+        weekdays = np.arange(self.horizon) % 7
+        vehicle_limit = self.vehicle_caps[:, None] * (
+            2 * capacity_simulator.SIDE_VEHICLE_COUNT + capacity_simulator.FLEXIBLE_VEHICLE_COUNT
+            + self.extra_mask[:, weekdays])
+        district_limit = np.where(self.allowed, self.district_caps, 0.0).sum(axis=0)[weekdays]
+        self.assertTrue((result['load'] <= vehicle_limit + 1e-9).all())
+        self.assertTrue((result['load'] <= district_limit[None, :] + 1e-9).all())
+        np.testing.assert_allclose(result['load'][:, weekdays == capacity_simulator.SUNDAY], 0.0)
+
+    def test_ample_capacity_serves_same_day(self):
+        demand = np.ones((6, 2))
+        result = capacity_simulator.simulate(
+            demand, np.ones((2, 7), dtype=bool), np.full((2, 7), 100.0), [0, 1],
+            [100.0], np.zeros((1, 7), dtype=bool))
+        np.testing.assert_allclose(result['load'], 2.0)
+        np.testing.assert_allclose(result['unserved'], 0.0)
+        np.testing.assert_allclose(result['mean_wait'], 0.0)
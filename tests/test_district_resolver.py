@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import BaseCase
+
+from ..utils import district_resolver
+
+
+class TestDistrictResolver(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lookup = district_resolver.build_lookup()
+
+    def test_turkish_dotted_and_dotless_i(self):
+        # Türkçe I -> ı, İ -> i küçülmesi; str.lower() 'İ'yi 'i̇' yapar
+        self.assertEqual(district_resolver.fold('ŞİŞLİ'), district_resolver.fold('şişli'))
+        self.assertEqual(district_resolver.fold('KADIKÖY'), district_resolver.fold('Kadıköy'))
+        self.assertEqual(district_resolver.resolve('ŞİŞLİ', self.lookup), 'Şişli')
+        self.assertEqual(district_resolver.resolve('şişli', self.lookup), 'Şişli')
+        self.assertEqual(district_resolver.resolve('KADIKÖY', self.lookup), 'Kadıköy')
+        self.assertEqual(district_resolver.resolve('SARIYER', self.lookup), 'Sarıyer')
+        self.assertEqual(district_resolver.resolve('ISTANBUL/ŞİŞLİ', self.lookup), 'Şişli')
+        self.assertEqual(district_resolver.resolve('Kadıköy / İstanbul', self.lookup), 'Kadıköy')
+
+    def test_aliases(self):
+        self.assertEqual(district_resolver.resolve('EYÜP', self.lookup), 'Eyüpsultan')
+        self.assertEqual(district_resolver.resolve('Eyüp Sultan', self.lookup), 'Eyüpsultan')
+        self.assertEqual(district_resolver.resolve('K. Çekmece', self.lookup), 'Küçükçekmece')
+        self.assertEqual(district_resolver.resolve('GOP', self.lookup), 'Gaziosmanpaşa')
+
+    def test_unknown_and_extra_names(self):
+        self.assertEqual(district_resolver.resolve('  Bilinmeyen  ', self.lookup), 'Bilinmeyen')
+        self.assertEqual(district_resolver.resolve('', self.lookup), '')
+        # Kural tablosundaki yazım kanonik addan önceliklidir
+        lookup = district_resolver.build_lookup(extra_names=['Eyüp Sultan'])
+        self.assertEqual(district_resolver.resolve('EYÜPSULTAN', lookup), 'Eyüp Sultan')
+        self.assertEqual(district_resolver.resolve('EYÜP', lookup), 'Eyüpsultan')
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestDocumentArchive(DeliveryCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Archive = self.env['delivery.document.archive']
+        self.cutoff = self.date + timedelta(days=1)
+
+    def _create_closed_documents(self, count):
+        documents = self._create_documents(count)
+        documents.action_confirm()
+        documents.action_on_road()
+        documents.action_delivered()
+        return documents
+
+    def test_archive_moves_messages(self):
+        document = self._create_closed_documents(1)
+        message = document.message_post(body='Teslimat notu')
+        name, picking = document.name, document.picking_id
+        document_id = document.id
+
+        self.assertEqual(self.Archive._archive_documents(self.cutoff, 10), 1)
+        self.assertFalse(self.env['delivery.document'].search([('id', '=', document_id)]))
+        archive = self.Archive.search([('original_id', '=', document_id)])
+        self.assertEqual(archive.name, name)
+        self.assertEqual(archive.state, 'delivered')
+        self.assertEqual(archive.picking_id, picking)
+        message.invalidate_cache()
+        self.assertEqual((message.model, message.res_id), (self.Archive._name, archive.id))
+        self.assertIn(message, archive.message_ids)
+
+    def test_picking_still_counts_archived_documents(self):
+        documents = self._create_closed_documents(2)
+        pickings = documents.mapped('picking_id')
+        self.Archive._archive_documents(self.cutoff, 10)
+
+        pickings.invalidate_cache()
+        self.assertEqual(pickings.mapped('delivery_document_count'), [1, 1])
+        self.assertTrue(all(pickings.mapped('is_delivery_created')))
+        # Arşivlenmiş transfer için yeniden belge oluşturulmaz
+        self.assertFalse(pickings._create_delivery_documents('anadolu', self.date))
+
+    def test_archive_skips_open_and_recent_documents(self):
+        closed = self._create_closed_documents(3)
+        open_document = self._create_documents(1)
+        self.assertEqual(self.Archive._archive_documents(self.date, 10), 0)
+        self.assertEqual(self.Archive._archive_documents(self.cutoff, 2), 2)
+        self.assertEqual(self.Archive._archive_documents(self.cutoff, 2), 1)
+        self.assertTrue(open_document.exists())
+        self.assertFalse(closed.exists())
+
+    def test_cutoff_keeps_service_time_lookback(self):
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('delivery.archive_months', 1)
+        params.set_param('delivery.service_time_days', 90)
+        today = fields.Date.context_today(self.Archive)
+        self.assertEqual(self.Archive._get_archive_cutoff(), today - timedelta(days=90))
+        params.set_param('delivery.archive_months', 12)
+        self.assertEqual(self.Archive._get_archive_cutoff(), today - relativedelta(months=12))
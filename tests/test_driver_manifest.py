@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestDriverManifest(DeliveryCase):
+
+    def test_removed_documents_are_reported(self):
+        Document = self.env['delivery.document']
+        documents = self._create_documents(3)
+        documents.action_confirm()
+        manifest = Document._get_driver_manifest('anadolu', self.date)
+        self.assertEqual({stop['id'] for stop in manifest['stops']}, set(documents.ids))
+
+        moved, deleted, kept = documents
+        moved.write({'vehicle_type': 'avrupa'})
+        deleted.action_cancel()
+        deleted.action_reset_to_draft()
+        deleted.unlink()
+        manifest = Document._get_driver_manifest('anadolu', self.date, cursor=manifest['cursor'])
+        self.assertEqual(manifest['removed'], sorted([moved.id, deleted.id]))
+        self.assertNotIn(kept.id, manifest['removed'])
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestPartnerSnapshot(DeliveryCase):
+
+    def test_confirm_keeps_corrected_district(self):
+        self.env['delivery.district.day'].create({
+            'district_name': 'Düzeltilmiş',
+            'weekday': self.date.weekday(),
+            'max_delivery_count': 5,
+        })
+        document = self._create_documents(1)
+        document.district = 'Düzeltilmiş'
+        self.partner.mobile = '+90 555 111 1111'
+
+        document.action_confirm()
+        self.assertEqual(document.district, 'Düzeltilmiş')
+        self.assertEqual(document.partner_mobile, '+90 555 111 1111')
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', 'Düzeltilmiş'), 1)
+
+    def test_refresh_resolves_district(self):
+        document = self._create_documents(1)
+        document.district = False
+        document.action_confirm()
+        self.assertEqual(document.district, self.district)
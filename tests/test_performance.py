@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+import googlemaps
+
+from odoo.tests import tagged
+
+from .common import DeliveryBenchmarkCase, StubMapsClient
+
+
+@tagged('-standard', '-at_install', 'post_install', 'delivery_benchmark')
+class TestDeliveryPerformance(DeliveryBenchmarkCase):
+    """Sıcak yolların süre ve sorgu sayısı ölçümleri.
+
+    Varsayılan test çalıştırmasına dahil değildir; ``--test-tags
+    delivery_benchmark`` ile çalıştırılır. Sonuçlar DELIVERY_BENCH_OUTPUT
+    dosyasına JSON olarak yazılır.
+    """
+
+    def _plan_start_date(self):
+        """Başlangıç tarihindeki hazır belgeler için araç başına planlama oluştur"""
+        ready = self.documents.filtered(
+            lambda d: d.delivery_date == self.start_date and d.state == 'ready')
+        vehicles = sorted(set(ready.mapped('vehicle_type')))
+        plannings = self.env['delivery.planning'].create([{
+            'planning_date': self.start_date,
+            'vehicle_type': vehicle,
+        } for vehicle in vehicles])
+        for planning in plannings:
+            ready.filtered(lambda d: d.vehicle_type == planning.vehicle_type).write(
+                {'planning_id': planning.id})
+        return plannings, ready
+
+    def test_document_create(self):
+        vals_list = self._prepare_document_vals(self.free_pickings)
+        documents = self.measure('document.create', self.env['delivery.document'].create,
+                                 vals_list, records=len(vals_list))
+        self.assertEqual(len(documents), len(self.free_pickings))
+
+    def test_document_transitions(self):
+        drafts = self.documents.filtered(lambda d: d.state == 'draft')
+        self.measure('document.action_confirm', drafts.action_confirm, records=len(drafts))
+        self.measure('document.action_on_road', drafts.action_on_road, records=len(drafts))
+        self.measure('document.action_delivered', drafts.action_delivered, records=len(drafts))
+
+        ready = self.documents.filtered(lambda d: d.state == 'ready')
+        self.measure('document.action_cancel', ready.action_cancel, records=len(ready))
+        self.assertEqual(set(ready.mapped('state')), {'cancelled'})
+
+    def test_planning_cycle(self):
+        plannings, documents = self._plan_start_date()
+        self.measure('planning.action_confirm', plannings.action_confirm, records=len(documents))
+        self.measure('planning.action_start', plannings.action_start, records=len(documents))
+        self.measure('document.action_delivered', documents.action_delivered, records=len(documents))
+        self.measure('planning.action_done', plannings.action_done, records=len(documents))
+        self.assertEqual(set(plannings.mapped('state')), {'done'})
+
+    def test_picking_computes(self):
+        fnames = ['delivery_document_count', 'is_delivery_created', 'is_delivery_ready']
+        self.measure('picking.read_delivery_fields', self.pickings.read, fnames,
+                     records=len(self.pickings))
+        Picking = self.env['stock.picking']
+        self.measure('picking.search_is_delivery_ready', Picking.search,
+                     [('id', 'in', self.pickings.ids), ('is_delivery_ready', '=', True)],
+                     records=len(self.pickings))
+
+    def test_report_reads(self):
+        Report = self.env['delivery.report']
+        self.measure('report.refresh', Report._refresh)
+        rows = self.measure('report.search_read', Report.search_read, [], records=0)
+        self.measure('report.read_group_district', Report.read_group, [],
+                     ['delivery_count', 'total_distance'], ['district'], records=len(rows))
+        self.measure('report.read_group_date_vehicle', Report.read_group, [],
+                     ['delivery_count', 'success_rate'], ['date:day', 'vehicle_type'],
+                     lazy=False, records=len(rows))
+
+    def test_route_optimization(self):
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('delivery.google_maps_api_key', 'stub-key')
+        plannings, documents = self._plan_start_date()
+        routes = self.env['delivery.route'].create([{
+            'planning_id': planning.id,
+            'start_location': 'Depo, Tuzla, İstanbul',
+            'end_location': 'Depo, Tuzla, İstanbul',
+        } for planning in plannings])
+        route = max(routes, key=lambda r: len(r.planning_id.delivery_ids))
+        stops = len(route.planning_id.delivery_ids)
+
+        StubMapsClient.calls.clear()
+        with patch.object(googlemaps, 'Client', StubMapsClient):
+            # Soğuk: konumlar ve matris sahte sağlayıcıdan alınıp önbelleğe yazılır
+            self.measure('route.optimize_local_cold', route._optimize_locally, records=stops)
+            # Sıcak: yalnızca önbellek ve yerel çözücü
+            self.measure('route.optimize_local_warm', route._optimize_locally,
+                         fetch_missing=False, records=stops)
+            params.set_param('delivery.route_optimizer', 'google')
+            self.measure('route.action_optimize_route', route.action_optimize_route, records=stops)
+
+        self.assertEqual(route.state, 'optimized')
+        self.assertTrue(StubMapsClient.calls['directions'])
+
+        # Yeniden optimizasyon izleme kaydı üretmez; revizyon başına tek özet mesaj yazılır
+        messages = len(route.message_ids)
+        with patch.object(googlemaps, 'Client', StubMapsClient):
+            self.measure('route.reoptimize', route.action_optimize_route, records=stops)
+        self.assertEqual(len(route.revision_ids), 2)
+        self.assertEqual(len(route.message_ids), messages + 1)
+        self.assertFalse(route.message_ids.mapped('tracking_value_ids').filtered(
+            lambda t: t.field.name in ('total_distance', 'total_duration', 'waypoints')))
+
+        # Çözümleme sağlayıcıya gitmeden önbellekteki veriden yapılır
+        StubMapsClient.calls.clear()
+        with patch.object(googlemaps, 'Client', StubMapsClient):
+            self.measure('route.decode_optimized_route', lambda: route.optimized_route, records=stops)
+            self.measure('route.get_route_map_url', route.get_route_map_url, records=stops)
+            self.measure('route.get_route_geometry', route.get_route_geometry, records=stops)
+        self.assertFalse(sum(StubMapsClient.calls.values()))
+
+    def test_route_batch_optimization(self):
+        self.env['ir.config_parameter'].sudo().set_param('delivery.route_optimizer', 'stub')
+        plannings, documents = self._plan_start_date()
+        routes = self.env['delivery.route'].create([{
+            'planning_id': planning.id,
+            'start_location': 'Depo, Tuzla, İstanbul',
+            'end_location': 'Depo, Tuzla, İstanbul',
+        } for planning in plannings])
+        self.env['base'].flush()
+
+        StubMapsClient.calls.clear()
+        # İşçiler kendi imleçlerini açar; test modunda bunlar test imlecini sırayla paylaşır
+        self.registry.enter_test_mode(self.cr)
+        try:
+            results = self.measure('route.optimize_concurrently', routes._optimize_concurrently,
+                                   records=len(documents))
+        finally:
+            self.registry.leave_test_mode()
+
+        self.assertEqual({result['status'] for result in results}, {'ok'})
+        self.assertEqual({result['optimizer'] for result in results}, {'stub'})
+        # İşçilerin yazdıkları test imlecinde görünür; önbellek elle boşaltılır
+        routes.invalidate_cache()
+        self.assertEqual(set(routes.mapped('state')), {'optimized'})
+        self.assertTrue(StubMapsClient.calls['directions'])
+
+    def test_route_batch_optimization_uncommitted(self):
+        self.env['ir.config_parameter'].sudo().set_param('delivery.route_optimizer', 'stub')
+        plannings, _documents = self._plan_start_date()
+        routes = self.env['delivery.route'].create([{
+            'planning_id': planning.id,
+            'start_location': 'Depo, Tuzla, İstanbul',
+            'end_location': 'Depo, Tuzla, İstanbul',
+        } for planning in plannings])
+
+        # Kaydedilmemiş rotalar işçilere verilmez, mevcut işlemde optimize edilir
+        self.assertEqual(routes._get_uncommitted_routes(), routes)
+        results = routes._optimize_concurrently()
+        self.assertEqual([result['route_id'] for result in results], routes.ids)
+        self.assertEqual({result['status'] for result in results}, {'ok'})
+        self.assertEqual(set(routes.mapped('state')), {'optimized'})
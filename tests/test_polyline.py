@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import BaseCase
+
+from ..utils import polyline
+
+# Google'ın biçim belgesindeki örnek
+REFERENCE_POINTS = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+REFERENCE_TEXT = '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+
+class TestPolyline(BaseCase):
+
+    def test_reference_vector(self):
+        self.assertEqual(polyline.encode(REFERENCE_POINTS), REFERENCE_TEXT)
+        for (lat, lng), (expected_lat, expected_lng) in zip(polyline.decode(REFERENCE_TEXT), REFERENCE_POINTS):
+            self.assertAlmostEqual(lat, expected_lat, places=5)
+            self.assertAlmostEqual(lng, expected_lng, places=5)
+
+    def test_round_trip(self):
+        points = [(41.0082, 28.9784), (40.9901, 29.0292), (41.0422, 29.0083), (41.0422, 29.0083)]
+        decoded = polyline.decode(polyline.encode(points))
+        self.assertEqual(len(decoded), len(points))
+        for (lat, lng), (expected_lat, expected_lng) in zip(decoded, points):
+            self.assertAlmostEqual(lat, expected_lat, places=5)
+            self.assertAlmostEqual(lng, expected_lng, places=5)
+        self.assertEqual(polyline.decode(''), [])
+        self.assertEqual(polyline.decode(False), [])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestRouteEta(DeliveryCase):
+
+    def test_departure_hour_is_local_time(self):
+        self.env['ir.config_parameter'].sudo().set_param('delivery.departure_hour', 9)
+        planning = self.env['delivery.planning'].create({
+            'planning_date': self.date,
+            'vehicle_type': 'anadolu',
+        })
+        route = self.env['delivery.route'].create({
+            'planning_id': planning.id,
+            'start_location': 'Depo',
+            'end_location': 'Depo',
+        })
+        # İstanbul UTC+3: yerel 09:00 kalkış veritabanında 06:00 UTC
+        self.assertEqual(route._get_departure_time(),
+                         datetime.combine(self.date, datetime.min.time()) + timedelta(hours=6))
+
+        document = self._create_documents(1)
+        vals = self.env['delivery.route.stop']._prepare_stop_vals(
+            route, document.ids, [20 * 60], {None: 600})
+        body = document._get_sms_body('on_road', eta=vals[0]['eta'])
+        self.assertIn('09:20', body)
+
+    def test_batched_deliveries_are_not_service_samples(self):
+        planning = self.env['delivery.planning'].create({
+            'planning_date': self.date,
+            'vehicle_type': 'anadolu',
+        })
+        route = self.env['delivery.route'].create({
+            'planning_id': planning.id,
+            'start_location': 'Depo',
+            'end_location': 'Depo',
+        })
+        documents = self._create_documents(8)
+        now = datetime.now().replace(microsecond=0)
+        Stop = self.env['delivery.route.stop']
+        # İlk dört durak tek seferde, kalanlar onar dakika arayla teslim edilmiş
+        delivered = [now] * 4 + [now + timedelta(minutes=10 * index) for index in range(1, 5)]
+        Stop.create([{
+            'route_id': route.id,
+            'document_id': document.id,
+            'sequence': sequence,
+            'leg_duration': 0,
+            'delivered_date': date,
+        } for sequence, (document, date) in enumerate(zip(documents, delivered), start=1)])
+
+        # Geriye yalnızca üç gerçek aralık kalır; örnek sayısı yetmez
+        self.assertNotIn(self.district, Stop._get_service_estimates())
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+
+from odoo.tests.common import BaseCase
+
+from ..utils import route_solver
+
+
+def _random_matrix(size, seed):
+    """Köşegeni sıfır, asimetrik rastgele maliyet matrisi"""
+    matrix = np.random.default_rng(seed).uniform(1.0, 100.0, (size, size))
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def _neighbours(path):
+    """Tek bir 2-opt ya da Or-opt hamlesiyle ulaşılan tüm yollar"""
+    path = list(path)
+    for i in range(1, len(path) - 2):
+        for j in range(i + 1, len(path) - 1):
+            yield path[:i] + path[i:j + 1][::-1] + path[j + 1:]
+    for length in (1, 2, 3):
+        for i in range(1, len(path) - length):
+            segment, rest = path[i:i + length], path[:i] + path[i + length:]
+            for position in range(1, len(rest)):
+                yield rest[:position] + segment + rest[position:]
+
+
+class TestRouteSolver(BaseCase):
+
+    def test_tour_is_valid(self):
+        for seed, (start, end) in enumerate([(0, None), (2, 7), (3, 3)]):
+            matrix = _random_matrix(12, seed)
+            path = route_solver.solve(matrix, start=start, end=end)
+            end = 11 if end is None else end
+            self.assertEqual(path[0], start)
+            self.assertEqual(path[-1], end)
+            self.assertEqual(sorted(set(path)), list(range(12)))
+            self.assertEqual(len(path), 12 + (start == end))
+            stops = [node for node in range(12) if node not in (start, end)]
+            self.assertLessEqual(
+                route_solver.path_cost(matrix, path),
+                route_solver.path_cost(matrix, route_solver.nearest_neighbour(matrix, start, end, stops)))
+
+    def test_small_asymmetric_matches_brute_force(self):
+        for seed in range(50):
+            matrix = _random_matrix(5, seed)
+            best = min(route_solver.path_cost(matrix, (0,) + order + (4,))
+                       for order in itertools.permutations(range(1, 4)))
+            self.assertAlmostEqual(route_solver.path_cost(matrix, route_solver.solve(matrix)), best)
+
+    def test_asymmetric_result_is_local_optimum(self):
+        # Vektörleştirilmiş hamle farkları yönü dikkate almazsa iyileştiren
+        # bir komşu kalır; komşuluk burada tek tek hesaplanır
+        for seed in range(20):
+            matrix = _random_matrix(9, seed)
+            path = route_solver.solve(matrix)
+            cost = route_solver.path_cost(matrix, path)
+            for neighbour in _neighbours(path):
+                self.assertGreaterEqual(route_solver.path_cost(matrix, neighbour), cost - 1e-9)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestSequenceBlocks(DeliveryCase):
+
+    def setUp(self):
+        super().setUp()
+        self.block_size = 10
+        self.env['ir.config_parameter'].sudo().set_param('delivery.sequence_block_size', self.block_size)
+        self.sequence = self.env.ref('teslimat.seq_delivery_planning')
+
+    def _create_plannings(self, count):
+        return self.env['delivery.planning'].create([{
+            'planning_date': self.date,
+            'vehicle_type': 'anadolu',
+        } for _index in range(count)])
+
+    def _numbers(self, plannings):
+        return [int(name.rsplit('/', 1)[1]) for name in plannings.mapped('name')]
+
+    def test_no_gap_numbers_are_consecutive(self):
+        self.sequence.write({'implementation': 'no_gap'})
+        start = self.sequence.number_next_actual
+        numbers = self._numbers(self._create_plannings(2)) + self._numbers(self._create_plannings(3))
+        self.assertEqual(numbers, list(range(start, start + 5)))
+        # Boşluksuz sırada yalnızca kullanılan numaralar ayrılır
+        self.assertEqual(self.sequence.number_next_actual, start + 5)
+
+    def test_standard_numbers_come_from_pool(self):
+        # Yazma işlemi bu sıranın eski bloklarını da bırakır
+        self.sequence.write({'implementation': 'standard'})
+        start = self.sequence.number_next_actual
+        first = self._numbers(self._create_plannings(2))
+        second = self._numbers(self._create_plannings(3))
+        self.assertEqual(first + second, list(range(start, start + 5)))
+        # İkinci oluşturma veritabanına gitmeden havuzdan karşılanır
+        self.sequence.invalidate_cache(['number_next_actual'])
+        self.assertEqual(self.sequence.number_next_actual, start + self.block_size)
+
+    def test_write_drops_pool(self):
+        self.sequence.write({'implementation': 'standard'})
+        start = self.sequence.number_next_actual
+        self._create_plannings(1)
+        self.sequence.write({'prefix': 'PLN/'})
+        self.assertEqual(self._numbers(self._create_plannings(1)), [start + self.block_size])
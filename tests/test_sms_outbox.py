@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+def _send_ok(records, **kwargs):
+    records.write({'state': 'sent'})
+
+
+def _send_error(records, **kwargs):
+    raise Exception('Sağlayıcı yanıt vermedi')
+
+
+@tagged('post_install', '-at_install')
+class TestSmsOutbox(DeliveryCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Outbox = self.env['delivery.sms.outbox']
+        self.SmsSms = type(self.env['sms.sms'])
+        self.Cron = type(self.env['ir.cron'])
+        self.env['ir.config_parameter'].sudo().set_param('delivery.sms_retry_delay', 5)
+        self.env['ir.config_parameter'].sudo().set_param('delivery.sms_max_attempts', 2)
+
+    def _enqueue(self, documents):
+        with patch.object(self.Cron, '_trigger') as trigger:
+            messages = self.Outbox._enqueue(documents, 'delivered')
+        return messages, trigger
+
+    def test_enqueue_is_deduplicated(self):
+        documents = self._create_documents(2)
+        messages, trigger = self._enqueue(documents)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(trigger.call_count, 1)
+
+        messages, trigger = self._enqueue(documents)
+        self.assertFalse(messages)
+        trigger.assert_not_called()
+        self.assertEqual(self.Outbox.search_count([('document_id', 'in', documents.ids)]), 2)
+
+    def test_send_marks_documents(self):
+        document = self._create_documents(1)
+        message, _trigger = self._enqueue(document)
+        with patch.object(self.SmsSms, 'send', _send_ok):
+            self.Outbox._cron_send_pending()
+        self.assertEqual(message.state, 'sent')
+        self.assertTrue(message.sent_date)
+        self.assertTrue(document.sms_sent_delivered)
+        self.assertFalse(self.env['sms.sms'].search([('body', '=', message.body)]))
+
+    def test_failed_send_backs_off(self):
+        message, _trigger = self._enqueue(self._create_documents(1))
+        for attempt, delay in ((1, 5), (2, 10)):
+            message.next_attempt_date = fields.Datetime.now() - timedelta(seconds=1)
+            start = fields.Datetime.now()
+            with patch.object(self.SmsSms, 'send', _send_error):
+                self.Outbox._cron_send_pending()
+            self.assertEqual(message.attempt_count, attempt)
+            self.assertIn('Sağlayıcı yanıt vermedi', message.last_error)
+            self.assertGreaterEqual(message.next_attempt_date, start + timedelta(minutes=delay))
+            self.assertLess(message.next_attempt_date, start + timedelta(minutes=delay, seconds=30))
+        # Deneme sınırına ulaşan mesaj bir daha denenmez
+        self.assertEqual(message.state, 'failed')
+
+    def test_backed_off_message_waits(self):
+        message, _trigger = self._enqueue(self._create_documents(1))
+        with patch.object(self.SmsSms, 'send', _send_error):
+            self.Outbox._cron_send_pending()
+        with patch.object(self.SmsSms, 'send', _send_ok):
+            self.Outbox._cron_send_pending()
+        self.assertEqual(message.state, 'pending')
+        self.assertEqual(message.attempt_count, 1)
+
+    def test_full_batch_retriggers_cron(self):
+        self._enqueue(self._create_documents(3))
+        with patch.object(self.SmsSms, 'send', _send_ok), \
+                patch.object(self.Cron, '_trigger') as trigger:
+            self.Outbox._cron_send_pending(batch_size=2)
+            self.assertEqual(trigger.call_count, 1)
+            self.Outbox._cron_send_pending(batch_size=2)
+            self.assertEqual(trigger.call_count, 1)
+        self.assertFalse(self.Outbox.search([('state', '=', 'pending')]))
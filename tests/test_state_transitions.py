@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestStateTransitions(DeliveryCase):
+
+    def test_mixed_batch_lists_invalid_documents(self):
+        documents = self._create_documents(4)
+        ready, draft = documents[:2], documents[2:]
+        ready.action_confirm()
+
+        with self.assertRaises(UserError) as error:
+            documents.action_on_road()
+        message = str(error.exception)
+        self.assertEqual(message.count('\n'), 1)
+        for name in draft.mapped('name'):
+            self.assertIn(name, message)
+        for name in ready.mapped('name'):
+            self.assertNotIn(name, message)
+        # Hata durumunda hiçbir belge geçiş yapmaz
+        self.assertEqual(documents.mapped('state'), ['ready', 'ready', 'draft', 'draft'])
+
+    def test_batch_transition(self):
+        documents = self._create_documents(3)
+        documents.action_confirm()
+        documents.action_on_road()
+        self.assertEqual(set(documents.mapped('state')), {'on_road'})
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 3)
+        self.assertEqual(self.env['delivery.sms.outbox'].search_count([
+            ('document_id', 'in', documents.ids), ('event', '=', 'on_road')]), 3)
+
+        documents.action_delivered()
+        self.assertEqual(set(documents.mapped('state')), {'delivered'})
+        with self.assertRaises(UserError):
+            documents.action_cancel()
+
+    def test_cancel_releases_capacity(self):
+        documents = self._create_documents(2)
+        documents.action_confirm()
+        (documents | self._create_documents(1)).action_cancel()
+        self.assertEqual(self._get_reserved(self.date, 'anadolu', self.district), 0)
+
+    def test_planning_mixed_batch_lists_invalid_plannings(self):
+        Planning = self.env['delivery.planning']
+        plannings = Planning.create([{
+            'planning_date': self.date,
+            'vehicle_type': vehicle_type,
+        } for vehicle_type in ('anadolu', 'avrupa', 'ek_arac')])
+        for planning in plannings:
+            documents = self._create_documents(1, vehicle_type=planning.vehicle_type)
+            documents.action_confirm()
+            documents.planning_id = planning
+        plannings[:2].action_confirm()
+
+        with self.assertRaises(ValidationError) as error:
+            plannings.action_start()
+        self.assertIn(plannings[2].name, str(error.exception))
+        self.assertNotIn(plannings[0].name, str(error.exception))
+        self.assertEqual(set(plannings.mapped('delivery_ids.state')), {'ready'})
+
+        plannings[:2].action_start()
+        self.assertEqual(set(plannings[:2].mapped('delivery_ids.state')), {'on_road'})
+        plannings[:2].action_cancel()
+        self.assertEqual(set(plannings.mapped('delivery_ids.state')), {'ready'})
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+
+from odoo.tests.common import BaseCase
+
+from ..utils import vehicle_planner
+
+
+class TestVehiclePlanner(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stops = [{
+            'id': index,
+            'region': 'anadolu' if index % 3 else 'avrupa',
+            'district': 'İlçe %s' % (index % 4),
+            'lat': 41.0 + 0.01 * (index % 7),
+            'lng': 29.0 + 0.013 * (index % 5),
+        } for index in range(40)]
+        self.by_id = {stop['id']: stop for stop in self.stops}
+
+    def _check_partition(self, assignments, unassigned, stops):
+        assigned = [stop_id for ids in assignments.values() for stop_id in ids]
+        self.assertEqual(sorted(assigned + unassigned), sorted(stop['id'] for stop in stops))
+
+    def test_vehicle_capacity_respected(self):
+        capacities = {'anadolu': 10, 'avrupa': 8, 'kucuk_arac_1': 5, 'kucuk_arac_2': 5, 'ek_arac': 0}
+        stops = self.stops + [{'id': 99, 'region': False, 'district': 'Bilinmeyen', 'lat': None, 'lng': None}]
+        assignments, unassigned = vehicle_planner.plan(stops, capacities)
+        self._check_partition(assignments, unassigned, stops)
+        self.assertIn(99, unassigned)
+        self.assertNotIn('ek_arac', assignments)
+        for vehicle, ids in assignments.items():
+            self.assertLessEqual(len(ids), capacities[vehicle])
+            if vehicle in vehicle_planner.SIDE_VEHICLES:
+                # Yaka aracı yalnızca kendi yakasındaki durakları alır
+                self.assertEqual({self.by_id[stop_id]['region'] for stop_id in ids},
+                                 {vehicle_planner.SIDE_VEHICLES[vehicle]})
+        self.assertEqual(len(unassigned), len(stops) - sum(
+            capacity for capacity in capacities.values()))
+
+    def test_district_capacity_respected(self):
+        capacities = {'anadolu': 20, 'avrupa': 30, 'kucuk_arac_1': 10, 'kucuk_arac_2': 0, 'ek_arac': 0}
+        district_capacities = {('anadolu', 'İlçe 1'): 2, ('avrupa', 'İlçe 0'): 0}
+        assignments, unassigned = vehicle_planner.plan(
+            self.stops, capacities, district_capacities=district_capacities)
+        self._check_partition(assignments, unassigned, self.stops)
+        for vehicle, ids in assignments.items():
+            used = Counter(self.by_id[stop_id]['district'] for stop_id in ids)
+            for district, count in used.items():
+                self.assertLessEqual(count, district_capacities.get((vehicle, district), count))
+        self.assertEqual(
+            Counter(self.by_id[stop_id]['district'] for stop_id in assignments['anadolu'])['İlçe 1'], 2)
+        # Sınırlanmamış esnek araç, ilçe sınırına takılan durakları alır
+        self.assertTrue(any(self.by_id[stop_id]['district'] == 'İlçe 1'
+                            for stop_id in assignments.get('kucuk_arac_1', [])))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import DeliveryCase
+
+
+@tagged('post_install', '-at_install')
+class TestVehicleSelectionWizard(DeliveryCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Wizard = self.env['vehicle.selection.wizard']
+        self.env['ir.config_parameter'].sudo().set_param('delivery.available_slot_count', 100)
+
+    def _slots(self, pickings):
+        return {(slot['date'], slot['vehicle_type']): slot for slot in self.Wizard._get_available_slots(pickings)}
+
+    def test_slots_respect_district_cap(self):
+        self._create_documents(self.district_cap - 1, state='ready')
+        picking = self._create_pickings(1)
+
+        slots = self._slots(picking)
+        self.assertEqual(slots[(self.date, 'anadolu')]['district_remaining'], 1)
+        self.assertEqual(slots[(self.date, 'avrupa')]['district_remaining'], self.district_cap)
+        # İki transfer kalan tek yere sığmaz
+        slots = self._slots(picking | self._create_pickings(1))
+        self.assertNotIn((self.date, 'anadolu'), slots)
+        self.assertIn((self.date, 'avrupa'), slots)
+
+        self._create_documents(1, state='ready')
+        self.assertNotIn((self.date, 'anadolu'), self._slots(picking))
+
+    def test_slots_skip_disallowed_days(self):
+        slots = self._slots(self._create_pickings(1))
+        self.assertTrue(slots)
+        self.assertFalse([date for date, _vehicle in slots if date.weekday() == 6])
+
+    def test_default_get_lists_feasible_slots(self):
+        self._create_documents(self.district_cap, state='ready')
+        pickings = self._create_pickings(2)
+        res = self.Wizard.with_context(active_model='stock.picking', active_ids=pickings.ids).default_get(
+            ['picking_ids', 'slot_ids', 'vehicle_type', 'delivery_date'])
+        listed = [(command[2]['delivery_date'], command[2]['vehicle_type']) for command in res['slot_ids']]
+        self.assertTrue(listed)
+        self.assertNotIn((self.date, 'anadolu'), listed)
+        self.assertEqual((res['delivery_date'], res['vehicle_type']), listed[0])
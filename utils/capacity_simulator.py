@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""İlçe-gün takvimi ve araç kapasiteleri için talep simülatörü.
+
+Talep ilçe x gün matrisi olarak verilir; her gün yalnızca o gün izinli
+ilçelerin bekleyen teslimatları dağıtılabilir. Her yakanın kendi aracı
+yalnızca o yakaya, esnek araçlar (küçük araçlar ve ek araç) taşmanın
+olduğu yakaya hizmet eder. Bekleyen teslimatlar geliş gününe göre
+kohortlarda tutulur ve en eski kohort önce dağıtılır; böylece teslimata
+kadar geçen gün sayısı da hesaplanır.
+
+Tüm senaryolar (kapasite, ek araç günleri, talep çarpanı) ilk eksende
+birlikte işlenir; binlerce senaryo tek bir gün döngüsüyle simüle edilir.
+Değerler beklenen sayılardır (ondalıklı), tamsayıya yuvarlanmaz.
+"""
+import itertools
+
+import numpy as np
+
+REGIONS = ('anadolu', 'avrupa')
+# Yaka başına sabit araç sayısı ve ek araç dışındaki esnek araç sayısı
+SIDE_VEHICLE_COUNT = 1
+FLEXIBLE_VEHICLE_COUNT = 2
+SUNDAY = 6
+
+
+def build_scenarios(vehicle_caps, extra_vehicle_days, demand_factors):
+    """Parametrelerin kartezyen çarpımından senaryo dizileri üret.
+
+    Dönüş: (caps, extra_days, factors) dizileri, her biri S uzunluğunda.
+    """
+    grid = list(itertools.product(vehicle_caps, extra_vehicle_days, demand_factors))
+    caps, extra_days, factors = zip(*grid) if grid else ((), (), ())
+    return (np.asarray(caps, dtype=float),
+            np.asarray(extra_days, dtype=int),
+            np.asarray(factors, dtype=float))
+
+
+def extra_vehicle_mask(extra_days, weekday_demand):
+    """Ek aracın çalışacağı günleri talebi en yüksek günlerden seç.
+
+    ``extra_days`` (S,) senaryo başına ek araç gün sayısı, ``weekday_demand``
+    (7,) gün bazında toplam talep. Dönüş (S, 7) boolean maske.
+    """
+    weekday_demand = np.asarray(weekday_demand, dtype=float).copy()
+    weekday_demand[SUNDAY] = -np.inf
+    # Eşit talepte haftanın başındaki gün önce gelir
+    ranking = np.argsort(-weekday_demand, kind='stable')
+    rank_of_day = np.empty(7, dtype=int)
+    rank_of_day[ranking] = np.arange(7)
+    mask = rank_of_day[None, :] < np.asarray(extra_days, dtype=int)[:, None]
+    mask[:, SUNDAY] = False
+    return mask
+
+
+def project_demand(weekday_demand, horizon, start_weekday):
+    """İlçe x gün ortalama talebi ufuk boyunca günlük talebe yay.
+
+    ``weekday_demand`` (D, 7); dönüş (H, D).
+    """
+    weekday_demand = np.asarray(weekday_demand, dtype=float)
+    weekdays = (start_weekday + np.arange(horizon)) % 7
+    return weekday_demand[:, weekdays].T
+
+
+def simulate(demand, allowed, district_caps, region_index, vehicle_caps, extra_days_mask,
+             demand_factors=None, start_weekday=0, initial_backlog=None):
+    """Senaryoları simüle et.
+
+    Parametreler:
+        demand: (H, D) günlük yeni talep
+        allowed: (D, 7) ilçe-gün izin matrisi
+        district_caps: (D, 7) ilçe-gün maksimum teslimat sayısı
+        region_index: (D,) yaka indeksi (REGIONS sırası)
+        vehicle_caps: (S,) araç başına günlük kapasite
+        extra_days_mask: (S, 7) ek aracın çalıştığı günler
+        demand_factors: (S,) talep çarpanı (varsayılan 1)
+        start_weekday: ufkun ilk gününün haftanın günü
+        initial_backlog: (D,) ufuk başında bekleyen teslimatlar
+
+    Dönüş sözlüğü:
+        load (S, H): gün bazında dağıtılan teslimat
+        overflow (S, H): gün sonunda dağıtılabilir durumda olup kapasite
+            nedeniyle kalan teslimat
+        backlog (S, H): gün sonunda bekleyen toplam teslimat
+        mean_wait (S,): dağıtılan teslimatlar için ortalama bekleme günü
+        max_wait (S,): dağıtılan en uzun bekleme günü
+        unserved (S,): ufuk sonunda bekleyen teslimat
+    """
+    demand = np.asarray(demand, dtype=float)
+    horizon, district_count = demand.shape
+    allowed = np.asarray(allowed, dtype=bool)
+    district_caps = np.where(allowed, np.asarray(district_caps, dtype=float), 0.0)
+    region_index = np.asarray(region_index, dtype=int)
+    vehicle_caps = np.asarray(vehicle_caps, dtype=float)
+    scenario_count = vehicle_caps.shape[0]
+    extra_days_mask = np.asarray(extra_days_mask, dtype=bool)
+    if demand_factors is None:
+        demand_factors = np.ones(scenario_count)
+    demand_factors = np.asarray(demand_factors, dtype=float)
+
+    # Yaka üyelik matrisi (D, R)
+    membership = np.zeros((district_count, len(REGIONS)))
+    valid = (region_index >= 0) & (region_index < len(REGIONS))
+    membership[np.flatnonzero(valid), region_index[valid]] = 1.0
+
+    # Kohortlar eskiden yeniye: cohorts[s, d, 0] ufuk öncesi birikim,
+    # cohorts[s, d, k + 1] k. gün gelip hâlâ bekleyen teslimatlar
+    cohorts = np.zeros((scenario_count, district_count, horizon + 1))
+    if initial_backlog is not None:
+        cohorts[:, :, 0] = np.asarray(initial_backlog, dtype=float)[None, :]
+    # Kohortların geliş günü; ufuk öncesi birikim -1. gün sayılır
+    arrival_day = np.arange(-1, horizon)
+
+    load = np.zeros((scenario_count, horizon))
+    overflow = np.zeros((scenario_count, horizon))
+    backlog = np.zeros((scenario_count, horizon))
+    wait_total = np.zeros(scenario_count)
+    served_total = np.zeros(scenario_count)
+    max_wait = np.zeros(scenario_count)
+
+    for day in range(horizon):
+        weekday = (start_weekday + day) % 7
+        cohorts[:, :, day + 1] = demand[day][None, :] * demand_factors[:, None]
+        # Henüz gelmemiş kohortlar boş; yalnızca bugüne kadarkiler işlenir
+        active = cohorts[:, :, :day + 2]
+        waiting = active.sum(axis=2)
+
+        if weekday == SUNDAY:
+            backlog[:, day] = waiting.sum(axis=1)
+            continue
+
+        # Dağıtılabilir talep: bugün izinli ilçeler, ilçe limitiyle sınırlı
+        eligible = np.minimum(waiting, district_caps[:, weekday][None, :])
+        region_demand = eligible @ membership
+
+        # Yaka araçları önce kendi yakasına, esnek araçlar taşmaya oranla
+        side_capacity = vehicle_caps[:, None] * SIDE_VEHICLE_COUNT
+        flexible_capacity = vehicle_caps * (FLEXIBLE_VEHICLE_COUNT + extra_days_mask[:, weekday])
+        region_overflow = np.maximum(region_demand - side_capacity, 0.0)
+        overflow_total = region_overflow.sum(axis=1)
+        share = np.divide(region_overflow, overflow_total[:, None],
+                          out=np.zeros_like(region_overflow), where=overflow_total[:, None] > 0)
+        region_capacity = side_capacity + share * np.minimum(flexible_capacity, overflow_total)[:, None]
+        region_served = np.minimum(region_demand, region_capacity)
+
+        # Yaka içinde ilçelere dağıtılabilir taleple orantılı paylaştır
+        ratio = np.divide(region_served, region_demand,
+                          out=np.zeros_like(region_served), where=region_demand > 0)
+        served = eligible * (ratio @ membership.T)
+
+        # Dağıtılanları en eski kohorttan başlayarak düş
+        cumulative = np.cumsum(active, axis=2)
+        remaining = np.maximum(cumulative - served[:, :, None], 0.0)
+        left = np.diff(remaining, axis=2, prepend=0.0)
+        taken = active - left
+        active[...] = left
+
+        waits = day - arrival_day[:day + 2]
+        taken_per_cohort = taken.sum(axis=1)
+        wait_total += taken_per_cohort @ waits
+        served_total += taken_per_cohort.sum(axis=1)
+        took_any = taken_per_cohort > 1e-9
+        max_wait = np.maximum(max_wait, np.where(took_any, waits[None, :], 0).max(axis=1))
+
+        load[:, day] = served.sum(axis=1)
+        overflow[:, day] = (eligible - served).sum(axis=1)
+        backlog[:, day] = left.sum(axis=(1, 2))
+
+    mean_wait = np.divide(wait_total, served_total,
+                          out=np.zeros_like(wait_total), where=served_total > 0)
+    return {
+        'load': load,
+        'overflow': overflow,
+        'backlog': backlog,
+        'mean_wait': mean_wait,
+        'max_wait': max_wait,
+        'unserved': backlog[:, -1] if horizon else np.zeros(scenario_count),
+    }
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""İstanbul ilçe adlarını kanonik biçime çeviren çözümleyici.
+
+Serbest metin şehir/ilçe girdileri Türkçe kurallarına göre küçültülüp
+aksanlarından arındırılır ve önceden hesaplanmış bir tabloda aranır.
+"""
+import re
+import unicodedata
+
+# Kanonik ilçe adları ve bilinen diğer yazımları
+ISTANBUL_DISTRICTS = {
+    'Adalar': [],
+    'Arnavutköy': [],
+    'Ataşehir': [],
+    'Avcılar': [],
+    'Bağcılar': [],
+    'Bahçelievler': [],
+    'Bakırköy': [],
+    'Başakşehir': [],
+    'Bayrampaşa': [],
+    'Beşiktaş': [],
+    'Beykoz': [],
+    'Beylikdüzü': [],
+    'Beyoğlu': [],
+    'Büyükçekmece': ['B.Çekmece', 'B. Çekmece'],
+    'Çatalca': [],
+    'Çekmeköy': [],
+    'Esenler': [],
+    'Esenyurt': [],
+    'Eyüpsultan': ['Eyüp', 'Eyüp Sultan'],
+    'Fatih': ['Eminönü'],
+    'Gaziosmanpaşa': ['G.O.Paşa', 'GOP', 'G.Osmanpaşa'],
+    'Güngören': [],
+    'Kadıköy': [],
+    'Kağıthane': [],
+    'Kartal': [],
+    'Küçükçekmece': ['K.Çekmece', 'K. Çekmece'],
+    'Maltepe': [],
+    'Pendik': [],
+    'Sancaktepe': [],
+    'Sarıyer': [],
+    'Silivri': [],
+    'Sultanbeyli': [],
+    'Sultangazi': [],
+    'Şile': [],
+    'Şişli': [],
+    'Tuzla': [],
+    'Ümraniye': [],
+    'Üsküdar': [],
+    'Zeytinburnu': [],
+}
+
+_TURKISH_FOLD = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u',
+})
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_SEPARATOR_RE = re.compile(r'[/,;\-()]+')
+
+
+def fold(text):
+    """Metni Türkçe kurallarla küçültüp aksanlarından arındır"""
+    if not text:
+        return ''
+    # Türkçede I -> ı ve İ -> i olarak küçülür
+    text = text.replace('I', 'ı').replace('İ', 'i').lower().translate(_TURKISH_FOLD)
+    text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return _NON_ALNUM_RE.sub('', text)
+
+
+def build_lookup(extra_names=()):
+    """Katlanmış ad -> kanonik ad tablosunu oluştur.
+
+    ``extra_names`` (ör. ilçe-gün kurallarındaki adlar) kendi yazımlarıyla
+    eklenir ve aynı katlanmış anahtarda kanonik tablodan önceliklidir.
+    """
+    lookup = {}
+    for canonical, aliases in ISTANBUL_DISTRICTS.items():
+        for name in [canonical] + aliases:
+            lookup[fold(name)] = canonical
+    for name in extra_names:
+        if name:
+            lookup[fold(name)] = name
+    return lookup
+
+
+def resolve(text, lookup):
+    """Girdiyi kanonik ilçe adına çevir; bulunamazsa kırpılmış girdiyi döndür"""
+    if not text:
+        return ''
+    match = lookup.get(fold(text))
+    if match:
+        return match
+    # "Kadıköy / İstanbul" gibi birleşik girdilerde parçaları dene
+    for part in _SEPARATOR_RE.split(text):
+        match = lookup.get(fold(part))
+        if match:
+            return match
+    return text.strip()
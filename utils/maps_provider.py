@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Harita sağlayıcı istemcileri ve sağlayıcı başına hız sınırlayıcı.
+
+Tüm servis çağrıları ``make_client`` üzerinden alınan istemciyle yapılır.
+İstemci, süreç içinde sağlayıcı başına paylaşılan bir jeton kovasından
+(token bucket) izin almadan istek göndermez; böylece paralel çalışan
+işçiler toplamda sağlayıcı kotasını aşmaz. ``stub`` sağlayıcısı ağa
+çıkmayan deterministik bir istemcidir ve tüm akışın çevrim dışı
+denenmesini sağlar.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+import googlemaps
+
+from . import polyline, route_solver
+
+PROVIDERS = ('google', 'stub')
+DEFAULT_RATE_LIMIT = 10.0  # istek / saniye
+DEFAULT_BURST = 10
+# Sahte sağlayıcının koordinatları yaydığı İstanbul sınırları
+ISTANBUL_BOUNDS = ((40.85, 41.20), (28.60, 29.30))
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """İş parçacığı güvenli jeton kovası"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def configure(self, rate, capacity):
+        with self.lock:
+            self.rate = float(rate)
+            self.capacity = float(capacity)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def acquire(self, tokens=1):
+        """Yeterli jeton birikene kadar bekle ve harca"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_bucket(provider, rate, capacity):
+    """Sağlayıcının süreç içinde paylaşılan kovasını getir; oran 0 ise sınır yok"""
+    if rate <= 0:
+        return None
+    capacity = max(capacity, 1)
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            bucket = _buckets[provider] = TokenBucket(rate, capacity)
+        elif (bucket.rate, bucket.capacity) != (float(rate), float(capacity)):
+            bucket.configure(rate, capacity)
+    return bucket
+
+
+class RateLimitedClient(object):
+    """İstemci metotlarını çağırmadan önce kovadan jeton alan sarmalayıcı"""
+
+    def __init__(self, client, bucket):
+        self._client = client
+        self._bucket = bucket
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if self._bucket is None or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._bucket.acquire()
+            return attr(*args, **kwargs)
+        return call
+
+
+class StubClient(object):
+    """googlemaps.Client yerine geçen, ağa çıkmayan deterministik sağlayıcı.
+
+    Adresler özetlerinden İstanbul kutusunda sabit bir noktaya eşlenir;
+    mesafeler kuş uçuşu mesafenin yol katsayısıyla çarpımı, süreler sabit
+    ortalama hızdır. Çağrı sayıları ``calls`` sayacında tutulur.
+    """
+
+    calls = Counter()
+
+    def __init__(self, key=None, **kwargs):
+        self.key = key
+
+    @staticmethod
+    def locate(address):
+        if isinstance(address, (tuple, list)):
+            return float(address[0]), float(address[1])
+        try:
+            lat, lng = address.split(',')
+            return float(lat), float(lng)
+        except ValueError:
+            pass
+        digest = hashlib.sha1(address.encode('utf-8')).digest()
+        (lat_min, lat_max), (lng_min, lng_max) = ISTANBUL_BOUNDS
+        return (lat_min + (lat_max - lat_min) * digest[0] / 255.0,
+                lng_min + (lng_max - lng_min) * digest[1] / 255.0)
+
+    @staticmethod
+    def _element(distance_km):
+        meters = int(distance_km * route_solver.DEFAULT_ROAD_FACTOR * 1000)
+        seconds = int(meters / (route_solver.DEFAULT_SPEED_KMH / 3.6))
+        return {
+            'status': 'OK',
+            'distance': {'value': meters, 'text': '%.1f km' % (meters / 1000.0)},
+            'duration': {'value': seconds, 'text': '%d dk' % round(seconds / 60.0)},
+        }
+
+    def geocode(self, address, region=None):
+        self.calls['geocode'] += 1
+        lat, lng = self.locate(address)
+        return [{'geometry': {'location': {'lat': lat, 'lng': lng}}}]
+
+    def distance_matrix(self, origins, destinations, mode='driving', departure_time=None):
+        self.calls['distance_matrix'] += 1
+        points = [self.locate(point) for point in list(origins) + list(destinations)]
+        matrix = route_solver.haversine_matrix([p[0] for p in points], [p[1] for p in points])
+        return {'rows': [
+            {'elements': [self._element(matrix[i, len(origins) + j]) for j in range(len(destinations))]}
+            for i in range(len(origins))
+        ]}
+
+    def directions(self, origin, destination, waypoints=(), optimize_waypoints=False, mode='driving'):
+        self.calls['directions'] += 1
+        points = [self.locate(point) for point in [origin] + list(waypoints) + [destination]]
+        matrix = route_solver.haversine_matrix([p[0] for p in points], [p[1] for p in points])
+        path = route_solver.solve(matrix) if optimize_waypoints else list(range(len(points)))
+        return [{
+            'legs': [self._element(matrix[a, b]) for a, b in zip(path[:-1], path[1:])],
+            'waypoint_order': [index - 1 for index in path[1:-1]],
+            'overview_polyline': {'points': polyline.encode([points[index] for index in path])},
+        }]
+
+
+def make_client(provider, api_key=None, rate=DEFAULT_RATE_LIMIT, burst=DEFAULT_BURST):
+    """Sağlayıcı istemcisini hız sınırlayıcıyla sarılmış olarak oluştur
+
+    Google için anahtar yoksa None döner.
+    """
+    if provider == 'stub':
+        client = StubClient()
+    elif api_key:
+        client = googlemaps.Client(key=api_key)
+    else:
+        return None
+    return RateLimitedClient(client, get_bucket(provider, rate, burst))
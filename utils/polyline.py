@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Google kodlanmış çoklu çizgi (encoded polyline) biçimi.
+
+Koordinatlar 1e5 hassasiyetle tamsayıya çevrilir, ardışık farklar
+zigzag kodlanıp 5 bitlik parçalar halinde ASCII karakterlere yazılır.
+Sağlayıcının döndürdüğü ``overview_polyline`` ile aynı biçimdir; böylece
+rota şekli ek bir servis çağrısı olmadan saklanıp çizilebilir.
+"""
+
+DEFAULT_PRECISION = 5
+
+
+def _encode_value(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+def encode(points, precision=DEFAULT_PRECISION):
+    """(enlem, boylam) listesini kodlanmış metne çevir"""
+    factor = 10 ** precision
+    result = []
+    previous_lat = previous_lng = 0
+    for lat, lng in points:
+        lat, lng = int(round(lat * factor)), int(round(lng * factor))
+        result.append(_encode_value(lat - previous_lat))
+        result.append(_encode_value(lng - previous_lng))
+        previous_lat, previous_lng = lat, lng
+    return ''.join(result)
+
+
+def decode(text, precision=DEFAULT_PRECISION):
+    """Kodlanmış metni (enlem, boylam) listesine çevir"""
+    factor = float(10 ** precision)
+    points = []
+    index = lat = lng = 0
+    length = len(text or '')
+    while index < length:
+        deltas = []
+        for _coordinate in range(2):
+            shift = value = 0
+            while True:
+                byte = ord(text[index]) - 63
+                index += 1
+                value |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else value >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / factor, lng / factor))
+    return points
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Sağlayıcıdan bağımsız rota çözücü.
+
+Başlangıç ve bitiş noktaları sabit olan açık yol problemi için en yakın
+komşu ile başlangıç çözümü kurar, ardından 2-opt ve Or-opt hamleleriyle
+iyileştirir. Tüm hamle değerlendirmeleri NumPy ile vektörleştirilmiştir ve
+asimetrik (yol ağı) matrislerle doğru çalışır.
+"""
+import time
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Kuş uçuşu mesafeyi yol mesafesine yaklaştıran katsayı ve ortalama hız
+DEFAULT_ROAD_FACTOR = 1.3
+DEFAULT_SPEED_KMH = 30.0
+
+
+def haversine_matrix(latitudes, longitudes):
+    """Koordinatlar arası kuş uçuşu mesafe matrisini (km) hesapla"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lng = np.radians(np.asarray(longitudes, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def fill_missing(distances, durations, latitudes, longitudes,
+                 road_factor=DEFAULT_ROAD_FACTOR, speed_kmh=DEFAULT_SPEED_KMH):
+    """Eksik (None) çiftleri kuş uçuşu tahminle doldurup (metre, saniye) matrisleri döndür"""
+    distance = np.array([[np.nan if v is None else v for v in row] for row in distances], dtype=float)
+    duration = np.array([[np.nan if v is None else v for v in row] for row in durations], dtype=float)
+    missing = np.isnan(distance) | np.isnan(duration)
+    if missing.any():
+        estimate = haversine_matrix(latitudes, longitudes) * 1000.0 * road_factor
+        distance[missing] = estimate[missing]
+        duration[missing] = estimate[missing] / (speed_kmh / 3.6)
+    np.fill_diagonal(distance, 0.0)
+    np.fill_diagonal(duration, 0.0)
+    return distance, duration
+
+
+def path_cost(matrix, path):
+    """Yolun toplam maliyetini hesapla"""
+    path = np.asarray(path)
+    return float(matrix[path[:-1], path[1:]].sum())
+
+
+def nearest_neighbour(matrix, start, end, stops):
+    """En yakın komşu ile başlangıç yolunu kur"""
+    path = [start]
+    remaining = np.asarray(stops, dtype=int)
+    current = start
+    while remaining.size:
+        k = int(np.argmin(matrix[current, remaining]))
+        current = int(remaining[k])
+        path.append(current)
+        remaining = np.delete(remaining, k)
+    path.append(end)
+    return np.asarray(path, dtype=int)
+
+
+def _best_two_opt(matrix, path):
+    """En iyi segment ters çevirme hamlesini (delta, i, j) bul"""
+    m = len(path)
+    if m < 4:
+        return 0.0, 0, 0
+    forward = np.concatenate(([0.0], np.cumsum(matrix[path[:-1], path[1:]])))
+    backward = np.concatenate(([0.0], np.cumsum(matrix[path[1:], path[:-1]])))
+    i = np.arange(1, m - 1)[:, None]
+    j = np.arange(1, m - 1)[None, :]
+    a, b, c, d = path[i - 1], path[i], path[j], path[j + 1]
+    # Asimetrik matrislerde segment içi kenarlar ters yönde yeniden sayılır
+    delta = (matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+             + (backward[j] - backward[i]) - (forward[j] - forward[i]))
+    delta = np.where(j > i, delta, np.inf)
+    bi, bj = np.unravel_index(int(np.argmin(delta)), delta.shape)
+    return float(delta[bi, bj]), int(bi) + 1, int(bj) + 1
+
+
+def _best_or_opt(matrix, path, max_segment=3):
+    """En iyi segment taşıma hamlesini (delta, i, uzunluk, k) bul"""
+    m = len(path)
+    best = (0.0, 0, 0, 0)
+    edges = np.arange(0, m - 1)
+    u, v = path[edges], path[edges + 1]
+    edge_cost = matrix[u, v]
+    for length in range(1, max_segment + 1):
+        starts = np.arange(1, m - length)
+        if starts.size == 0 or m - 2 <= length:
+            break
+        first, last = path[starts], path[starts + length - 1]
+        prev, nxt = path[starts - 1], path[starts + length]
+        removal = matrix[prev, first] + matrix[last, nxt] - matrix[prev, nxt]
+        insertion = matrix[u[None, :], first[:, None]] + matrix[last[:, None], v[None, :]] - edge_cost[None, :]
+        delta = insertion - removal[:, None]
+        # Segmente bitişik veya segment içindeki kenarlara ekleme yapılamaz
+        invalid = (edges[None, :] >= (starts - 1)[:, None]) & (edges[None, :] <= (starts + length - 1)[:, None])
+        delta[invalid] = np.inf
+        si, ek = np.unravel_index(int(np.argmin(delta)), delta.shape)
+        if delta[si, ek] < best[0]:
+            best = (float(delta[si, ek]), int(starts[si]), length, int(edges[ek]))
+    return best
+
+
+def improve(matrix, path, max_iterations=1000, tolerance=1e-9):
+    """2-opt ve Or-opt hamleleriyle yolu yerel optimuma kadar iyileştir"""
+    path = np.asarray(path, dtype=int).copy()
+    for _iteration in range(max_iterations):
+        delta, i, j = _best_two_opt(matrix, path)
+        if delta < -tolerance:
+            path[i:j + 1] = path[i:j + 1][::-1]
+            continue
+        delta, i, length, k = _best_or_opt(matrix, path)
+        if delta < -tolerance:
+            segment = path[i:i + length]
+            rest = np.concatenate((path[:i], path[i + length:]))
+            position = k + 1 if k < i else k - length + 1
+            path = np.concatenate((rest[:position], segment, rest[position:]))
+            continue
+        break
+    return path
+
+
+def solve(matrix, start=0, end=None, max_iterations=1000):
+    """Başlangıç ve bitişi sabit açık yol için ziyaret sırasını bul.
+
+    Dönen dizi başlangıç ve bitiş dahil tüm düğüm indekslerini içerir.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    size = matrix.shape[0]
+    end = size - 1 if end is None else end
+    stops = [node for node in range(size) if node not in (start, end)]
+    path = nearest_neighbour(matrix, start, end, stops)
+    return improve(matrix, path, max_iterations=max_iterations)
+
+
+def benchmark(matrix, reference_path=None, repeats=5):
+    """Çözücüyü zamanla ve isteğe bağlı referans yolla (ör. sağlayıcı) karşılaştır"""
+    matrix = np.asarray(matrix, dtype=float)
+    timings = []
+    path = None
+    for _repeat in range(max(repeats, 1)):
+        started = time.perf_counter()
+        path = solve(matrix)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    result = {
+        'stops': max(matrix.shape[0] - 2, 0),
+        'solve_ms_min': min(timings),
+        'solve_ms_avg': sum(timings) / len(timings),
+        'cost': path_cost(matrix, path),
+        'path': path.tolist(),
+    }
+    if reference_path is not None:
+        reference_cost = path_cost(matrix, reference_path)
+        result['reference_cost'] = reference_cost
+        result['gap_percent'] = (
+            (result['cost'] - reference_cost) / reference_cost * 100.0 if reference_cost else 0.0)
+    return result
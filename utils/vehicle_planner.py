@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Günlük teslimatları araçlara dağıtan kapasiteli planlayıcı.
+
+Her yakanın kendi aracı önce o yakaya atanır; esnek araçlar (küçük araçlar
+ve ek araç) taşmanın en büyük olduğu yakaya verilir. Yaka içinde duraklar
+depo etrafındaki açıya göre süpürülüp araç kapasitelerine göre ardışık
+kümelere bölünür (sweep sezgiseli), böylece her araç coğrafi olarak bitişik
+bir bölgeye hizmet eder.
+"""
+from collections import Counter
+
+import numpy as np
+
+# Yakaya sabit araçlar ve her iki yakaya da gidebilen araçlar
+SIDE_VEHICLES = {'anadolu': 'anadolu', 'avrupa': 'avrupa'}
+FLEXIBLE_VEHICLES = ('kucuk_arac_1', 'kucuk_arac_2', 'ek_arac')
+
+
+def _assign_sides(demand, capacities):
+    """Araçları yakalara dağıt; araç -> yaka sözlüğü döndür"""
+    sides = {}
+    overflow = dict(demand)
+    for vehicle, side in SIDE_VEHICLES.items():
+        if capacities.get(vehicle, 0) > 0 and side in overflow:
+            sides[vehicle] = side
+            overflow[side] -= capacities[vehicle]
+    for vehicle in FLEXIBLE_VEHICLES:
+        if capacities.get(vehicle, 0) <= 0 or not overflow:
+            continue
+        side = max(overflow, key=overflow.get)
+        if overflow[side] <= 0:
+            break
+        sides[vehicle] = side
+        overflow[side] -= capacities[vehicle]
+    return sides
+
+
+def _sweep_order(stops, depot=None):
+    """Durakları depo (ya da merkez) etrafındaki açıya göre sırala"""
+    located = [stop for stop in stops if stop.get('lat') is not None]
+    unlocated = sorted((stop for stop in stops if stop.get('lat') is None),
+                       key=lambda stop: (stop.get('district') or '', stop['id']))
+    if not located:
+        return unlocated
+    coordinates = np.array([(stop['lat'], stop['lng']) for stop in located], dtype=float)
+    center = np.asarray(depot, dtype=float) if depot is not None else coordinates.mean(axis=0)
+    angles = np.arctan2(coordinates[:, 0] - center[0], coordinates[:, 1] - center[1])
+    # Süpürmeyi en büyük açısal boşluktan başlat ki kümeler bölünmesin
+    order = np.argsort(angles)
+    sorted_angles = angles[order]
+    gaps = np.diff(np.concatenate((sorted_angles, [sorted_angles[0] + 2 * np.pi])))
+    start = (int(np.argmax(gaps)) + 1) % len(order)
+    order = np.roll(order, -start)
+    return [located[index] for index in order] + unlocated
+
+
+def _fill(vehicles, ordered, capacities, district_capacities):
+    """Sıralı durakları araçlara sırayla doldur; sığmayan durakları döndür
+
+    Araç, ilçe kapasitesi dolan durağı atlar; atlanan durak sonraki araca
+    kalır. İlçe kapasitesi verilmeyen durak yalnızca araç kapasitesine tabidir.
+    """
+    assignments = {}
+    remaining = list(ordered)
+    for vehicle in vehicles:
+        taken, rest = [], []
+        used = Counter()
+        for stop in remaining:
+            district = stop.get('district')
+            limit = district_capacities.get((vehicle, district)) if district else None
+            if len(taken) < capacities[vehicle] and (limit is None or used[district] < limit):
+                taken.append(stop)
+                used[district] += 1
+            else:
+                rest.append(stop)
+        if taken:
+            assignments[vehicle] = [stop['id'] for stop in taken]
+        remaining = rest
+    return assignments, remaining
+
+
+def plan(stops, capacities, depot=None, district_capacities=None):
+    """Durakları araçlara ata.
+
+    ``stops`` her biri ``id``, ``region``, ``district``, ``lat``, ``lng``
+    anahtarlarını içeren sözlüklerdir; ``capacities`` araç -> kalan kapasite
+    eşlemesidir. ``district_capacities`` verilirse (araç, ilçe) -> kalan
+    kapasite sınırlarına da uyulur. Sonuç (araç -> durak id listesi,
+    atanamayan id listesi) çiftidir.
+    """
+    by_side = {}
+    unassigned = []
+    for stop in stops:
+        if stop.get('region') in SIDE_VEHICLES.values():
+            by_side.setdefault(stop['region'], []).append(stop)
+        else:
+            unassigned.append(stop['id'])
+
+    sides = _assign_sides({side: len(items) for side, items in by_side.items()}, capacities)
+    assignments = {}
+    for side, side_stops in by_side.items():
+        vehicles = [vehicle for vehicle in list(SIDE_VEHICLES) + list(FLEXIBLE_VEHICLES)
+                    if sides.get(vehicle) == side]
+        ordered = _sweep_order(side_stops, depot=depot)
+        side_assignments, rest = _fill(vehicles, ordered, capacities, district_capacities or {})
+        assignments.update(side_assignments)
+        unassigned.extend(stop['id'] for stop in rest)
+    return assignments, unassigned
@@ -1,2 +1,4 @@
 # -*- coding: utf-8 -*-
-from . import vehicle_selection_wizard
\ No newline at end of file
+from . import vehicle_selection_wizard
+from . import delivery_auto_planning_wizard
+from . import delivery_capacity_simulation_wizard
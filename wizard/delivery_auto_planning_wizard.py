@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from datetime import timedelta
+from ..models.delivery_perf_sample import instrument
+
+
+class DeliveryAutoPlanningWizard(models.TransientModel):
+    _name = 'delivery.auto.planning.wizard'
+    _description = 'Otomatik Teslimat Planlama Wizard'
+
+    date = fields.Date('Teslimat Tarihi', required=True,
+                       default=lambda self: fields.Date.context_today(self) + timedelta(days=1))
+    ready_count = fields.Integer('Planlanacak Teslimat Sayısı', compute='_compute_ready_count')
+
+    @api.depends('date')
+    def _compute_ready_count(self):
+        Document = self.env['delivery.document']
+        for wizard in self:
+            wizard.ready_count = Document.search_count([
+                ('delivery_date', '=', wizard.date),
+                ('state', '=', 'ready'),
+                ('planning_id', '=', False),
+            ]) if wizard.date else 0
+
+    @instrument('action')
+    def action_plan(self):
+        """Planlamaları otomatik oluştur"""
+        self.ensure_one()
+
+        plannings, unassigned = self.env['delivery.planning']._auto_plan(self.date)
+        if not plannings:
+            if unassigned:
+                raise UserError(_(
+                    'Bu tarih için %s hazır teslimat kapasite veya ilçe-gün kuralları '
+                    'nedeniyle planlanamadı: %s'
+                ) % (len(unassigned), ', '.join(unassigned.mapped('name'))))
+            raise UserError(_('Bu tarih için planlanabilecek hazır teslimat bulunamadı!'))
+
+        action = {
+            'type': 'ir.actions.act_window',
+            'name': _('Teslimat Planlamaları'),
+            'view_mode': 'tree,form',
+            'res_model': 'delivery.planning',
+            'domain': [('id', 'in', plannings.ids)],
+        }
+        if not unassigned:
+            return action
+
+        # Not, belgenin aracına ait planlamaya yazılır; tam liste bildirimde gösterilir
+        plannings_by_vehicle = {planning.vehicle_type: planning for planning in plannings}
+        for vehicle_type in set(unassigned.mapped('vehicle_type')):
+            planning = plannings_by_vehicle.get(vehicle_type)
+            if planning:
+                documents = unassigned.filtered(lambda d: d.vehicle_type == vehicle_type)
+                planning.message_post(body=_(
+                    'Kapasite veya ilçe-gün kuralları nedeniyle bu araca ait %s teslimat '
+                    'planlanamadı: %s'
+                ) % (len(documents), ', '.join(documents.mapped('name'))))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Planlanamayan Teslimatlar'),
+                'message': _('Kapasite veya ilçe-gün kuralları nedeniyle %s teslimat planlanamadı: %s') % (
+                    len(unassigned), ', '.join(unassigned.mapped('name'))),
+                'type': 'warning',
+                'sticky': True,
+                'next': action,
+            },
+        }
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from datetime import timedelta
+
+import numpy as np
+
+from ..models.delivery_document import DAILY_DELIVERY_LIMIT
+from ..utils import capacity_simulator
+from ..models.delivery_perf_sample import instrument
+
+# Ek araç şu an Pazar hariç her gün kullanılabiliyor
+CURRENT_EXTRA_VEHICLE_DAYS = 6
+
+
+class DeliveryCapacitySimulationWizard(models.TransientModel):
+    _name = 'delivery.capacity.simulation.wizard'
+    _description = 'Kapasite Simülasyonu Wizard'
+
+    demand_source = fields.Selection([
+        ('history', 'Geçmiş Talep'),
+        ('forecast', 'Sentetik Tahmin'),
+    ], string='Talep Kaynağı', required=True, default='history')
+    history_weeks = fields.Integer('Geçmiş (Hafta)', default=8)
+    forecast_daily_demand = fields.Float('Günlük Toplam Talep', default=30.0,
+                                         help='İlçelere eşit dağıtılan günlük teslimat sayısı')
+    start_date = fields.Date('Başlangıç Tarihi', required=True,
+                             default=lambda self: fields.Date.context_today(self) + timedelta(days=1))
+    horizon_weeks = fields.Integer('Simülasyon Süresi (Hafta)', default=4)
+
+    vehicle_cap_min = fields.Integer('Araç Kapasitesi (En Az)', default=DAILY_DELIVERY_LIMIT)
+    vehicle_cap_max = fields.Integer('Araç Kapasitesi (En Çok)', default=DAILY_DELIVERY_LIMIT)
+    extra_days_min = fields.Integer('Ek Araç Günü (En Az)', default=CURRENT_EXTRA_VEHICLE_DAYS)
+    extra_days_max = fields.Integer('Ek Araç Günü (En Çok)', default=CURRENT_EXTRA_VEHICLE_DAYS)
+    demand_factor_min = fields.Float('Talep Çarpanı (En Az)', default=1.0)
+    demand_factor_max = fields.Float('Talep Çarpanı (En Çok)', default=1.0)
+    demand_factor_steps = fields.Integer('Talep Çarpanı Adımı', default=1)
+
+    scenario_count = fields.Integer('Senaryo Sayısı', compute='_compute_scenario_count')
+    line_ids = fields.One2many('delivery.capacity.simulation.line', 'wizard_id', string='Sonuçlar',
+                               readonly=True)
+
+    @api.depends('vehicle_cap_min', 'vehicle_cap_max', 'extra_days_min', 'extra_days_max',
+                 'demand_factor_steps')
+    def _compute_scenario_count(self):
+        for wizard in self:
+            wizard.scenario_count = (
+                max(wizard.vehicle_cap_max - wizard.vehicle_cap_min + 1, 0)
+                * max(wizard.extra_days_max - wizard.extra_days_min + 1, 0)
+                * max(wizard.demand_factor_steps, 0)
+            )
+
+    def _get_weekday_demand(self):
+        """Seçilen kaynağa göre ilçe listesi ve (D, 7) ortalama talep matrisi"""
+        districts = sorted(self.env['delivery.district.day']._get_district_day_index())
+        if not districts:
+            raise UserError(_('Simülasyon için tanımlı ilçe-gün kuralı bulunamadı!'))
+
+        weekday_demand = np.zeros((len(districts), 7))
+        if self.demand_source == 'forecast':
+            # Sentetik tahmin: Pazar hariç günlere ve ilçelere eşit dağıt
+            weekday_demand[:, :6] = self.forecast_daily_demand / len(districts)
+            return districts, weekday_demand
+
+        date_to = fields.Date.context_today(self)
+        date_from = date_to - timedelta(weeks=max(self.history_weeks, 1))
+        profile = self.env['delivery.document']._get_demand_profile(date_from, date_to)
+        rows = {district: row for row, district in enumerate(districts)}
+        for (district, weekday), demand in profile.items():
+            if district in rows:
+                weekday_demand[rows[district], weekday] = demand
+        return districts, weekday_demand
+
+    @api.model
+    def _run_simulation(self, districts, weekday_demand, start_date, horizon_days,
+                        vehicle_caps, extra_vehicle_days, demand_factors):
+        """Senaryo ızgarasını mevcut ilçe takvimine göre simüle et
+
+        Sihirbaz dışından da çağrılabilir. Dönüş: senaryo dizileri ('caps',
+        'extra_days', 'factors') ile ``capacity_simulator.simulate`` sonucunu
+        içeren sözlük.
+        """
+        allowed, district_caps, region_index = \
+            self.env['delivery.district.day']._get_schedule_arrays(districts)
+        caps, extra_days, factors = capacity_simulator.build_scenarios(
+            vehicle_caps, extra_vehicle_days, demand_factors)
+        if not len(caps):
+            raise UserError(_('Simülasyon için en az bir senaryo tanımlanmalıdır!'))
+
+        start_weekday = start_date.weekday()
+        demand = capacity_simulator.project_demand(weekday_demand, horizon_days, start_weekday)
+        extra_mask = capacity_simulator.extra_vehicle_mask(extra_days, weekday_demand.sum(axis=0))
+        result = capacity_simulator.simulate(
+            demand, allowed, district_caps, region_index, caps, extra_mask,
+            demand_factors=factors, start_weekday=start_weekday)
+        result.update(caps=caps, extra_days=extra_days, factors=factors)
+        return result
+
+    @instrument('action')
+    def action_simulate(self):
+        """Senaryoları çalıştır ve sonuçları listele"""
+        self.ensure_one()
+
+        districts, weekday_demand = self._get_weekday_demand()
+        result = self._run_simulation(
+            districts, weekday_demand, self.start_date, max(self.horizon_weeks, 1) * 7,
+            range(self.vehicle_cap_min, self.vehicle_cap_max + 1),
+            range(max(self.extra_days_min, 0), min(self.extra_days_max, 6) + 1),
+            np.linspace(self.demand_factor_min, self.demand_factor_max, max(self.demand_factor_steps, 1)),
+        )
+
+        self.line_ids.unlink()
+        self.env['delivery.capacity.simulation.line'].create([{
+            'wizard_id': self.id,
+            'vehicle_cap': int(result['caps'][index]),
+            'extra_vehicle_days': int(result['extra_days'][index]),
+            'demand_factor': float(result['factors'][index]),
+            'total_load': float(result['load'][index].sum()),
+            'peak_load': float(result['load'][index].max()),
+            'total_overflow': float(result['overflow'][index].sum()),
+            'peak_backlog': float(result['backlog'][index].max()),
+            'mean_wait': float(result['mean_wait'][index]),
+            'max_wait': float(result['max_wait'][index]),
+            'unserved': float(result['unserved'][index]),
+        } for index in range(len(result['caps']))])
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Kapasite Simülasyonu'),
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class DeliveryCapacitySimulationLine(models.TransientModel):
+    _name = 'delivery.capacity.simulation.line'
+    _description = 'Kapasite Simülasyonu Sonucu'
+    _order = 'unserved, mean_wait, vehicle_cap, extra_vehicle_days'
+
+    wizard_id = fields.Many2one('delivery.capacity.simulation.wizard', string='Simülasyon',
+                                required=True, ondelete='cascade')
+    vehicle_cap = fields.Integer('Araç Kapasitesi')
+    extra_vehicle_days = fields.Integer('Ek Araç Günü')
+    demand_factor = fields.Float('Talep Çarpanı', digits=(16, 2))
+    total_load = fields.Float('Toplam Teslimat', digits=(16, 1))
+    peak_load = fields.Float('En Yüksek Günlük Yük', digits=(16, 1))
+    total_overflow = fields.Float('Toplam Taşma', digits=(16, 1))
+    peak_backlog = fields.Float('En Yüksek Bekleyen', digits=(16, 1))
+    mean_wait = fields.Float('Ortalama Bekleme (Gün)', digits=(16, 1))
+    max_wait = fields.Float('En Uzun Bekleme (Gün)', digits=(16, 1))
+    unserved = fields.Float('Dönem Sonu Bekleyen', digits=(16, 1))
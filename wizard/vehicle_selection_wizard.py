@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from ..models.delivery_perf_sample import instrument
+
+# Sihirbazda listelenen uygun yuva sayısı
+AVAILABLE_SLOT_COUNT = 10
 
 class VehicleSelectionWizard(models.TransientModel):
     _name = 'vehicle.selection.wizard'
     _description = 'Araç Seçimi Wizard'
 
-    picking_id = fields.Many2one('stock.picking', string='Transfer Belgesi', required=True)
+    picking_id = fields.Many2one('stock.picking', string='Transfer Belgesi')
+    picking_ids = fields.Many2many('stock.picking', string='Transfer Belgeleri',
+                                   default=lambda self: self._default_picking_ids())
     
     vehicle_type = fields.Selection([
         ('anadolu', 'Anadolu Yakası'),
@@ -15,18 +21,125 @@ class VehicleSelectionWizard(models.TransientModel):
         ('kucuk_arac_2', 'Küçük Araç 2'),
         ('ek_arac', 'Ek Araç')
     ], string='Araç Seçimi', required=True)
+    delivery_date = fields.Date('Teslimat Tarihi', required=True,
+                                default=lambda self: fields.Date.context_today(self))
+
+    district = fields.Char('İlçe', compute='_compute_district_days')
+    allowed_days = fields.Char('Uygun Teslimat Günleri', compute='_compute_district_days')
+    slot_ids = fields.One2many('vehicle.selection.slot', 'wizard_id', string='Uygun Yuvalar')
+
+    @api.model
+    def _default_picking_ids(self):
+        if self.env.context.get('active_model') == 'stock.picking':
+            return [(6, 0, self.env.context.get('active_ids', []))]
+        return False
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if 'slot_ids' not in fields_list:
+            return res
+        picking_ids = res.get('picking_ids') and res['picking_ids'][0][2] or []
+        pickings = self.env['stock.picking'].browse(picking_ids or res.get('picking_id') or [])
+        slots = self._get_available_slots(pickings)
+        res['slot_ids'] = [(0, 0, {
+            'delivery_date': slot['date'],
+            'vehicle_type': slot['vehicle_type'],
+            'remaining': slot['remaining'],
+            'district_remaining': slot['district_remaining'],
+        }) for slot in slots]
+        # İlk uygun yuva önceden seçilir; kullanıcı listeden değiştirebilir
+        if slots and not res.get('vehicle_type'):
+            res['vehicle_type'] = slots[0]['vehicle_type']
+            res['delivery_date'] = slots[0]['date']
+        return res
+
+    @api.model
+    def _get_available_slots(self, pickings):
+        """Transferlerin ilçeleri için uygun ilk (tarih, araç) yuvalarını getir"""
+        if not pickings:
+            return []
+        cities = pickings.mapped('partner_id.city')
+        resolved = self.env['delivery.district.day']._resolve_districts(cities)
+        demand = {}
+        for picking in pickings:
+            district = resolved.get(picking.partner_id.city) or ''
+            demand[district] = demand.get(district, 0) + 1
+        limit = int(self.env['ir.config_parameter'].sudo().get_param(
+            'delivery.available_slot_count', AVAILABLE_SLOT_COUNT))
+        return self.env['delivery.capacity.slot']._get_available_slots(
+            demand, fields.Date.context_today(self), limit)
+
+    @api.depends('picking_id')
+    def _compute_district_days(self):
+        district_day = self.env['delivery.district.day']
+        for wizard in self:
+            district = self.env['delivery.document']._get_partner_district(wizard.picking_id.partner_id)
+            wizard.district = district
+            wizard.allowed_days = ', '.join(district_day.get_allowed_day_names_for_district(district))
     
+    @instrument('action')
     def action_confirm(self):
         """Araç seçimini onayla"""
         self.ensure_one()
         
         if not self.vehicle_type:
             raise UserError(_('Araç seçimi yapılmalıdır!'))
-        
-        # Transfer belgesine araç seçimi bilgisini ekle
-        self.picking_id.write({
-            'has_vehicle_selected': True,
+
+        pickings = self.picking_ids or self.picking_id
+        if not pickings:
+            raise UserError(_('En az bir transfer belgesi seçilmelidir!'))
+
+        # Tek transfer için mevcut akış: belgeyi oluştur ve aç
+        if len(pickings) == 1:
+            pickings.write({'has_vehicle_selected': True})
+            return pickings.action_create_delivery_document(self.vehicle_type, self.delivery_date)
+
+        # Çoklu seçim: tüm belgeleri tek seferde oluştur
+        documents = pickings._create_delivery_documents(self.vehicle_type, self.delivery_date)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Teslimat Belgeleri'),
+            'view_mode': 'tree,form',
+            'res_model': 'delivery.document',
+            'domain': [('id', 'in', documents.ids)],
+            'context': {'create': False},
+        }
+
+
+class VehicleSelectionSlot(models.TransientModel):
+    _name = 'vehicle.selection.slot'
+    _description = 'Araç Seçimi Uygun Yuva'
+    _order = 'delivery_date, vehicle_type'
+
+    wizard_id = fields.Many2one('vehicle.selection.wizard', string='Sihirbaz',
+                                required=True, ondelete='cascade')
+    delivery_date = fields.Date('Teslimat Tarihi')
+    weekday = fields.Char('Gün', compute='_compute_weekday')
+    vehicle_type = fields.Selection(
+        lambda self: self.env['vehicle.selection.wizard']._fields['vehicle_type'].selection,
+        string='Araç')
+    remaining = fields.Integer('Araç Kalan Kapasite')
+    district_remaining = fields.Integer('İlçe Kalan Kapasite')
+
+    @api.depends('delivery_date')
+    def _compute_weekday(self):
+        weekday_names = self.env['delivery.district.day']._get_weekday_names()
+        for slot in self:
+            slot.weekday = weekday_names[slot.delivery_date.weekday()] if slot.delivery_date else False
+
+    def action_select(self):
+        """Yuvayı sihirbazda seç"""
+        self.ensure_one()
+        self.wizard_id.write({
+            'vehicle_type': self.vehicle_type,
+            'delivery_date': self.delivery_date,
         })
-        
-        # Teslimat belgesi oluştur
-        return self.picking_id.action_create_delivery_document()
\ No newline at end of file
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Araç Seçimi'),
+            'res_model': self.wizard_id._name,
+            'res_id': self.wizard_id.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }